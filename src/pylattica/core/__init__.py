@@ -1,16 +1,42 @@
 # fmt: off
 from .basic_controller import BasicController
-from .simulation_result import SimulationResult
-from .runner import SynchronousRunner, AsynchronousRunner
+from .kinetic_controller import KineticController
+from .simulation_result import SimulationResult, LazySimulationResult
+from .result_cursor import ResultCursor
+from .runner import (
+    SynchronousRunner,
+    AsynchronousRunner,
+    SublatticeRunner,
+    KineticMonteCarloRunner,
+    RateTree,
+    EnsembleRunner,
+    EnsembleResult,
+    ParameterSweep,
+    SweepConfig,
+)
 from .simulation_state import SimulationState
 from .periodic_structure import PeriodicStructure
 from .simulation import Simulation
 from .lattice import Lattice
 from .analyzer import StateAnalyzer
 from .structure_builder import StructureBuilder
+from .observers import (
+    Observer,
+    ChangedSiteCountObserver,
+    ReducerObserver,
+    StateFunctionObserver,
+)
+from .convergence import (
+    ConvergenceCriterion,
+    EmptyUpdates,
+    NoChange,
+    ObservablePlateau,
+    CycleDetection,
+)
 
 from .neighborhoods import Neighborhood, StochasticNeighborhood
 from .neighborhood_builders import (
     DistanceNeighborhoodBuilder,
     MotifNeighborhoodBuilder,
 )
+from .neighborhood_cache import NeighborhoodCache, build_neighborhood
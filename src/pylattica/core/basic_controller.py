@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
-import random
+from typing import List
 
+import numpy as np
+
+from .neighborhoods import AbstractNeighborhood
+from .rng import default_rng
 from .simulation_result import SimulationResult
 from .simulation_state import SimulationState
+from .utils import merge_updates
 
 
 class BasicController(ABC):
@@ -17,15 +22,88 @@ class BasicController(ABC):
     user to decide what updates should be produced using this information.
     """
 
+    def __init__(self) -> None:
+        self._rng: np.random.Generator = None
+
     @abstractmethod
     def get_state_update(self, site_id: int, prev_state: SimulationState):
         pass  # pragma: no cover
 
+    def get_state_updates(self, site_ids: List[int], prev_state: SimulationState):
+        """Applies the update rule to each of the provided sites against the
+        same previous state and merges the results. Runners which update many
+        sites at once call this method, so controllers which can compute the
+        updates of many sites together (e.g. with vectorized operations) may
+        override it.
+
+        Parameters
+        ----------
+        site_ids : List[int]
+            The sites at which the update rule should be applied.
+        prev_state : SimulationState
+            The state against which the updates are computed.
+
+        Returns
+        -------
+        dict
+            The merged updates, keyed by site ID, or None if there were none.
+        """
+        batch_updates = None
+        for site_id in site_ids:
+            site_updates = self.get_state_update(site_id, prev_state)
+            batch_updates = merge_updates(site_updates, batch_updates, site_id)
+
+        return batch_updates
+
     def pre_run(self, initial_state: SimulationState) -> None:
         pass
 
+    def get_neighborhood(self) -> AbstractNeighborhood:
+        """Returns the neighborhood which bounds the sites read and written by
+        an application of the update rule at a single site, if there is one.
+        Runners which apply the update rule to several sites concurrently use
+        it to avoid conflicting updates.
+
+        Returns
+        -------
+        AbstractNeighborhood
+            The neighborhood, or None if the controller does not provide one.
+        """
+        return None
+
+    @property
+    def rng(self) -> np.random.Generator:
+        """The random number generator which the update rule should draw from.
+        Runners replace it with a Generator derived from the seed of the run (see
+        set_rng) before the run starts, and in every worker process, so update
+        rules which only use this Generator are reproducible.
+
+        Returns
+        -------
+        np.random.Generator
+            The Generator.
+        """
+        # Subclasses which do not call BasicController.__init__ have no _rng yet
+        if getattr(self, "_rng", None) is None:
+            self._rng = default_rng()
+        return self._rng
+
+    def set_rng(self, rng: np.random.Generator) -> None:
+        """Sets the random number generator of the controller, and of its
+        neighborhood, if it provides one.
+
+        Parameters
+        ----------
+        rng : np.random.Generator
+            The new Generator.
+        """
+        self._rng = rng
+        neighborhood = self.get_neighborhood()
+        if neighborhood is not None:
+            neighborhood.set_rng(rng)
+
     def get_random_site(self, state: SimulationState):
-        return random.randint(0, len(state.site_ids()) - 1)
+        return int(self.rng.integers(state.size))
 
     def instantiate_result(self, starting_state: SimulationState):
         return SimulationResult(starting_state=starting_state)
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .constants import GENERAL, SITES
+
+_UINT_DTYPES = [np.uint8, np.uint16, np.uint32, np.uint64]
+
+# How the updates were formatted, so that decoding reproduces them exactly
+_FLAT = 0
+_WRAPPED = 1
+_WRAPPED_EMPTY_GENERAL = 2
+_WRAPPED_WITH_GENERAL = 3
+
+
+def _pack(values: np.ndarray) -> bytes:
+    # Stores non-negative integers with the smallest unsigned dtype that holds
+    # them. The first byte of the result is the character code of the dtype.
+    max_val = int(values.max()) if len(values) > 0 else 0
+    for dtype in _UINT_DTYPES:
+        if max_val <= np.iinfo(dtype).max:
+            dtype = np.dtype(dtype)
+            return dtype.char.encode() + values.astype(dtype).tobytes()
+    raise ValueError(f"Cannot pack values up to {max_val} as unsigned integers")
+
+
+def _unpack(packed: bytes) -> np.ndarray:
+    dtype = np.dtype(packed[:1].decode())
+    return np.frombuffer(packed, dtype=dtype, offset=1).astype(np.int64)
+
+
+class ValueTable:
+    """Assigns an integer code to every distinct state value stored in the
+    compact diffs of a SimulationResult. Values are distinguished by type as
+    well as equality, so that e.g. 1, 1.0 and True receive different codes.
+    """
+
+    def __init__(self):
+        self._codes: Dict[Tuple[type, Any], int] = {}
+        self._values: List[Any] = []
+        self._value_array: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def code(self, value: Any) -> int:
+        """Returns the code of a value, assigning a new one if necessary.
+
+        Parameters
+        ----------
+        value : Any
+            A hashable state value.
+
+        Returns
+        -------
+        int
+            The code of the value.
+
+        Raises
+        ------
+        TypeError
+            If the value is not hashable.
+        """
+        key = (type(value), value)
+        code = self._codes.get(key)
+        if code is None:
+            code = len(self._values)
+            self._codes[key] = code
+            self._values.append(value)
+            self._value_array = None
+        return code
+
+    def values(self, codes: np.ndarray) -> List[Any]:
+        """Returns the values corresponding to an array of codes.
+
+        Parameters
+        ----------
+        codes : np.ndarray
+            The codes to look up.
+
+        Returns
+        -------
+        List[Any]
+            The value of each code.
+        """
+        if self._value_array is None:
+            self._value_array = np.empty(len(self._values), dtype=object)
+            self._value_array[:] = self._values
+        return self._value_array[codes].tolist()
+
+
+class CompactDiff:
+    """A columnar encoding of the updates of a single simulation step.
+
+    The IDs of the updated sites are sorted and delta encoded. Every state key
+    that was updated is stored as a column of value codes from a ValueTable,
+    along with the positions (in the sorted site list) of the sites it applies
+    to, which are omitted when the key was updated at every site. Columns whose
+    values repeat in long runs are run-length encoded. All integer arrays are
+    stored as bytes using the smallest unsigned integer type which holds them.
+    Columns containing unhashable values are stored as plain lists. General
+    state updates are kept as a dictionary.
+    """
+
+    __slots__ = ("_site_deltas", "_columns", "_general", "_format")
+
+    def __init__(self, site_deltas, columns, general, fmt):
+        self._site_deltas = site_deltas
+        self._columns = columns
+        self._general = general
+        self._format = fmt
+
+    @classmethod
+    def encode(cls, updates: Dict, table: ValueTable) -> CompactDiff:
+        """Encodes the updates of a step.
+
+        Parameters
+        ----------
+        updates : Dict
+            The updates, formatted as {"SITES": ..., "GENERAL": ...} or as a map
+            of site IDs to site updates.
+        table : ValueTable
+            The table which assigns codes to the updated values.
+
+        Returns
+        -------
+        CompactDiff
+            The encoded updates.
+        """
+        general = None
+        if GENERAL in updates:
+            site_updates = updates.get(SITES, {})
+            general = updates[GENERAL]
+            if len(general) == 0:
+                fmt = _WRAPPED_EMPTY_GENERAL
+                general = None
+            else:
+                fmt = _WRAPPED_WITH_GENERAL
+        elif SITES in updates:
+            site_updates = updates[SITES]
+            fmt = _WRAPPED
+        else:
+            site_updates = updates
+            fmt = _FLAT
+
+        site_ids = sorted(site_updates)
+        num_sites = len(site_ids)
+
+        column_values: Dict[Any, Tuple[List[int], List[Any]]] = {}
+        for pos, site_id in enumerate(site_ids):
+            for key, val in site_updates[site_id].items():
+                positions, values = column_values.setdefault(key, ([], []))
+                positions.append(pos)
+                values.append(val)
+
+        columns = []
+        for key, (positions, values) in column_values.items():
+            if len(positions) == num_sites:
+                packed_positions = None
+            else:
+                packed_positions = _pack(np.array(positions, dtype=np.int64))
+
+            try:
+                codes = np.array([table.code(val) for val in values], dtype=np.int64)
+            except TypeError:
+                columns.append((key, packed_positions, list(values), None))
+                continue
+
+            run_starts = np.flatnonzero(np.diff(codes, prepend=-1))
+            if 2 * len(run_starts) < len(codes):
+                run_lengths = np.diff(run_starts, append=len(codes))
+                columns.append(
+                    (
+                        key,
+                        packed_positions,
+                        _pack(codes[run_starts]),
+                        _pack(run_lengths),
+                    )
+                )
+            else:
+                columns.append((key, packed_positions, _pack(codes), None))
+
+        site_deltas = _pack(np.diff(np.array(site_ids, dtype=np.int64), prepend=0))
+        return cls(site_deltas, tuple(columns), general, fmt)
+
+    def site_ids(self) -> np.ndarray:
+        """Returns the IDs of the updated sites, in ascending order.
+
+        Returns
+        -------
+        np.ndarray
+            The site IDs.
+        """
+        return np.cumsum(_unpack(self._site_deltas))
+
+    def column(self, key: Any, table: ValueTable) -> Tuple[np.ndarray, List[Any]]:
+        """Returns the sites at which a key was updated, and their new values.
+
+        Parameters
+        ----------
+        key : Any
+            The state key.
+        table : ValueTable
+            The table with which the diff was encoded.
+
+        Returns
+        -------
+        Tuple[np.ndarray, List[Any]]
+            The site IDs and the corresponding values. Both are empty if the key
+            was not updated.
+        """
+        for col_key, positions, codes, run_lengths in self._columns:
+            if col_key == key:
+                site_ids = self.site_ids()
+                if positions is not None:
+                    site_ids = site_ids[_unpack(positions)]
+                return site_ids, _column_values(codes, run_lengths, table)
+        return np.zeros(0, dtype=np.int64), []
+
+    def apply(self, state, table: ValueTable) -> None:
+        """Applies the updates to a state column by column, without
+        reconstructing the dictionary of updates of every site.
+
+        Parameters
+        ----------
+        state : SimulationState
+            The state to update.
+        table : ValueTable
+            The table with which the diff was encoded.
+        """
+        site_ids = self.site_ids()
+        covered = np.zeros(len(site_ids), dtype=bool)
+        for key, positions, codes, run_lengths in self._columns:
+            if positions is None:
+                targets = site_ids
+                covered[:] = True
+            else:
+                positions = _unpack(positions)
+                targets = site_ids[positions]
+                covered[positions] = True
+            state.set_site_values(
+                key, targets.tolist(), _column_values(codes, run_lengths, table)
+            )
+
+        if not covered.all():
+            # sites updated with no values still receive a state
+            state.batch_update({site_id: {} for site_id in site_ids[~covered].tolist()})
+
+        if self._format == _WRAPPED_WITH_GENERAL:
+            state.set_general_state(self._general)
+
+    def decode(self, table: ValueTable) -> Dict:
+        """Reconstructs the updates in the format they were encoded from.
+
+        Parameters
+        ----------
+        table : ValueTable
+            The table with which the diff was encoded.
+
+        Returns
+        -------
+        Dict
+            The updates.
+        """
+        site_ids = self.site_ids().tolist()
+        site_updates = {site_id: {} for site_id in site_ids}
+        for key, positions, codes, run_lengths in self._columns:
+            values = _column_values(codes, run_lengths, table)
+            if positions is None:
+                targets = site_ids
+            else:
+                targets = [site_ids[pos] for pos in _unpack(positions).tolist()]
+            for site_id, val in zip(targets, values):
+                site_updates[site_id][key] = val
+
+        if self._format == _FLAT:
+            return site_updates
+
+        updates = {SITES: site_updates}
+        if self._format == _WRAPPED_EMPTY_GENERAL:
+            updates[GENERAL] = {}
+        elif self._format == _WRAPPED_WITH_GENERAL:
+            updates[GENERAL] = self._general
+        return updates
+
+
+def _column_values(codes, run_lengths, table: ValueTable) -> List[Any]:
+    if isinstance(codes, list):
+        return codes
+
+    codes = _unpack(codes)
+    if run_lengths is not None:
+        codes = np.repeat(codes, _unpack(run_lengths))
+    return table.values(codes)
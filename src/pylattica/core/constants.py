@@ -5,3 +5,4 @@ STATE_VALUE = "_state_value"
 GENERAL = "GENERAL"
 SITES = "SITES"
 OFFSET_PRECISION = 3
+SIMULATION_TIME = "_simulation_time"
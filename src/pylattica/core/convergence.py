@@ -0,0 +1,275 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List
+
+from .constants import GENERAL, SITES
+from .simulation_state import SimulationState
+
+_MISSING = object()
+
+
+def _differs(old_val: Any, val: Any) -> bool:
+    # Values of different types, e.g. 1 and True, differ even if they are equal
+    return old_val is _MISSING or type(old_val) is not type(val) or old_val != val
+
+
+def _changes(updates: Dict, state: SimulationState):
+    """Yields (owner, key, old value, new value) for every value in the updates
+    that differs from the corresponding value in the state, in value or in
+    type. The owner is the site ID, or GENERAL for general state values.
+    """
+    for site_id, site_updates in updates.get(SITES, {}).items():
+        old_state = state.get_site_state(site_id)
+        if old_state is None:
+            old_state = {}
+        for key, val in site_updates.items():
+            old_val = old_state.get(key, _MISSING)
+            if _differs(old_val, val):
+                yield site_id, key, old_val, val
+
+    general = state.get_general_state()
+    for key, val in updates.get(GENERAL, {}).items():
+        old_val = general.get(key, _MISSING)
+        if _differs(old_val, val):
+            yield GENERAL, key, old_val, val
+
+
+class ConvergenceCriterion(ABC):
+    """The base class for conditions under which a Runner stops a simulation
+    before the requested number of steps has been taken. Criteria are passed
+    to Runner.run and see every step. update is called with the updates of a
+    step before they are applied to the state, and is_converged is called
+    after they are applied. When any criterion reports convergence, the run
+    stops and the reason given by the criterion is stored on the result.
+    """
+
+    def start(self, state: SimulationState) -> None:
+        """Resets the criterion using the starting state of a run.
+
+        Parameters
+        ----------
+        state : SimulationState
+            The state with which the run starts.
+        """
+
+    def update(self, updates: Dict, state: SimulationState) -> None:
+        """Inspects the updates of a step before they are applied.
+
+        Parameters
+        ----------
+        updates : Dict
+            The updates of the step, formatted as {"SITES": ..., "GENERAL": ...}
+        state : SimulationState
+            The state before the updates are applied.
+        """
+
+    @abstractmethod
+    def is_converged(self, step_no: int, state: SimulationState) -> bool:
+        pass  # pragma: no cover
+
+    @property
+    @abstractmethod
+    def reason(self) -> str:
+        pass  # pragma: no cover
+
+
+class EmptyUpdates(ConvergenceCriterion):
+    """Stops a run at the first step in which the controller did not produce
+    any updates for any site or for the general state.
+    """
+
+    def __init__(self):
+        self._empty = False
+
+    def start(self, _: SimulationState) -> None:
+        self._empty = False
+
+    def update(self, updates: Dict, _: SimulationState) -> None:
+        self._empty = not updates.get(GENERAL) and not any(
+            updates.get(SITES, {}).values()
+        )
+
+    def is_converged(self, *_) -> bool:
+        return self._empty
+
+    @property
+    def reason(self) -> str:
+        return "The controller produced no updates"
+
+
+class NoChange(ConvergenceCriterion):
+    """Stops a run once the state has not changed for a number of consecutive
+    steps. Unlike EmptyUpdates, updates which set values equal to the ones
+    already stored do not count as changes.
+    """
+
+    def __init__(self, num_steps: int = 1):
+        """Instantiates the NoChange criterion.
+
+        Parameters
+        ----------
+        num_steps : int, optional
+            The number of consecutive unchanged steps after which the run stops,
+            by default 1
+        """
+        self.num_steps = num_steps
+        self._unchanged_steps = 0
+
+    def start(self, _: SimulationState) -> None:
+        self._unchanged_steps = 0
+
+    def update(self, updates: Dict, state: SimulationState) -> None:
+        if next(_changes(updates, state), None) is None:
+            self._unchanged_steps += 1
+        else:
+            self._unchanged_steps = 0
+
+    def is_converged(self, *_) -> bool:
+        return self._unchanged_steps >= self.num_steps
+
+    @property
+    def reason(self) -> str:
+        return f"The state did not change for {self.num_steps} steps"
+
+
+class ObservablePlateau(ConvergenceCriterion):
+    """Stops a run once an observable of the state has stayed within a
+    tolerance over a window of evaluations.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[SimulationState], float],
+        window: int = 10,
+        tolerance: float = 0.0,
+        interval: int = 1,
+    ):
+        """Instantiates the ObservablePlateau criterion.
+
+        Parameters
+        ----------
+        fn : Callable[[SimulationState], float]
+            The observable, as a function of the state.
+        window : int, optional
+            The number of consecutive evaluations over which the observable must be
+            flat, by default 10
+        tolerance : float, optional
+            The largest spread of the observable over the window which is still
+            considered flat, by default 0.0
+        interval : int, optional
+            The number of steps between evaluations of the observable, by default 1
+        """
+        self._fn = fn
+        self.window = window
+        self.tolerance = tolerance
+        self.interval = interval
+        self._values = deque(maxlen=window)
+
+    def start(self, state: SimulationState) -> None:
+        self._values = deque([self._fn(state)], maxlen=self.window)
+
+    def is_converged(self, step_no: int, state: SimulationState) -> bool:
+        if step_no % self.interval != 0:
+            return False
+
+        self._values.append(self._fn(state))
+        if len(self._values) < self.window:
+            return False
+
+        return max(self._values) - min(self._values) <= self.tolerance
+
+    @property
+    def reason(self) -> str:
+        return (
+            f"The observable varied by at most {self.tolerance} over "
+            f"{self.window} evaluations"
+        )
+
+
+def _hash_value(owner: Hashable, key: str, val: Any) -> int:
+    # The type is included so that e.g. 1 and True hash differently
+    try:
+        return hash((owner, key, type(val), val))
+    except TypeError:
+        return hash((owner, key, type(val), repr(val)))
+
+
+class CycleDetection(ConvergenceCriterion):
+    """Stops a run when the state returns to a state it has already visited.
+    A fixed point is detected as a cycle with a period of one step.
+
+    States are identified by a hash which is the XOR of a hash of every
+    (site, key, value) triple in the state. The hash is computed once at the
+    start of the run, then maintained from the old and new values of each
+    step's updates, so it costs time proportional to the size of the updates.
+    Unhashable values are hashed by their repr. Since different states can have
+    the same hash, a copy of every visited state is kept, and a state is only
+    considered visited if it equals a stored state with the same hash. Copies
+    share the site states which have not changed between them (see
+    SimulationState.copy).
+    """
+
+    def __init__(self, max_period: int = None):
+        """Instantiates the CycleDetection criterion.
+
+        Parameters
+        ----------
+        max_period : int, optional
+            If provided, only this many preceding states are kept, which bounds
+            memory but only detects cycles up to this period, by default None
+        """
+        self.max_period = max_period
+        self.period = None
+        self._hash = 0
+        # the step number and hash of each kept state, oldest first
+        self._history = deque()
+        self._seen: Dict[int, List[int]] = {}
+        self._states: Dict[int, SimulationState] = {}
+
+    def start(self, state: SimulationState) -> None:
+        state_hash = 0
+        for site_id, site_state in zip(state.site_ids(), state.all_site_states()):
+            for key, val in site_state.items():
+                state_hash ^= _hash_value(site_id, key, val)
+
+        for key, val in state.get_general_state().items():
+            state_hash ^= _hash_value(GENERAL, key, val)
+
+        self._hash = state_hash
+        self._history = deque()
+        self._seen = {}
+        self._states = {}
+        self.period = None
+        self._remember(0, state)
+
+    def update(self, updates: Dict, state: SimulationState) -> None:
+        for owner, key, old_val, new_val in _changes(updates, state):
+            if old_val is not _MISSING:
+                self._hash ^= _hash_value(owner, key, old_val)
+            self._hash ^= _hash_value(owner, key, new_val)
+
+    def is_converged(self, step_no: int, state: SimulationState) -> bool:
+        for seen_step in self._seen.get(self._hash, []):
+            if self._states[seen_step] == state:
+                self.period = step_no - seen_step
+                return True
+
+        self._remember(step_no, state)
+        if self.max_period is not None and len(self._history) > self.max_period:
+            old_step, old_hash = self._history.popleft()
+            self._seen[old_hash].remove(old_step)
+            if len(self._seen[old_hash]) == 0:
+                del self._seen[old_hash]
+            del self._states[old_step]
+        return False
+
+    def _remember(self, step_no: int, state: SimulationState) -> None:
+        self._seen.setdefault(self._hash, []).append(step_no)
+        self._states[step_no] = state.copy()
+        self._history.append((step_no, self._hash))
+
+    @property
+    def reason(self) -> str:
+        if self.period == 1:
+            return "The state reached a fixed point"
+        return f"The state entered a cycle with period {self.period}"
@@ -0,0 +1,87 @@
+from abc import abstractmethod
+from typing import Iterable, List
+
+from .basic_controller import BasicController
+from .constants import SITES
+from .simulation_state import SimulationState
+
+
+class KineticController(BasicController):
+    """The base class for Controllers used with the KineticMonteCarloRunner.
+    In addition to the update rule, a kinetic controller exposes the total
+    rate of the events which can occur at each site.
+
+    The runner selects the site of the next event with probability proportional
+    to its rate, and then calls get_state_update to carry out an event at that
+    site. If several kinds of events can occur at a site, get_state_update
+    should choose among them in proportion to their individual rates. After each
+    event, the rates of the sites returned by get_affected_sites are recomputed.
+    """
+
+    @abstractmethod
+    def get_rate(self, site_id: int, state: SimulationState) -> float:
+        """Returns the total rate of the events which can occur at a site.
+
+        Parameters
+        ----------
+        site_id : int
+            The site for which the rate should be computed.
+        state : SimulationState
+            The current state of the simulation.
+
+        Returns
+        -------
+        float
+            The non-negative rate of events at the site.
+        """
+
+    def get_rates(self, site_ids: List[int], state: SimulationState) -> List[float]:
+        """Returns the rates of several sites. Controllers which can compute many
+        rates together may override this method.
+
+        Parameters
+        ----------
+        site_ids : List[int]
+            The sites for which rates should be computed.
+        state : SimulationState
+            The current state of the simulation.
+
+        Returns
+        -------
+        List[float]
+            The rate of each site, in the order given.
+        """
+        return [self.get_rate(site_id, state) for site_id in site_ids]
+
+    def get_affected_sites(self, site_id: int, updates: dict) -> Iterable[int]:
+        """Returns the sites whose rates may have changed after an event. By
+        default, these are the site of the event, every site it updated, and
+        all of their possible neighbors in the neighborhood returned by
+        get_neighborhood. This assumes the rate of a site only depends on the
+        states of the site and its neighbors, and that the neighborhood is
+        symmetric. Controllers whose rates depend on the general state should
+        override this method.
+
+        Parameters
+        ----------
+        site_id : int
+            The site at which the event occurred.
+        updates : dict
+            The updates produced by the event, formatted as
+            {"SITES": ..., "GENERAL": ...}
+
+        Returns
+        -------
+        Iterable[int]
+            The IDs of the sites whose rates should be recomputed.
+        """
+        changed = set(updates.get(SITES, {}).keys())
+        changed.add(site_id)
+
+        affected = set(changed)
+        neighborhood = self.get_neighborhood()
+        if neighborhood is not None:
+            for changed_site in changed:
+                affected.update(neighborhood.possible_neighbors_of(changed_site))
+
+        return affected
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from typing import List, Tuple, Union
+from typing import Iterator, List, Tuple, Union
 
 import numpy as np
 from numpy.typing import ArrayLike
 from .constants import OFFSET_PRECISION
+from .minimum_image import MinimumImage
 import math
 
+# The default bound on the number of coordinate differences held in memory at
+# once when computing pairwise distances
+DEFAULT_MAX_CHUNK_ELEMENTS = 2**22
+
 
 def periodize(frac_coords, periodic: Union[Tuple[bool], bool] = True):
     """Moves fractional coordinates into the unit cell.
@@ -14,7 +19,8 @@ def periodize(frac_coords, periodic: Union[Tuple[bool], bool] = True):
     Parameters
     ----------
     frac_coords : ArrayLike
-        The fractional coordinates to periodize.
+        The fractional coordinates to periodize, either a single point or an
+        (M, dim) array of points.
     periodic : bool, optional
         Either a single boolean or a tuple of booleans indicating the periodicity
         of each dimension, by default True
@@ -24,15 +30,18 @@ def periodize(frac_coords, periodic: Union[Tuple[bool], bool] = True):
     ArrayLike
         The periodized coordinates
     """
+    frac_coords = np.asarray(frac_coords)
     if not isinstance(periodic, tuple):
-        periodic = [periodic for _ in frac_coords]
+        periodic = [periodic for _ in range(frac_coords.shape[-1])]
 
     return frac_coords - np.floor(frac_coords) * np.array(periodic, dtype=int)
 
 
 def pbc_diff_frac_vec(fcoords1: ArrayLike, fcoords2: ArrayLike, periodic):
     """Returns the 'fractional distance' between two coordinates taking into
-    account periodic boundary conditions. (from pymatgen)
+    account periodic boundary conditions. (from pymatgen) Rounding the
+    fractional distance only gives the nearest periodic image for orthogonal
+    lattice vectors; see MinimumImage for skewed lattices.
 
     Parameters
     ----------
@@ -60,34 +69,122 @@ def pbc_diff_frac_vec(fcoords1: ArrayLike, fcoords2: ArrayLike, periodic):
 
 def pbc_diff_cart(cart_coords1: ArrayLike, cart_coords2: ArrayLike, lattice: Lattice):
     """Returns the Cartesian distance between two coordinates taking into
-    account periodic boundary conditions.
+    account periodic boundary conditions. This is the distance to the nearest
+    periodic image, which is found with the MinimumImage of the lattice, so it is
+    correct for skewed cells as well.
 
     Parameters
     ----------
     cart_coords1 : ArrayLike
-        First set of Cartesian coordinates
+        First set of Cartesian coordinates, either a single point or an (M, dim)
+        array of points.
     cart_coords2 : ArrayLike
-        Second set of Cartesian coordinates
+        Second set of Cartesian coordinates, which must broadcast against the
+        first.
     lattice : Lattice
         The Lattice within which the distance should be calculated
 
     Returns
     -------
-    _type_
-        _description_
+    Union[float, np.ndarray]
+        The distance, or an array of the distances between corresponding points.
     """
-    fcoords1 = lattice.get_fractional_coords(cart_coords1)
-    fcoords2 = lattice.get_fractional_coords(cart_coords2)
-    frac_dist = pbc_diff_frac_vec(fcoords1, fcoords2, lattice.periodic)
     return np.round(
-        np.linalg.norm(lattice.get_cartesian_coords(frac_dist)), OFFSET_PRECISION
+        lattice.minimum_image.distance(cart_coords1, cart_coords2), OFFSET_PRECISION
     )
 
 
+def periodic_distance_chunks(
+    cart_coords1: ArrayLike,
+    cart_coords2: ArrayLike,
+    lattice: Lattice,
+    max_chunk_elements: int = DEFAULT_MAX_CHUNK_ELEMENTS,
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """Computes the periodic distances between every pair of points from two
+    sets, in blocks of rows. The points are converted to fractional coordinates
+    once, and each block only holds the differences between a slice of the
+    first set and all of the second set, so that memory use is bounded by
+    max_chunk_elements rather than by the product of the sizes of the sets.
+
+    Parameters
+    ----------
+    cart_coords1 : ArrayLike
+        An (M, dim) array of Cartesian coordinates.
+    cart_coords2 : ArrayLike
+        An (N, dim) array of Cartesian coordinates.
+    lattice : Lattice
+        The Lattice within which the distances should be calculated.
+    max_chunk_elements : int, optional
+        The maximum number of coordinate differences computed at once, by
+        default DEFAULT_MAX_CHUNK_ELEMENTS
+
+    Yields
+    ------
+    Tuple[int, np.ndarray]
+        The index in the first set of the first row of the block, and a
+        (rows, N) array of distances.
+    """
+    min_image = lattice.minimum_image
+    fcoords1 = np.atleast_2d(min_image.frac_coords(cart_coords1))
+    fcoords2 = np.atleast_2d(min_image.frac_coords(cart_coords2))
+
+    # every difference is compared against each candidate image shift
+    row_size = max(fcoords2.shape[0] * fcoords2.shape[1] * len(min_image.shifts), 1)
+    chunk_rows = max(max_chunk_elements // row_size, 1)
+    for start in range(0, fcoords1.shape[0], chunk_rows):
+        block = fcoords1[start : start + chunk_rows]
+        dists = min_image.frac_diff_lengths(block[:, np.newaxis, :] - fcoords2)
+        yield start, np.round(dists, OFFSET_PRECISION)
+
+
+def pairwise_periodic_distances(
+    cart_coords1: ArrayLike,
+    cart_coords2: ArrayLike,
+    lattice: Lattice,
+    max_chunk_elements: int = DEFAULT_MAX_CHUNK_ELEMENTS,
+) -> np.ndarray:
+    """Returns the matrix of periodic distances between every pair of points
+    from two sets. See periodic_distance_chunks for a version which does not
+    hold the whole matrix in memory.
+
+    Parameters
+    ----------
+    cart_coords1 : ArrayLike
+        An (M, dim) array of Cartesian coordinates.
+    cart_coords2 : ArrayLike
+        An (N, dim) array of Cartesian coordinates. If None, the distances
+        between the points of the first set are returned.
+    lattice : Lattice
+        The Lattice within which the distances should be calculated.
+    max_chunk_elements : int, optional
+        The maximum number of coordinate differences computed at once, by
+        default DEFAULT_MAX_CHUNK_ELEMENTS
+
+    Returns
+    -------
+    np.ndarray
+        The (M, N) array of distances.
+    """
+    if cart_coords2 is None:
+        cart_coords2 = cart_coords1
+
+    blocks = [
+        dists
+        for _, dists in periodic_distance_chunks(
+            cart_coords1, cart_coords2, lattice, max_chunk_elements
+        )
+    ]
+    if len(blocks) == 0:
+        return np.zeros((0, len(np.atleast_2d(cart_coords2))))
+    return np.concatenate(blocks)
+
+
 class Lattice:
     """A lattice is specified by it's lattice vectors. This class can then
     be used to create PeriodicStructure instances which are filled with
-    a given motif. The usage flow for this class is:
+    a given motif. The coordinate transforms of this class accept either a single
+    point or an (M, dim) array of points, and return arrays of the same shape.
+    The usage flow for this class is:
 
     1) Define your lattice by specifying the lattice vectors and instantiating this class
     2) Define a motif of sites, which is a dictionary mapping each site class to the
@@ -135,6 +232,7 @@ class Lattice:
 
         self._matrix: np.ndarray = mat
         self._inv_matrix: np.ndarray | None = None
+        self._minimum_image: MinimumImage | None = None
 
         self.dim = len(vecs[0])
         self.vec_lengths = [np.linalg.norm(np.array(vec)) for vec in vecs]
@@ -158,13 +256,20 @@ class Lattice:
             self._inv_matrix.setflags(write=False)
         return self._inv_matrix
 
+    @property
+    def minimum_image(self) -> MinimumImage:
+        """The MinimumImage used to compute periodic distances in this lattice."""
+        if self._minimum_image is None:
+            self._minimum_image = MinimumImage(self._matrix, self.periodic)
+        return self._minimum_image
+
     def get_cartesian_coords(self, fractional_coords: ArrayLike) -> np.ndarray:
         """Returns the Cartesian coordinates given fractional coordinates. (taken from pymatgen)
 
         Parameters
         ----------
         fractional_coords : ArrayLike
-            Fractional coords
+            Fractional coords, either a single point or an (M, dim) array of points
 
         Returns
         -------
@@ -179,7 +284,7 @@ class Lattice:
         Parameters
         ----------
         cart_coords : ArrayLike
-            Cartesian coords.
+            Cartesian coords, either a single point or an (M, dim) array of points
 
         Returns
         -------
@@ -195,7 +300,8 @@ class Lattice:
         Parameters
         ----------
         cart_coords : ArrayLike
-            The coordinates to periodize
+            The coordinates to periodize, either a single point or an (M, dim)
+            array of points
 
         Returns
         -------
@@ -226,6 +332,8 @@ class Lattice:
 
     def cartesian_periodic_distance(self, loc1: ArrayLike, loc2: ArrayLike) -> float:
         """Returns the Cartesian distance between two coordinates after periodizing them.
+        Either location may also be an (M, dim) array of points, in which case the
+        distances are computed one-to-many or between corresponding points.
 
         Parameters
         ----------
@@ -236,7 +344,7 @@ class Lattice:
 
         Returns
         -------
-        float
+        Union[float, np.ndarray]
             The distance between the locations.
         """
         return pbc_diff_cart(
@@ -244,3 +352,30 @@ class Lattice:
             loc2,
             self,
         )
+
+    def pairwise_periodic_distances(
+        self,
+        locs1: ArrayLike,
+        locs2: ArrayLike = None,
+        max_chunk_elements: int = DEFAULT_MAX_CHUNK_ELEMENTS,
+    ) -> np.ndarray:
+        """Returns the matrix of periodic distances between every pair of points
+        from two sets of Cartesian coordinates (see pairwise_periodic_distances).
+
+        Parameters
+        ----------
+        locs1 : ArrayLike
+            An (M, dim) array of locations.
+        locs2 : ArrayLike, optional
+            An (N, dim) array of locations. If left unspecified, the distances
+            between the points of the first set are returned.
+        max_chunk_elements : int, optional
+            The maximum number of coordinate differences computed at once, by
+            default DEFAULT_MAX_CHUNK_ELEMENTS
+
+        Returns
+        -------
+        np.ndarray
+            The (M, N) array of distances.
+        """
+        return pairwise_periodic_distances(locs1, locs2, self, max_chunk_elements)
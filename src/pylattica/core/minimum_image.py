@@ -0,0 +1,242 @@
+import itertools
+from typing import Tuple, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+# Numerical tolerance for treating lattice vectors as orthogonal
+_ORTHOGONALITY_TOLERANCE = 1e-10
+
+
+def lll_reduce(basis: ArrayLike, delta: float = 0.75) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduces a lattice basis with the Lenstra-Lenstra-Lovasz algorithm. The
+    reduced basis spans the same lattice, but its vectors are short and nearly
+    orthogonal.
+
+    Parameters
+    ----------
+    basis : ArrayLike
+        The basis vectors, one per row. They must be linearly independent, but
+        need not span the whole space.
+    delta : float, optional
+        The Lovasz parameter, between 0.25 and 1, by default 0.75
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The reduced basis, and the unimodular integer matrix T such that the
+        reduced basis is T @ basis.
+    """
+    reduced = np.array(basis, dtype=float)
+    num_vecs = len(reduced)
+    transform = np.eye(num_vecs, dtype=np.int64)
+
+    def gram_schmidt():
+        ortho = np.zeros_like(reduced)
+        mu = np.zeros((num_vecs, num_vecs))
+        for i in range(num_vecs):
+            ortho[i] = reduced[i]
+            for j in range(i):
+                mu[i, j] = reduced[i] @ ortho[j] / (ortho[j] @ ortho[j])
+                ortho[i] = ortho[i] - mu[i, j] * ortho[j]
+        return ortho, mu
+
+    ortho, mu = gram_schmidt()
+    k = 1
+    while k < num_vecs:
+        for j in range(k - 1, -1, -1):
+            q = int(np.round(mu[k, j]))
+            if q != 0:
+                reduced[k] = reduced[k] - q * reduced[j]
+                transform[k] = transform[k] - q * transform[j]
+                ortho, mu = gram_schmidt()
+
+        if ortho[k] @ ortho[k] >= (delta - mu[k, k - 1] ** 2) * (
+            ortho[k - 1] @ ortho[k - 1]
+        ):
+            k += 1
+        else:
+            reduced[[k, k - 1]] = reduced[[k - 1, k]]
+            transform[[k, k - 1]] = transform[[k - 1, k]]
+            ortho, mu = gram_schmidt()
+            k = max(k - 1, 1)
+
+    return reduced, transform
+
+
+class MinimumImage:
+    """Computes minimum image displacements and distances in a Lattice.
+
+    Rounding the fractional components of a displacement (as pbc_diff_frac_vec
+    does) only yields the shortest periodic image when the lattice vectors are
+    orthogonal. For skewed cells, such as the RhombohedralLattice of honeycomb
+    structures, the shortest image may be a neighboring one. The MinimumImage
+    first reduces the periodic lattice vectors with lll_reduce, and rounds the
+    displacement in the reduced basis. Because the reduced vectors are nearly
+    orthogonal, the shortest image is then one of the images shifted by at most
+    one reduced vector in each periodic direction. These candidate shifts are
+    computed once, and evaluated for a whole batch of displacements at a time.
+    For orthogonal cells only the rounded image is considered. In partially
+    periodic lattices, displacements are only reduced within the span of the
+    periodic vectors, so the non-periodic vectors are first made orthogonal to
+    it.
+
+    Attributes
+    ----------
+    basis : np.ndarray
+        The lattice vectors, with the periodic vectors replaced by their reduced
+        basis, and the non-periodic vectors replaced by their components
+        orthogonal to the periodic ones.
+    shifts : np.ndarray
+        The (S, dim) array of candidate image shifts, in Cartesian coordinates.
+    """
+
+    def __init__(self, matrix: ArrayLike, periodic: Union[Tuple[bool], bool] = True):
+        """Instantiates the MinimumImage for a lattice.
+
+        Parameters
+        ----------
+        matrix : ArrayLike
+            The matrix of lattice vectors, one per row.
+        periodic : Union[Tuple[bool], bool], optional
+            The periodicity of each lattice vector, by default True
+        """
+        matrix = np.array(matrix, dtype=float)
+        dim = len(matrix)
+        self._periodic = np.broadcast_to(np.array(periodic, dtype=int), (dim,))
+        periodic_idxs = np.flatnonzero(self._periodic)
+
+        nonperiodic_idxs = np.flatnonzero(self._periodic == 0)
+
+        self.basis = matrix.copy()
+        if len(periodic_idxs) > 0:
+            reduced, _ = lll_reduce(matrix[periodic_idxs])
+            self.basis[periodic_idxs] = reduced
+            if len(nonperiodic_idxs) > 0:
+                # Only the component of a displacement within the span of the
+                # periodic vectors can be shortened. Making the other vectors
+                # orthogonal to that span turns the periodic coordinates into
+                # the least squares coefficients of the displacement in it.
+                ortho, _ = np.linalg.qr(reduced.T)
+                nonperiodic = matrix[nonperiodic_idxs]
+                self.basis[nonperiodic_idxs] = (
+                    nonperiodic - (nonperiodic @ ortho) @ ortho.T
+                )
+        self.basis.setflags(write=False)
+        self._inv_basis = np.linalg.inv(self.basis)
+
+        gram = self.basis @ self.basis.T
+        off_diagonal = gram - np.diag(np.diag(gram))
+        periodic_overlaps = np.abs(off_diagonal[periodic_idxs])
+        if np.all(periodic_overlaps <= _ORTHOGONALITY_TOLERANCE * gram.max()):
+            self.shifts = np.zeros((1, dim))
+        else:
+            coeffs = np.array(
+                list(itertools.product([-1, 0, 1], repeat=len(periodic_idxs)))
+            )
+            self.shifts = coeffs @ self.basis[periodic_idxs]
+        self.shifts.setflags(write=False)
+
+    def frac_coords(self, cart_coords: ArrayLike) -> np.ndarray:
+        """Returns coordinates in the reduced basis. Displacements between
+        coordinates returned by this method can be passed to frac_diff_vectors
+        and frac_diff_lengths.
+
+        Parameters
+        ----------
+        cart_coords : ArrayLike
+            The Cartesian coordinates, either a single point or an (M, dim)
+            array of points.
+
+        Returns
+        -------
+        np.ndarray
+            The coordinates in the reduced basis.
+        """
+        return np.dot(cart_coords, self._inv_basis)
+
+    def _candidates(self, frac_diff: np.ndarray) -> np.ndarray:
+        frac_diff = frac_diff - np.round(frac_diff) * self._periodic
+        cart_diff = np.dot(frac_diff, self.basis)
+        return cart_diff[..., np.newaxis, :] + self.shifts
+
+    def frac_diff_vectors(self, frac_diff: ArrayLike) -> np.ndarray:
+        """Returns the minimum image of displacements given in the reduced basis.
+
+        Parameters
+        ----------
+        frac_diff : ArrayLike
+            The displacements in the reduced basis, with shape (..., dim).
+
+        Returns
+        -------
+        np.ndarray
+            The Cartesian minimum image displacements, with shape (..., dim).
+        """
+        candidates = self._candidates(np.asarray(frac_diff))
+        best = np.argmin(np.square(candidates).sum(axis=-1), axis=-1)
+        return np.take_along_axis(
+            candidates, best[..., np.newaxis, np.newaxis], axis=-2
+        )[..., 0, :]
+
+    def frac_diff_lengths(self, frac_diff: ArrayLike) -> np.ndarray:
+        """Returns the lengths of the minimum images of displacements given in
+        the reduced basis.
+
+        Parameters
+        ----------
+        frac_diff : ArrayLike
+            The displacements in the reduced basis, with shape (..., dim).
+
+        Returns
+        -------
+        np.ndarray
+            The lengths, with shape (...).
+        """
+        candidates = self._candidates(np.asarray(frac_diff))
+        return np.sqrt(np.square(candidates).sum(axis=-1).min(axis=-1))
+
+    def diff(self, cart_coords1: ArrayLike, cart_coords2: ArrayLike) -> np.ndarray:
+        """Returns the minimum image displacements from the second set of
+        coordinates to the first.
+
+        Parameters
+        ----------
+        cart_coords1 : ArrayLike
+            The first Cartesian coordinates, either a single point or an (M, dim)
+            array of points.
+        cart_coords2 : ArrayLike
+            The second Cartesian coordinates, which must broadcast against the
+            first.
+
+        Returns
+        -------
+        np.ndarray
+            The Cartesian displacements.
+        """
+        return self.frac_diff_vectors(
+            self.frac_coords(np.subtract(cart_coords1, cart_coords2))
+        )
+
+    def distance(
+        self, cart_coords1: ArrayLike, cart_coords2: ArrayLike
+    ) -> Union[float, np.ndarray]:
+        """Returns the minimum image distances between two sets of coordinates.
+
+        Parameters
+        ----------
+        cart_coords1 : ArrayLike
+            The first Cartesian coordinates, either a single point or an (M, dim)
+            array of points.
+        cart_coords2 : ArrayLike
+            The second Cartesian coordinates, which must broadcast against the
+            first.
+
+        Returns
+        -------
+        Union[float, np.ndarray]
+            The distance, or an array of distances.
+        """
+        return self.frac_diff_lengths(
+            self.frac_coords(np.subtract(cart_coords1, cart_coords2))
+        )
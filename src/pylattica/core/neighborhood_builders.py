@@ -1,4 +1,4 @@
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 
 import numpy as np
 import rustworkx as rx
@@ -9,13 +9,50 @@ from abc import abstractmethod
 from .constants import LOCATION, SITE_ID
 from .distance_map import EuclideanDistanceMap
 from .neighborhoods import Neighborhood, StochasticNeighborhood, SiteClassNeighborhood
-from .periodic_structure import PeriodicStructure
-from .lattice import pbc_diff_cart
+from .periodic_structure import PeriodicStructure, Tiling
+from .lattice import periodic_distance_chunks
+
+
+def _neighbors_in_range(
+    sites: List[Dict], struct: PeriodicStructure, in_range
+) -> Iterator[Tuple[int, List[Tuple]]]:
+    # Yields the ID of each of the sites and its neighbors, i.e. the other sites
+    # of the structure at a periodic distance accepted by in_range. The
+    # distances are computed in blocks of sites.
+    all_sites = struct.sites()
+    all_ids = np.array([site[SITE_ID] for site in all_sites])
+    all_locs = np.array([site[LOCATION] for site in all_sites])
+    site_locs = np.array([site[LOCATION] for site in sites])
+
+    if len(sites) == 0:
+        return
+
+    with tqdm(total=len(sites), disable=len(sites) == 1) as pbar:
+        for start, dists in periodic_distance_chunks(
+            site_locs, all_locs, struct.lattice
+        ):
+            for row, site_dists in enumerate(dists):
+                curr_id = sites[start + row][SITE_ID]
+                mask = in_range(site_dists) & (all_ids != curr_id)
+                nb_idxs = np.flatnonzero(mask)
+                yield curr_id, list(
+                    zip(all_ids[nb_idxs].tolist(), site_dists[nb_idxs].tolist())
+                )
+            pbar.update(len(dists))
 
 
 class NeighborhoodBuilder:
     """An abstract class to extend in order to implement a new type of
-    NeighborhoodBuilder"""
+    NeighborhoodBuilder
+
+    Builders whose neighbors depend only on the relative positions of sites set
+    translation_invariant to True. For those builders, the neighbors of a
+    structure built from a unit cell (see PeriodicStructure.translatable_tiling)
+    are only searched for the sites of the first cell, and are translated to
+    every other cell.
+    """
+
+    translation_invariant = False
 
     def get(self, struct: PeriodicStructure, site_class: str = None) -> Neighborhood:
         """Given a structure and a site class to build a neighborhood for,
@@ -37,20 +74,93 @@ class NeighborhoodBuilder:
         """
         graph = rx.PyDiGraph()
 
+        for site in struct.sites():
+            graph.add_node(site[SITE_ID])
+
+        graph.add_edges_from(self.get_edges(struct, site_class))
+        return Neighborhood(graph)
+
+    def get_edges(
+        self, struct: PeriodicStructure, site_class: str = None
+    ) -> List[Tuple[int, int, float]]:
+        """Finds the neighbor connections of the sites of a structure without
+        building a Neighborhood.
+
+        Parameters
+        ----------
+        struct : PeriodicStructure
+            The structure for which the neighbors of every site should be
+            calculated
+        site_class : str, optional
+            Specify a single class of sites to calculate the neighbors of, by
+            default None
+
+        Returns
+        -------
+        List[Tuple[int, int, float]]
+            The connections, as tuples of site ID, neighbor ID and weight, grouped
+            by site.
+        """
         if site_class is None:
             sites = struct.sites()
         else:
             sites = struct.sites(site_class=site_class)
 
-        for site in struct.sites():
-            graph.add_node(site[SITE_ID])
+        tiling = struct.translatable_tiling() if self.translation_invariant else None
+        if tiling is not None:
+            return self._translated_edges(sites, struct, tiling)
 
-        for curr_site in tqdm(sites):
-            nbs = self.get_neighbors(curr_site, struct)
-            for nb_id, weight in nbs:
-                graph.add_edge(curr_site[SITE_ID], nb_id, weight)
+        return [
+            (curr_id, nb_id, weight)
+            for curr_id, nbs in self._neighbors_of_sites(sites, struct)
+            for nb_id, weight in nbs
+        ]
 
-        return Neighborhood(graph)
+    def _translated_edges(
+        self, sites: List[Dict], struct: PeriodicStructure, tiling: Tiling
+    ) -> List[Tuple]:
+        # Finds the neighbors of the sites in the first cell, which have IDs
+        # below the motif size, and shifts them by every cell
+        cell_sites = [site for site in sites if site[SITE_ID] < tiling.motif_size]
+        all_cells, _ = tiling.cell_coords(
+            np.arange(tiling.num_cell_total) * tiling.motif_size
+        )
+
+        sources = []
+        targets = []
+        weights = []
+        for curr_id, nbs in self._neighbors_of_sites(cell_sites, struct):
+            if len(nbs) == 0:
+                continue
+            nb_ids = np.array([nb_id for nb_id, _ in nbs])
+            nb_cells, nb_motif_idxs = tiling.cell_coords(nb_ids)
+
+            # one row per cell, one column per neighbor
+            shifted_cells = all_cells[:, np.newaxis, :] + nb_cells
+            nb_site_ids = tiling.site_ids(
+                shifted_cells.reshape(-1, struct.dim),
+                np.tile(nb_motif_idxs, len(all_cells)),
+            )
+            sources.append(np.repeat(tiling.site_ids(all_cells, curr_id), len(nbs)))
+            targets.append(nb_site_ids)
+            weights.extend([weight for _, weight in nbs] * len(all_cells))
+
+        if len(sources) == 0:
+            return []
+
+        order = np.argsort(np.concatenate(sources), kind="stable")
+        sources = np.concatenate(sources)[order].tolist()
+        targets = np.concatenate(targets)[order].tolist()
+        weights = [weights[idx] for idx in order]
+        return list(zip(sources, targets, weights))
+
+    def _neighbors_of_sites(
+        self, sites: List[Dict], struct: PeriodicStructure
+    ) -> Iterator[Tuple[int, List[Tuple]]]:
+        # Yields the ID and the neighbors of each site. Builders which can find
+        # the neighbors of many sites at once override this.
+        for curr_site in tqdm(sites):
+            yield curr_site[SITE_ID], self.get_neighbors(curr_site, struct)
 
     @abstractmethod
     def get_neighbors(self, curr_site: Dict, struct: PeriodicStructure) -> List[Tuple]:
@@ -95,6 +205,8 @@ class DistanceNeighborhoodBuilder(NeighborhoodBuilder):
     sites which are within some cutoff distance of eachother.
     """
 
+    translation_invariant = True
+
     def __init__(self, cutoff: float):
         """Instantiates a DistanceNeighborhoodBuilder
 
@@ -119,21 +231,16 @@ class DistanceNeighborhoodBuilder(NeighborhoodBuilder):
         NeighborGraph
             The resulting NeighborGraph
         """
-        nbs = []
-        curr_loc = curr_site[LOCATION]
-        curr_id = curr_site[SITE_ID]
-        for other_site in struct.sites():
-            other_id = other_site[SITE_ID]
-            if curr_id != other_id:
-                dist = struct.lattice.cartesian_periodic_distance(
-                    other_site[LOCATION],
-                    curr_loc,
-                )
+        _, nbs = next(_neighbors_in_range([curr_site], struct, self._in_range))
+        return nbs
 
-                if dist < self.cutoff:
-                    nbs.append((other_id, dist))
+    def _neighbors_of_sites(
+        self, sites: List[Dict], struct: PeriodicStructure
+    ) -> Iterator[Tuple[int, List[Tuple]]]:
+        return _neighbors_in_range(sites, struct, self._in_range)
 
-        return nbs
+    def _in_range(self, dists: np.ndarray) -> np.ndarray:
+        return dists < self.cutoff
 
 
 class AnnularNeighborhoodBuilder(NeighborhoodBuilder):
@@ -142,6 +249,8 @@ class AnnularNeighborhoodBuilder(NeighborhoodBuilder):
     is specified by a minimum (inner radius) and maximum (outer radius) distance.
     """
 
+    translation_invariant = True
+
     def __init__(self, inner_radius: float, outer_radius: float):
         """Instantiates an AnnularNeighborhoodBuilder
 
@@ -169,19 +278,16 @@ class AnnularNeighborhoodBuilder(NeighborhoodBuilder):
         NeighborGraph
             The resulting NeighborGraph
         """
-        nbs = []
-        for other_site in struct.sites():
-            if curr_site[SITE_ID] != other_site[SITE_ID]:
-                dist = pbc_diff_cart(
-                    np.array(other_site[LOCATION]),
-                    np.array(curr_site[LOCATION]),
-                    struct.lattice,
-                )
+        _, nbs = next(_neighbors_in_range([curr_site], struct, self._in_range))
+        return nbs
 
-                if self.inner_radius < dist < self.outer_radius:
-                    nbs.append((other_site[SITE_ID], dist))
+    def _neighbors_of_sites(
+        self, sites: List[Dict], struct: PeriodicStructure
+    ) -> Iterator[Tuple[int, List[Tuple]]]:
+        return _neighbors_in_range(sites, struct, self._in_range)
 
-        return nbs
+    def _in_range(self, dists: np.ndarray) -> np.ndarray:
+        return (self.inner_radius < dists) & (dists < self.outer_radius)
 
 
 class MotifNeighborhoodBuilder(NeighborhoodBuilder):
@@ -213,6 +319,8 @@ class MotifNeighborhoodBuilder(NeighborhoodBuilder):
     list B sites as their neighbors, and the B sites list A sites as their neighbors.
     """
 
+    translation_invariant = True
+
     def __init__(self, motif: List[List[float]]):
         """Instantiates the MotifNeighborhoodBuilder by a motif as described in
         the docstring for the class.
@@ -246,7 +354,8 @@ class MotifNeighborhoodBuilder(NeighborhoodBuilder):
         for neighbor_vec in self._motif:
             loc = tuple(s + n for s, n in zip(location, neighbor_vec))
             nb_id = struct.id_at(loc)
-            if nb_id != curr_site[SITE_ID]:
+            # offsets may lead past the edges of structures which are not periodic
+            if nb_id is not None and nb_id != curr_site[SITE_ID]:
                 nbs.append((nb_id, self.distances.get_dist(neighbor_vec)))
         return nbs
 
@@ -268,7 +377,9 @@ class SiteClassNeighborhoodBuilder(NeighborhoodBuilder):
 
     def get(self, struct: PeriodicStructure) -> Neighborhood:
         """Constructs the neighborhood of every site in the provided
-        structure, conditional on the class of each site.
+        structure, conditional on the class of each site. The connections found
+        by the builder of each class are merged directly into the neighbor table
+        of the SiteClassNeighborhood.
 
         Parameters
         ----------
@@ -280,9 +391,16 @@ class SiteClassNeighborhoodBuilder(NeighborhoodBuilder):
         Neighborhood
             The resulting Neighborhood object.
         """
-        nbhood_map = {}
+        edges = []
         for sclass, builder in self._builders.items():
-            nbhood = builder.get(struct, site_class=sclass)
-            nbhood_map[sclass] = nbhood
+            edges.extend(builder.get_edges(struct, site_class=sclass))
+
+        num_sites = max(struct.site_ids, default=-1) + 1
+        sources = np.array([edge[0] for edge in edges], dtype=np.int64)
+        order = np.argsort(sources, kind="stable")
+        counts = np.bincount(sources, minlength=num_sites)
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        indices = np.array([edges[idx][1] for idx in order], dtype=np.int64)
+        weights = np.array([edges[idx][2] for idx in order])
 
-        return SiteClassNeighborhood(struct, nbhood_map)
+        return SiteClassNeighborhood.from_csr(struct, indptr, indices, weights)
@@ -0,0 +1,405 @@
+"""A persistent on-disk cache of built neighborhoods.
+
+Building a neighborhood requires a neighbor search for every site of a
+structure, which for short simulations can take longer than the simulation
+itself. The NeighborhoodCache stores built neighborhoods as compressed sparse
+row arrays (see Neighborhood.to_csr) in a cache directory, keyed by a content
+hash of the structure and of the configuration of the builder, so that identical
+neighborhoods are only built once across processes and jobs. The total size of
+the directory is bounded by evicting the least recently used entries.
+
+The controllers and setups in pylattica obtain their neighborhoods with
+build_neighborhood, which uses the default cache if one has been set with
+set_default_cache, or if the PYLATTICA_NEIGHBORHOOD_CACHE environment
+variable names a cache directory.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .constants import LOCATION, SITE_CLASS
+from .neighborhood_builders import NeighborhoodBuilder
+from .neighborhoods import (
+    AbstractNeighborhood,
+    Neighborhood,
+    SiteClassNeighborhood,
+    StochasticNeighborhood,
+)
+from .periodic_structure import PeriodicStructure
+
+CACHE_DIR_ENV_VAR = "PYLATTICA_NEIGHBORHOOD_CACHE"
+DEFAULT_MAX_BYTES = 512 * 2**20
+
+# Incremented whenever the format of the cache entries changes
+_CACHE_VERSION = 2
+_SUFFIX = ".npz"
+
+_KIND_PLAIN = "plain"
+_KIND_STOCHASTIC = "stochastic"
+_KIND_SITE_CLASS = "site_class"
+
+
+def _canonical(obj: Any) -> Any:
+    # Converts a builder configuration into a JSON serializable form which does
+    # not depend on the order of dictionaries
+    if obj is None or isinstance(obj, (bool, int, str)):
+        return obj
+    if isinstance(obj, float):
+        return repr(obj)
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return _canonical(obj.tolist())
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(item) for item in obj]
+    if isinstance(obj, dict):
+        items = [[_canonical(k), _canonical(v)] for k, v in obj.items()]
+        return sorted(items, key=lambda item: json.dumps(item[0]))
+    if hasattr(obj, "__dict__"):
+        cls = type(obj)
+        return {
+            "@class": f"{cls.__module__}.{cls.__qualname__}",
+            "attrs": _canonical(vars(obj)),
+        }
+    return repr(obj)
+
+
+def structure_hash(struct: PeriodicStructure) -> str:
+    """Returns a hash of the content of a structure: its lattice, periodicity,
+    and the IDs, classes and locations of its sites.
+
+    Parameters
+    ----------
+    struct : PeriodicStructure
+        The structure.
+
+    Returns
+    -------
+    str
+        The hexadecimal hash.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(struct.lattice.matrix, dtype="<f8").tobytes())
+    digest.update(json.dumps(list(struct.lattice.periodic)).encode())
+
+    sites = struct.sites()
+    digest.update(np.array(struct.site_ids, dtype="<i8").tobytes())
+    digest.update(json.dumps([_canonical(s[SITE_CLASS]) for s in sites]).encode())
+    locations = np.array([s[LOCATION] for s in sites], dtype="<f8")
+    digest.update(np.ascontiguousarray(locations).tobytes())
+    return digest.hexdigest()
+
+
+def neighborhood_key(
+    builder: NeighborhoodBuilder, struct: PeriodicStructure, site_class: str = None
+) -> str:
+    """Returns the cache key of the neighborhood built by a builder for a
+    structure.
+
+    Parameters
+    ----------
+    builder : NeighborhoodBuilder
+        The builder.
+    struct : PeriodicStructure
+        The structure.
+    site_class : str, optional
+        The site class the neighborhood is built for, by default None
+
+    Returns
+    -------
+    str
+        The hexadecimal key.
+    """
+    config = json.dumps(
+        [_CACHE_VERSION, _canonical(builder), _canonical(site_class)]
+    ).encode()
+    return hashlib.sha256(structure_hash(struct).encode() + config).hexdigest()
+
+
+def _neighborhood_arrays(nbhood: AbstractNeighborhood) -> Optional[Dict]:
+    # Returns the arrays to store for a neighborhood, or None if it cannot be
+    # stored as arrays
+    if isinstance(nbhood, Neighborhood):
+        kind = _KIND_PLAIN
+        components = [nbhood]
+    elif isinstance(nbhood, SiteClassNeighborhood):
+        # stored as its merged neighbor table
+        kind = _KIND_SITE_CLASS
+        components = [nbhood]
+    elif isinstance(nbhood, StochasticNeighborhood):
+        kind = _KIND_STOCHASTIC
+        components = nbhood._components()  # pylint: disable=protected-access
+    else:
+        return None
+
+    arrays = {"kind": np.array(kind), "num_components": np.array(len(components))}
+    for idx, component in enumerate(components):
+        if not isinstance(component, (Neighborhood, SiteClassNeighborhood)):
+            return None
+        indptr, indices, weights = component.to_csr()
+        if weights.dtype == object:
+            return None
+        arrays[f"{idx}_indptr"] = indptr
+        arrays[f"{idx}_indices"] = indices
+        arrays[f"{idx}_weights"] = weights
+    return arrays
+
+
+def _neighborhood_from_arrays(
+    arrays, struct: PeriodicStructure
+) -> AbstractNeighborhood:
+    csrs = [
+        (arrays[f"{idx}_indptr"], arrays[f"{idx}_indices"], arrays[f"{idx}_weights"])
+        for idx in range(int(arrays["num_components"]))
+    ]
+
+    kind = str(arrays["kind"])
+    if kind == _KIND_SITE_CLASS:
+        return SiteClassNeighborhood.from_csr(struct, *csrs[0])
+
+    components = [Neighborhood.from_csr(*csr) for csr in csrs]
+    if kind == _KIND_PLAIN:
+        return components[0]
+    return StochasticNeighborhood(components)
+
+
+class NeighborhoodCache:
+    """Stores built neighborhoods in a directory, one compressed sparse row
+    archive per neighborhood. Plain, stochastic and site class neighborhoods
+    whose connection weights are numeric can be cached; other neighborhoods are
+    built every time.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Instantiates the NeighborhoodCache.
+
+        Parameters
+        ----------
+        cache_dir : str
+            The directory in which the neighborhoods are stored. It is created
+            if it does not exist.
+        max_bytes : int, optional
+            The maximum total size of the stored neighborhoods. When it is
+            exceeded, the least recently used neighborhoods are removed. By
+            default DEFAULT_MAX_BYTES
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _SUFFIX)
+
+    def get(
+        self,
+        builder: NeighborhoodBuilder,
+        struct: PeriodicStructure,
+        site_class: str = None,
+    ) -> AbstractNeighborhood:
+        """Returns the neighborhood built by a builder for a structure, loading
+        it from the cache if it has been built before, and otherwise building
+        and storing it.
+
+        Parameters
+        ----------
+        builder : NeighborhoodBuilder
+            The builder.
+        struct : PeriodicStructure
+            The structure.
+        site_class : str, optional
+            Build the neighborhood for a single class of sites (see
+            NeighborhoodBuilder.get), by default None
+
+        Returns
+        -------
+        AbstractNeighborhood
+            The neighborhood.
+        """
+        key = neighborhood_key(builder, struct, site_class)
+        nbhood = self.load(key, struct)
+        if nbhood is not None:
+            return nbhood
+
+        if site_class is None:
+            nbhood = builder.get(struct)
+        else:
+            nbhood = builder.get(struct, site_class=site_class)
+        self.store(key, nbhood)
+        return nbhood
+
+    def load(self, key: str, struct: PeriodicStructure) -> AbstractNeighborhood:
+        """Loads a stored neighborhood.
+
+        Parameters
+        ----------
+        key : str
+            The key of the neighborhood (see neighborhood_key).
+        struct : PeriodicStructure
+            The structure of the neighborhood.
+
+        Returns
+        -------
+        AbstractNeighborhood
+            The neighborhood, or None if it is not in the cache.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as arrays:
+                nbhood = _neighborhood_from_arrays(arrays, struct)
+        except (OSError, KeyError, ValueError):
+            return None
+
+        try:
+            # the modification time records when the entry was last used
+            os.utime(path)
+        except OSError:  # pragma: no cover
+            pass
+        return nbhood
+
+    def store(self, key: str, nbhood: AbstractNeighborhood) -> bool:
+        """Stores a neighborhood, then evicts the least recently used entries
+        if the cache has grown too large.
+
+        Parameters
+        ----------
+        key : str
+            The key of the neighborhood (see neighborhood_key).
+        nbhood : AbstractNeighborhood
+            The neighborhood.
+
+        Returns
+        -------
+        bool
+            Whether the neighborhood could be stored.
+        """
+        arrays = _neighborhood_arrays(nbhood)
+        if arrays is None:
+            return False
+
+        # written to a temporary file first, so that concurrent jobs never
+        # read a partially written entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self._path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.evict()
+        return True
+
+    def entries(self) -> List[str]:
+        """Returns the paths of the stored neighborhoods, least recently used
+        first.
+
+        Returns
+        -------
+        List[str]
+            The paths.
+        """
+        paths = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(_SUFFIX):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    paths.append((os.path.getmtime(path), path))
+                except OSError:  # pragma: no cover
+                    continue
+        return [path for _, path in sorted(paths)]
+
+    def size(self) -> int:
+        """Returns the total size of the stored neighborhoods in bytes.
+
+        Returns
+        -------
+        int
+            The size.
+        """
+        return sum(os.path.getsize(path) for path in self.entries())
+
+    def evict(self) -> None:
+        """Removes the least recently used neighborhoods until the total size of
+        the cache is at most max_bytes."""
+        entries = self.entries()
+        sizes = [os.path.getsize(path) for path in entries]
+        total = sum(sizes)
+        for path, size in zip(entries, sizes):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:  # pragma: no cover
+                continue
+            total -= size
+
+    def clear(self) -> None:
+        """Removes every stored neighborhood."""
+        for path in self.entries():
+            os.remove(path)
+
+
+_default_cache = {}
+
+
+def set_default_cache(cache: Optional[NeighborhoodCache]) -> None:
+    """Sets the cache used by build_neighborhood. Pass None to disable caching.
+
+    Parameters
+    ----------
+    cache : Optional[NeighborhoodCache]
+        The cache.
+    """
+    _default_cache["cache"] = cache
+
+
+def get_default_cache() -> Optional[NeighborhoodCache]:
+    """Returns the cache used by build_neighborhood. Unless set_default_cache has
+    been called, this is a cache in the directory named by the
+    PYLATTICA_NEIGHBORHOOD_CACHE environment variable, or None if it is unset.
+
+    Returns
+    -------
+    Optional[NeighborhoodCache]
+        The cache.
+    """
+    if "cache" in _default_cache:
+        return _default_cache["cache"]
+
+    cache_dir = os.environ.get(CACHE_DIR_ENV_VAR)
+    if cache_dir:
+        return NeighborhoodCache(cache_dir)
+    return None
+
+
+def build_neighborhood(
+    builder: NeighborhoodBuilder,
+    struct: PeriodicStructure,
+    cache: NeighborhoodCache = None,
+) -> AbstractNeighborhood:
+    """Builds the neighborhood of a structure, using a NeighborhoodCache if one
+    is given or a default cache is configured (see get_default_cache).
+
+    Parameters
+    ----------
+    builder : NeighborhoodBuilder
+        The builder.
+    struct : PeriodicStructure
+        The structure.
+    cache : NeighborhoodCache, optional
+        The cache to use, by default the default cache
+
+    Returns
+    -------
+    AbstractNeighborhood
+        The neighborhood.
+    """
+    if cache is None:
+        cache = get_default_cache()
+    if cache is None:
+        return builder.get(struct)
+    return cache.get(builder, struct)
@@ -1,16 +1,215 @@
+from __future__ import annotations
+
 import random
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Any, List, Dict, Tuple
+import numpy as np
 import rustworkx as rx
+from scipy import sparse
 
+from .constants import SITE_CLASS, SITE_ID
 from .periodic_structure import PeriodicStructure
+from .rng import default_rng
 
 
 class AbstractNeighborhood(ABC):
+    def __init__(self) -> None:
+        # Matrices and colorings derived from the neighborhood, computed on demand
+        self._sparse_matrices: Dict[Tuple[str, bool], sparse.csr_matrix] = {}
+        self._color_classes: Dict[int, List[List[int]]] = {}
+
     @abstractmethod
     def neighbors_of(self, site_id: int, include_weights: bool = False) -> List[int]:
         pass  # pragma: no cover
 
+    def possible_neighbors_of(self, site_id: int) -> List[int]:
+        """Returns every site which could be returned as a neighbor of the
+        provided site. For deterministic neighborhoods, this is the same as
+        neighbors_of.
+
+        Parameters
+        ----------
+        site_id : int
+            The site for which possible neighbors should be retrieved
+
+        Returns
+        -------
+        List[int]
+            The IDs of the possible neighbors.
+        """
+        return self.neighbors_of(site_id)
+
+    def sample_neighbors(self, site_ids: List[int]) -> np.ndarray:
+        """Returns the neighbors of many sites at once, as a padded array with one
+        row per site. Rows are padded at the end with -1. For stochastic
+        neighborhoods, the neighborhood of every site is drawn independently, as
+        if neighbors_of had been called for each site.
+
+        Parameters
+        ----------
+        site_ids : List[int]
+            The sites for which neighbors should be retrieved.
+
+        Returns
+        -------
+        np.ndarray
+            The (M, max neighbor count) array of neighbor IDs.
+        """
+        return _pad([self.neighbors_of(site_id) for site_id in site_ids])
+
+    def neighbor_positions(self, site_ids: List[int]) -> np.ndarray:
+        """Returns the neighbors of many sites at once, like sample_neighbors, but
+        as positions in site_ids rather than site IDs, so that they index arrays
+        holding one value per site in the order of site_ids. Padding, and
+        neighbors which are not in site_ids, are given as -1.
+
+        Parameters
+        ----------
+        site_ids : List[int]
+            The sites for which neighbors should be retrieved.
+
+        Returns
+        -------
+        np.ndarray
+            The (M, max neighbor count) array of neighbor positions.
+        """
+        return site_positions(site_ids, self.sample_neighbors(site_ids))
+
+    def set_rng(self, rng: np.random.Generator) -> None:
+        """Sets the random number generator used by stochastic neighborhoods.
+        Deterministic neighborhoods ignore it.
+
+        Parameters
+        ----------
+        rng : np.random.Generator
+            The Generator.
+        """
+
+    @abstractmethod
+    def site_graph(self) -> rx.PyGraph:
+        pass  # pragma: no cover
+
+    def to_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the neighbor connections in compressed sparse row form (see
+        Neighborhood.to_csr). Only neighborhoods with a fixed set of neighbors
+        for every site provide this table.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray, np.ndarray]
+            The indptr, indices and weights arrays.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not provide a neighbor table"
+        )
+
+    def adjacency_matrix(self, weighted: bool = False) -> sparse.csr_matrix:
+        """Returns the neighborhood as a sparse adjacency matrix, with one row
+        and one column per site. Entry (i, j) is the weight of the connection
+        from site i to its neighbor j (e.g. their distance, for neighborhoods
+        built from an EuclideanDistanceMap), or 1 if weighted is False. Update
+        rules which are linear combinations over neighbors can then be applied
+        to the whole lattice with a single sparse matrix-vector product. For
+        stochastic neighborhoods, this is the expected adjacency matrix, i.e.
+        the mean of the adjacency matrices of the components.
+
+        The matrix is computed once and cached, so it must not be modified.
+
+        Parameters
+        ----------
+        weighted : bool, optional
+            Whether the entries should be the connection weights rather than 1,
+            by default False
+
+        Returns
+        -------
+        sparse.csr_matrix
+            The adjacency matrix.
+        """
+        key = ("adjacency", weighted)
+        if key not in self._sparse_matrices:
+            self._sparse_matrices[key] = self._adjacency_matrix(weighted)
+        return self._sparse_matrices[key]
+
+    def laplacian(self, weighted: bool = False) -> sparse.csr_matrix:
+        """Returns the graph Laplacian of the neighborhood, L = D - A, where A is
+        the adjacency matrix (see adjacency_matrix) and D is the diagonal matrix
+        of its row sums. (L @ x)[i] is the sum over the neighbors j of site i of
+        A[i, j] * (x[i] - x[j]), so -L is the discrete diffusion operator.
+
+        The matrix is computed once and cached, so it must not be modified.
+
+        Parameters
+        ----------
+        weighted : bool, optional
+            Whether the connection weights should be used rather than 1, by
+            default False
+
+        Returns
+        -------
+        sparse.csr_matrix
+            The Laplacian.
+        """
+        key = ("laplacian", weighted)
+        if key not in self._sparse_matrices:
+            adjacency = self.adjacency_matrix(weighted)
+            degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+            self._sparse_matrices[key] = (sparse.diags(degrees) - adjacency).tocsr()
+        return self._sparse_matrices[key]
+
+    def _adjacency_matrix(self, weighted: bool) -> sparse.csr_matrix:
+        indptr, indices, weights = self.to_csr()
+        num_sites = len(indptr) - 1
+        if weighted:
+            data = np.asarray(weights, dtype=float)
+        else:
+            data = np.ones(len(indices))
+        # duplicate connections are summed
+        matrix = sparse.csr_matrix(
+            (data, indices, indptr), shape=(num_sites, num_sites)
+        )
+        matrix.sum_duplicates()
+        return matrix
+
+    def color_classes(self, distance: int = 1) -> List[List[int]]:
+        """Partitions the sites of the neighborhood into color classes such that
+        no two sites of the same class are within `distance` neighbor hops of
+        one another. With distance 1, no site shares a class with one of its
+        (possible) neighbors, so the update rule can be applied to every site of
+        a class at once as long as it only writes the site it is applied to. With
+        distance 2, the closed neighborhoods of the sites in a class are
+        disjoint, which also permits update rules that write neighboring sites.
+
+        The coloring is computed once per distance and cached.
+
+        Parameters
+        ----------
+        distance : int, optional
+            The minimum number of neighbor hops between sites of the same class,
+            by default 1
+
+        Returns
+        -------
+        List[List[int]]
+            The site IDs of each color class, in ascending order.
+        """
+        if distance < 1:
+            raise ValueError("The coloring distance must be at least 1")
+
+        if distance not in self._color_classes:
+            graph = _power_graph(self.site_graph(), distance)
+            coloring = rx.graph_greedy_color(
+                graph, strategy=rx.ColoringStrategy.Saturation
+            )
+            classes = {}
+            for site_id in sorted(coloring):
+                classes.setdefault(coloring[site_id], []).append(site_id)
+            self._color_classes[distance] = [
+                classes[color] for color in sorted(classes)
+            ]
+
+        return self._color_classes[distance]
+
 
 class Neighborhood(AbstractNeighborhood):
     """A specific Neighborhood. An instance of this classes corresponds
@@ -20,7 +219,9 @@ class Neighborhood(AbstractNeighborhood):
 
     def __init__(self, graph: rx.PyGraph):
         """Instantiates a NeighborhoodGraph."""
+        super().__init__()
         self._graph = graph
+        self._neighbor_array = None
 
     def neighbors_of(self, site_id: int, include_weights: bool = False) -> List[int]:
         """Retrieves a list of the IDs of the sites which are neighbors of the
@@ -40,17 +241,139 @@ class Neighborhood(AbstractNeighborhood):
         list[int]
             Either a list of site IDs, or a list of tuples of (site ID, connection weight)
         """
-        nbs = self._graph.neighbors(site_id)
+        # The neighbors are listed in the order in which their connections were
+        # added, which (unlike PyDiGraph.neighbors) does not change between calls
+        weighted_nbs = {}
+        for _, nb_id, weight in self._ordered_edges(site_id):
+            weighted_nbs.setdefault(nb_id, weight)
+
         if include_weights:
-            weighted_nbs = [
-                (nb_id, self._graph.get_edge_data(site_id, nb_id)) for nb_id in nbs
-            ]
-            return weighted_nbs
+            return list(weighted_nbs.items())
 
-        return list(nbs)
+        return list(weighted_nbs)
+
+    def _ordered_edges(self, site_id: int) -> List[Tuple[int, int, Any]]:
+        # out_edges lists the most recently added connection first
+        return self._graph.out_edges(site_id)[::-1]
+
+    def neighbor_array(self) -> np.ndarray:
+        """Returns the neighbors of every site as a padded array, with one row per
+        site, padded at the end with -1. The array is computed once and cached.
+
+        Returns
+        -------
+        np.ndarray
+            The (number of sites, max neighbor count) array of neighbor IDs.
+        """
+        if self._neighbor_array is None:
+            indptr, indices, _ = self.to_csr()
+            self._neighbor_array = _csr_to_padded(indptr, indices)
+        return self._neighbor_array
+
+    def sample_neighbors(self, site_ids: List[int]) -> np.ndarray:
+        return self.neighbor_array()[np.asarray(site_ids, dtype=np.int64)]
+
+    def site_graph(self) -> rx.PyGraph:
+        """Returns an undirected graph connecting each site to its neighbors.
+
+        Returns
+        -------
+        rx.PyGraph
+            The graph, with one node per site.
+        """
+        return self._graph.to_undirected(multigraph=False)
+
+    def to_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the neighbor connections in compressed sparse row form. The
+        neighbors of site i are indices[indptr[i]:indptr[i + 1]], in the order in
+        which the connections were added, which is also the order in which
+        neighbors_of returns them, with the corresponding connection weights in
+        the same slice of weights. Update rules which depend on the order of
+        neighbors (e.g. to break ties) therefore give the same results when they
+        gather neighbors with sample_neighbors. As in neighbors_of, repeated
+        connections to the same neighbor (e.g. through different periodic images
+        in a small structure) are listed once, with the weight of the first.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray, np.ndarray]
+            The indptr, indices and weights arrays.
+        """
+        num_sites = self._graph.num_nodes()
+        indptr = np.zeros(num_sites + 1, dtype=np.int64)
+        indices = []
+        weights = []
+        for site_id in range(num_sites):
+            weighted_nbs = self.neighbors_of(site_id, include_weights=True)
+            indptr[site_id + 1] = indptr[site_id] + len(weighted_nbs)
+            indices.extend(nb_id for nb_id, _ in weighted_nbs)
+            weights.extend(weight for _, weight in weighted_nbs)
+
+        return indptr, np.array(indices, dtype=np.int64), np.array(weights)
+
+    @classmethod
+    def from_csr(
+        cls, indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray
+    ) -> Neighborhood:
+        """Builds a Neighborhood from the arrays returned by to_csr.
+
+        Parameters
+        ----------
+        indptr : np.ndarray
+            The offsets of the neighbors of each site in indices.
+        indices : np.ndarray
+            The IDs of the neighbors of every site.
+        weights : np.ndarray
+            The weights of the connections to the neighbors.
+
+        Returns
+        -------
+        Neighborhood
+            The Neighborhood.
+        """
+        num_sites = len(indptr) - 1
+        graph = rx.PyDiGraph()
+        graph.add_nodes_from(range(num_sites))
+
+        sources = np.repeat(np.arange(num_sites), np.diff(indptr))
+        graph.add_edges_from(
+            list(zip(sources.tolist(), indices.tolist(), weights.tolist()))
+        )
+        return cls(graph)
 
 
 class MultiNeighborhood(AbstractNeighborhood):
+    @abstractmethod
+    def _components(self) -> List[Neighborhood]:
+        """Returns the neighborhoods from which this neighborhood is composed.
+
+        Returns
+        -------
+        List[Neighborhood]
+            The component neighborhoods.
+        """
+
+    def set_rng(self, rng: np.random.Generator) -> None:
+        for nbhood in self._components():
+            nbhood.set_rng(rng)
+
+    def site_graph(self) -> rx.PyGraph:
+        """Returns an undirected graph connecting each site to all of its
+        possible neighbors across the component neighborhoods.
+
+        Returns
+        -------
+        rx.PyGraph
+            The graph, with one node per site.
+        """
+        graph = rx.PyGraph(multigraph=False)
+        for nbhood in self._components():
+            component_graph = nbhood.site_graph()
+            while graph.num_nodes() < component_graph.num_nodes():
+                graph.add_node(None)
+            graph.add_edges_from_no_data(list(component_graph.edge_list()))
+        return graph
+
     def neighbors_of(self, site_id, include_weights: bool = False) -> List[int]:
         selected_neighborhood = self._get_nbhood(site_id)
 
@@ -63,24 +386,286 @@ class MultiNeighborhood(AbstractNeighborhood):
 
 
 class StochasticNeighborhood(MultiNeighborhood):
-    """A NeighborhoodGraph for stochastic neighborhoods."""
+    """A NeighborhoodGraph for stochastic neighborhoods. Each time the neighbors
+    of a site are requested, one of the component neighborhoods is chosen at
+    random. The choice is drawn from the Generator given to set_rng, or from the
+    global random module if none has been set.
+    """
 
-    def __init__(self, neighborhoods: List[Neighborhood]):
+    def __init__(
+        self, neighborhoods: List[Neighborhood], rng: np.random.Generator = None
+    ):
+        super().__init__()
         self._neighborhoods = neighborhoods
+        self._rng = rng
+        self._stacked = None
+
+    def set_rng(self, rng: np.random.Generator) -> None:
+        self._rng = rng
+        super().set_rng(rng)
 
     def _get_nbhood(self, _) -> List[int]:
-        return random.choice(self._neighborhoods)
+        if self._rng is None:
+            return random.choice(self._neighborhoods)
+        return self._neighborhoods[self._rng.integers(len(self._neighborhoods))]
+
+    def _adjacency_matrix(self, weighted: bool) -> sparse.csr_matrix:
+        matrices = [nbhood.adjacency_matrix(weighted) for nbhood in self._neighborhoods]
+        return (sum(matrices) / len(matrices)).tocsr()
+
+    def _stacked_neighbor_arrays(self) -> np.ndarray:
+        # The padded neighbor arrays of the components, padded to a common width
+        if self._stacked is None:
+            arrays = [nbhood.neighbor_array() for nbhood in self._neighborhoods]
+            width = max(arr.shape[1] for arr in arrays)
+            self._stacked = np.full((len(arrays), arrays[0].shape[0], width), -1)
+            for idx, arr in enumerate(arrays):
+                self._stacked[idx, :, : arr.shape[1]] = arr
+        return self._stacked
+
+    def sample_neighbors(self, site_ids: List[int]) -> np.ndarray:
+        """Returns the neighbors of many sites at once, choosing the neighborhood
+        of every site with a single draw from the Generator given to set_rng (or
+        a Generator seeded from the global random module, if none has been set).
+        Rows are padded at the end with -1.
+
+        Parameters
+        ----------
+        site_ids : List[int]
+            The sites for which neighbors should be retrieved.
+
+        Returns
+        -------
+        np.ndarray
+            The (M, max neighbor count) array of neighbor IDs.
+        """
+        if not all(isinstance(nb, Neighborhood) for nb in self._neighborhoods):
+            return super().sample_neighbors(site_ids)
+
+        rng = self._rng if self._rng is not None else default_rng()
+        site_ids = np.asarray(site_ids, dtype=np.int64)
+        choices = rng.integers(len(self._neighborhoods), size=len(site_ids))
+        return self._stacked_neighbor_arrays()[choices, site_ids]
+
+    def _components(self) -> List[Neighborhood]:
+        return self._neighborhoods
+
+    def possible_neighbors_of(self, site_id: int) -> List[int]:
+        nbs = set()
+        for nbhood in self._neighborhoods:
+            nbs.update(nbhood.neighbors_of(site_id))
+        return list(nbs)
 
 
 class SiteClassNeighborhood(MultiNeighborhood):
-    """A Neighborhood that distinguished neighbors of sites based on their class"""
+    """A Neighborhood that distinguished neighbors of sites based on their class
+
+    The neighbors of every site are taken from the neighborhood of its class and
+    merged into a single compressed sparse row table, so that the neighbors of a
+    site are one slice of an array regardless of its class, and the neighbors of
+    many sites can be gathered at once with sample_neighbors. The class of each
+    site is available as an integer code (see class_codes).
+    """
 
     def __init__(
         self, structure: PeriodicStructure, neighborhoods: Dict[str, Neighborhood]
     ):
+        """Merges the neighborhoods of each class of sites.
+
+        Parameters
+        ----------
+        structure : PeriodicStructure
+            The structure of the sites.
+        neighborhoods : Dict[str, Neighborhood]
+            The neighborhood of each class of sites. Sites whose class has no
+            neighborhood have no neighbors.
+        """
+        super().__init__()
+        self._set_classes(structure)
+        num_sites = len(self.class_codes)
+
+        counts = np.zeros(num_sites, dtype=np.int64)
+        class_csrs = []
+        for code, site_class in enumerate(self.classes):
+            nbhood = neighborhoods.get(site_class)
+            if nbhood is None:
+                continue
+            csr = nbhood.to_csr()
+            class_sites = np.flatnonzero(self.class_codes == code)
+            counts[class_sites] = np.diff(csr[0])[class_sites]
+            class_csrs.append((class_sites, csr))
+
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        indices = np.zeros(indptr[-1], dtype=np.int64)
+        weight_parts = []
+        for class_sites, (class_indptr, class_indices, class_weights) in class_csrs:
+            targets = _gather_rows(indptr, class_sites)
+            sources = _gather_rows(class_indptr, class_sites)
+            indices[targets] = class_indices[sources]
+            weight_parts.append((targets, class_weights[sources]))
+
+        numeric = all(w.dtype != object for _, w in weight_parts)
+        merged_weights = np.zeros(indptr[-1], dtype=float if numeric else object)
+        for targets, class_weights in weight_parts:
+            merged_weights[targets] = class_weights
+
+        self._set_csr(indptr, indices, merged_weights)
+
+    @classmethod
+    def from_csr(
+        cls,
+        structure: PeriodicStructure,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: np.ndarray,
+    ) -> SiteClassNeighborhood:
+        """Builds a SiteClassNeighborhood from a merged neighbor table, as
+        returned by to_csr.
+
+        Parameters
+        ----------
+        structure : PeriodicStructure
+            The structure of the sites.
+        indptr : np.ndarray
+            The offsets of the neighbors of each site in indices.
+        indices : np.ndarray
+            The IDs of the neighbors of every site.
+        weights : np.ndarray
+            The weights of the connections to the neighbors.
+
+        Returns
+        -------
+        SiteClassNeighborhood
+            The neighborhood.
+        """
+        nbhood = cls.__new__(cls)
+        AbstractNeighborhood.__init__(nbhood)
+        nbhood._set_classes(structure)
+        nbhood._set_csr(
+            np.asarray(indptr, dtype=np.int64),
+            np.asarray(indices, dtype=np.int64),
+            np.asarray(weights),
+        )
+        return nbhood
+
+    def _set_classes(self, structure: PeriodicStructure) -> None:
         self._struct = structure
-        self._nbhoods = neighborhoods
+        sites = structure.sites()
+        num_sites = max((site[SITE_ID] for site in sites), default=-1) + 1
+
+        self.classes: List[str] = []
+        codes = {}
+        self.class_codes = np.full(num_sites, -1, dtype=np.int64)
+        for site in sites:
+            site_class = site[SITE_CLASS]
+            if site_class not in codes:
+                codes[site_class] = len(self.classes)
+                self.classes.append(site_class)
+            self.class_codes[site[SITE_ID]] = codes[site_class]
+
+    def _set_csr(self, indptr, indices, weights) -> None:
+        self._indptr = indptr
+        self._indices = indices
+        self._weights = weights
+        # derived from the table on demand
+        self._neighbor_array = None
+        self._component_nbhoods = None
+
+    def to_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the merged neighbor table in compressed sparse row form (see
+        Neighborhood.to_csr).
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray, np.ndarray]
+            The indptr, indices and weights arrays.
+        """
+        return self._indptr, self._indices, self._weights
+
+    def neighbors_of(self, site_id: int, include_weights: bool = False) -> List[int]:
+        if site_id < 0 or site_id >= len(self._indptr) - 1:
+            return []
+
+        start, end = self._indptr[site_id], self._indptr[site_id + 1]
+        nbs = self._indices[start:end].tolist()
+        if include_weights:
+            return list(zip(nbs, self._weights[start:end].tolist()))
+        return nbs
+
+    def sample_neighbors(self, site_ids: List[int]) -> np.ndarray:
+        if self._neighbor_array is None:
+            self._neighbor_array = _csr_to_padded(self._indptr, self._indices)
+        return self._neighbor_array[np.asarray(site_ids, dtype=np.int64)]
+
+    def _components(self) -> List[Neighborhood]:
+        if self._component_nbhoods is None:
+            self._component_nbhoods = [
+                Neighborhood.from_csr(self._indptr, self._indices, self._weights)
+            ]
+        return self._component_nbhoods
+
+
+def _gather_rows(indptr: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    # Returns the positions of the entries of the given rows of a CSR table
+    counts = indptr[rows + 1] - indptr[rows]
+    row_starts = np.cumsum(counts) - counts
+    return np.repeat(indptr[rows] - row_starts, counts) + np.arange(counts.sum())
+
+
+def site_positions(site_ids: List[int], targets: np.ndarray) -> np.ndarray:
+    """Returns the position in site_ids of every site in targets.
+
+    Parameters
+    ----------
+    site_ids : List[int]
+        The site IDs, in the order which defines their positions.
+    targets : np.ndarray
+        An array of site IDs of any shape, e.g. padded with -1.
+
+    Returns
+    -------
+    np.ndarray
+        An array of the shape of targets, holding the position of each site, or
+        -1 for sites which are not in site_ids and for -1 entries.
+    """
+    site_ids = np.asarray(site_ids, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    size = max(site_ids.max(initial=-1), targets.max(initial=-1)) + 2
+    positions = np.full(size, -1, dtype=np.int64)
+    positions[site_ids] = np.arange(len(site_ids))
+    # -1 entries map onto the last entry of positions, which is never assigned
+    return positions[targets]
+
+
+def _csr_to_padded(indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    counts = np.diff(indptr)
+    padded = np.full((len(counts), max(counts.max(initial=0), 1)), -1)
+    cols = np.arange(len(indices)) - np.repeat(indptr[:-1], counts)
+    padded[np.repeat(np.arange(len(counts)), counts), cols] = indices
+    return padded
+
+
+def _power_graph(graph: rx.PyGraph, distance: int) -> rx.PyGraph:
+    if distance == 1:
+        return graph
+
+    power = rx.PyGraph(multigraph=False)
+    power.add_nodes_from([None] * graph.num_nodes())
+    for node in graph.node_indices():
+        reached = {node}
+        frontier = {node}
+        for _ in range(distance):
+            frontier = {
+                nb for fnode in frontier for nb in graph.neighbors(fnode)
+            } - reached
+            reached |= frontier
+        power.add_edges_from_no_data([(node, nb) for nb in reached if nb > node])
+    return power
+
 
-    def _get_nbhood(self, site_id: int) -> List[int]:
-        site_class = self._struct.site_class(site_id)
-        return self._nbhoods.get(site_class)
+def _pad(neighbor_lists: List[List[int]]) -> np.ndarray:
+    width = max((len(nbs) for nbs in neighbor_lists), default=0)
+    padded = np.full((len(neighbor_lists), max(width, 1)), -1)
+    for row, nbs in enumerate(neighbor_lists):
+        padded[row, : len(nbs)] = nbs
+    return padded
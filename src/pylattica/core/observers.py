@@ -0,0 +1,192 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List
+
+from .constants import SITES
+from .simulation_state import SimulationState
+
+
+class Observer(ABC):
+    """The base class for quantities that are computed while a simulation
+    runs, rather than after the fact from a SimulationResult. Observers are
+    passed to Runner.run and see every step of the simulation. Before the
+    updates of a step are applied, update is called with those updates and
+    the state they are about to be applied to, which lets observers maintain
+    running statistics from the old and new values of each changed site.
+    After the updates are applied, the value of the observer is recorded if
+    the step falls on the observer's recording interval.
+
+    Attributes
+    ----------
+    steps : List[int]
+        The steps at which the observable was recorded.
+    values : List
+        The recorded values of the observable, aligned with steps.
+    """
+
+    def __init__(self, interval: int = 1):
+        """Instantiates the Observer.
+
+        Parameters
+        ----------
+        interval : int, optional
+            The number of steps between recorded values, by default 1
+        """
+        self.interval = interval
+        self.steps: List[int] = []
+        self.values: List = []
+
+    def start(self, state: SimulationState) -> None:
+        """Clears any previously recorded values, initializes the observer
+        from the starting state of a run, and records the value at step 0.
+
+        Parameters
+        ----------
+        state : SimulationState
+            The state with which the run starts.
+        """
+        self.steps = []
+        self.values = []
+        self.reset(state)
+        self.record(0, state)
+
+    def reset(self, state: SimulationState) -> None:
+        """Initializes any running statistics from the starting state of a run.
+
+        Parameters
+        ----------
+        state : SimulationState
+            The state with which the run starts.
+        """
+
+    def update(self, updates: Dict, state: SimulationState) -> None:
+        """Updates running statistics with the updates of a single step. This
+        is called before the updates are applied to the state.
+
+        Parameters
+        ----------
+        updates : Dict
+            The updates of the step, formatted as {"SITES": ..., "GENERAL": ...}
+        state : SimulationState
+            The state before the updates are applied.
+        """
+
+    @abstractmethod
+    def value(self, state: SimulationState) -> Any:
+        pass  # pragma: no cover
+
+    def record(self, step_no: int, state: SimulationState) -> None:
+        """Records the current value of the observable.
+
+        Parameters
+        ----------
+        step_no : int
+            The step at which the value is recorded.
+        state : SimulationState
+            The state at that step.
+        """
+        self.steps.append(step_no)
+        self.values.append(self.value(state))
+
+
+class ChangedSiteCountObserver(Observer):
+    """Records the number of sites whose state actually changed in the most
+    recent step. Sites for which the controller returned updates identical to
+    their current values are not counted. The running total of site changes
+    over the whole run is available as the total attribute.
+    """
+
+    def __init__(self, interval: int = 1):
+        """Instantiates the ChangedSiteCountObserver.
+
+        Parameters
+        ----------
+        interval : int, optional
+            The number of steps between recorded values, by default 1
+        """
+        super().__init__(interval)
+        self.last_count = 0
+        self.total = 0
+
+    def reset(self, _: SimulationState) -> None:
+        self.last_count = 0
+        self.total = 0
+
+    def update(self, updates: Dict, state: SimulationState) -> None:
+        count = 0
+        for site_id, site_updates in updates.get(SITES, {}).items():
+            old_state = state.get_site_state(site_id)
+            if old_state is None:
+                count += 1
+                continue
+
+            for key, val in site_updates.items():
+                if old_state.get(key) != val:
+                    count += 1
+                    break
+
+        self.last_count = count
+        self.total += count
+
+    def value(self, _: SimulationState) -> int:
+        return self.last_count
+
+
+class ReducerObserver(Observer):
+    """Accumulates a custom quantity over the run. The reducer is called once
+    per step with the accumulated value, the updates of the step and the state
+    before those updates are applied, and returns the new accumulated value.
+    """
+
+    def __init__(
+        self,
+        reducer: Callable[[Any, Dict, SimulationState], Any],
+        initial_value: Any = 0,
+        interval: int = 1,
+    ):
+        """Instantiates the ReducerObserver.
+
+        Parameters
+        ----------
+        reducer : Callable[[Any, Dict, SimulationState], Any]
+            The function which folds the updates of one step into the accumulated value.
+        initial_value : Any, optional
+            The accumulated value at the start of a run, by default 0
+        interval : int, optional
+            The number of steps between recorded values, by default 1
+        """
+        super().__init__(interval)
+        self._reducer = reducer
+        self._initial_value = initial_value
+        self.accumulated = initial_value
+
+    def reset(self, _: SimulationState) -> None:
+        self.accumulated = self._initial_value
+
+    def update(self, updates: Dict, state: SimulationState) -> None:
+        self.accumulated = self._reducer(self.accumulated, updates, state)
+
+    def value(self, _: SimulationState) -> Any:
+        return self.accumulated
+
+
+class StateFunctionObserver(Observer):
+    """Records the value of an arbitrary function of the live state. The
+    function is only evaluated on recorded steps, so expensive observables
+    should be paired with a coarse interval.
+    """
+
+    def __init__(self, fn: Callable[[SimulationState], Any], interval: int = 1):
+        """Instantiates the StateFunctionObserver.
+
+        Parameters
+        ----------
+        fn : Callable[[SimulationState], Any]
+            The function to evaluate on the live state.
+        interval : int, optional
+            The number of steps between recorded values, by default 1
+        """
+        super().__init__(interval)
+        self._fn = fn
+
+    def value(self, state: SimulationState) -> Any:
+        return self._fn(state)
@@ -12,6 +12,77 @@ VEC_OFFSET = 0.001
 DEFAULT_SITE_CLASS = "A"
 
 
+class Tiling:
+    """Records how a PeriodicStructure was built by PeriodicStructure.build_from.
+
+    The sites of a tiled structure are numbered cell by cell, in the order of
+    get_points_in_box over num_cells, and in the order of the motif within each
+    cell, so the ID of motif site m in the cell with index c is
+    c * motif_size + m. If every dimension of the lattice is periodic and
+    translating by one cell in each direction is a symmetry of the structure,
+    then every translated copy of a motif site has the same neighbors, shifted
+    by the same number of cells (see NeighborhoodBuilder.get).
+
+    Attributes
+    ----------
+    num_cells : Tuple[int]
+        The number of unit cells in each direction.
+    motif_size : int
+        The number of sites in each unit cell.
+    translatable : bool
+        Whether translating by one cell in each direction maps the structure
+        onto itself.
+    """
+
+    def __init__(self, num_cells: Tuple[int], motif_size: int, translatable: bool):
+        self.num_cells = tuple(int(n) for n in num_cells)
+        self.motif_size = motif_size
+        self.translatable = translatable
+
+    @property
+    def num_cell_total(self) -> int:
+        """The total number of unit cells."""
+        return int(np.prod(self.num_cells))
+
+    def cell_coords(self, site_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the cells and motif indices of sites.
+
+        Parameters
+        ----------
+        site_ids : np.ndarray
+            The site IDs.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            The (M, dim) array of the integer coordinates of the cell of each site,
+            and the index of each site in the motif.
+        """
+        cell_idxs, motif_idxs = np.divmod(np.asarray(site_ids), self.motif_size)
+        cells = np.stack(np.unravel_index(cell_idxs, self.num_cells), axis=-1)
+        return cells, motif_idxs
+
+    def site_ids(self, cells: np.ndarray, motif_idxs: np.ndarray) -> np.ndarray:
+        """Returns the IDs of the sites at given motif indices in given cells.
+        Cell coordinates outside of the structure are wrapped around it.
+
+        Parameters
+        ----------
+        cells : np.ndarray
+            The (M, dim) array of integer cell coordinates.
+        motif_idxs : np.ndarray
+            The indices of the sites in the motif.
+
+        Returns
+        -------
+        np.ndarray
+            The site IDs.
+        """
+        cells = np.mod(cells, self.num_cells)
+        cell_idxs = np.ravel_multi_index(tuple(cells.T), self.num_cells)
+        return cell_idxs * self.motif_size + np.asarray(motif_idxs)
+
+
 class PeriodicStructure:
     """
     Represents a periodic arrangement of sites. Assigns
@@ -25,6 +96,9 @@ class PeriodicStructure:
         The periodic lattice in which this structure exists
     dim : int
         The dimensionality of the structure
+    tiling : Tiling
+        How the structure was built from a unit cell, if it was built with
+        build_from, and None otherwise
     """
 
     @classmethod
@@ -79,25 +153,44 @@ class PeriodicStructure:
             site_motif = {DEFAULT_SITE_CLASS: site_motif}
 
         # these are in "fractional" coordinates
-        vec_coeffs = get_points_in_box([0 for _ in range(new_lattice.dim)], num_cells)
-        for vec_coeff_set in vec_coeffs:
-            if not frac_coords:  # convert lattice points to "cartesian coordinates"
-                point = lattice.matrix @ np.array(vec_coeff_set)
-            else:
-                point = np.array(vec_coeff_set)
-
-            for site_class, basis_vecs in site_motif.items():
-                for vec in basis_vecs:
-                    # if the motif is specified in cartesian coordinates, we're good here
-                    site_loc = tuple(point + np.array(vec))
-
-                    if (
-                        frac_coords
-                    ):  # convert lattice point back to cartesian coordinates
-                        site_loc = lattice.get_cartesian_coords(site_loc)
-
-                    # site_loc should be in cartesian coordinates at this point
-                    struct.add_site(site_class, site_loc)
+        vec_coeffs = np.array(
+            get_points_in_box([0 for _ in range(new_lattice.dim)], num_cells),
+            dtype=float,
+        ).reshape(-1, new_lattice.dim)
+        if not frac_coords:  # convert lattice points to "cartesian coordinates"
+            points = vec_coeffs @ lattice.matrix.T
+        else:
+            points = vec_coeffs
+
+        site_classes = []
+        basis_vecs = []
+        for site_class, vecs in site_motif.items():
+            for vec in vecs:
+                site_classes.append(site_class)
+                basis_vecs.append(vec)
+        basis_vecs = np.array(basis_vecs, dtype=float).reshape(-1, new_lattice.dim)
+
+        # one row for each motif site of each lattice point, in that order.
+        # if the motif is specified in cartesian coordinates, we're good here
+        site_locs = (points[:, np.newaxis, :] + basis_vecs).reshape(-1, new_lattice.dim)
+        if frac_coords:  # convert lattice point back to cartesian coordinates
+            site_locs = lattice.get_cartesian_coords(site_locs)
+
+        # site_locs should be in cartesian coordinates at this point
+        struct.add_sites(site_classes * len(points), site_locs)
+
+        # translating by one cell along each direction is a symmetry if the
+        # cells are laid out along the lattice vectors
+        unit_points = np.eye(lattice.dim)
+        if not frac_coords:
+            unit_points = unit_points @ lattice.matrix.T
+        else:
+            unit_points = lattice.get_cartesian_coords(unit_points)
+        struct.tiling = Tiling(
+            num_cells,
+            len(site_classes),
+            translatable=bool(np.allclose(unit_points, lattice.matrix)),
+        )
 
         return struct
 
@@ -116,6 +209,7 @@ class PeriodicStructure:
         self.site_ids = []
         self._location_lookup = {}
         self._offset_vector = np.array([VEC_OFFSET for _ in range(self.dim)])
+        self.tiling: Tiling = None
 
     def as_dict(self):
         copied = copy.deepcopy(self._sites)
@@ -137,6 +231,26 @@ class PeriodicStructure:
 
         return struct
 
+    def translatable_tiling(self) -> Tiling:
+        """Returns the tiling of this structure if every site is a translated copy
+        of a motif site with the same environment, i.e. if the structure was
+        built with build_from along the lattice vectors, has not been modified
+        since, and is periodic in every dimension.
+
+        Returns
+        -------
+        Tiling
+            The tiling, or None if translating neighborhoods is not valid.
+        """
+        tiling = self.tiling
+        if tiling is None or not tiling.translatable:
+            return None
+        if not all(self.lattice.periodic):
+            return None
+        if len(self._sites) != tiling.num_cell_total * tiling.motif_size:
+            return None
+        return tiling
+
     def _get_rounded_coords(self, location: Iterable[float]) -> Iterable[float]:
         return np.round(location, OFFSET_PRECISION)
 
@@ -185,6 +299,54 @@ class PeriodicStructure:
         self.site_ids.append(new_site_id)
         return new_site_id
 
+    def add_sites(self, site_classes: List[str], locations: np.ndarray) -> List[int]:
+        """Adds several sites to the structure at once. The coordinates of all
+        the sites are transformed together, which is much faster than adding
+        them one by one with add_site.
+
+        Parameters
+        ----------
+        site_classes : List[str]
+            The class of each of the sites to be added.
+        locations : np.ndarray
+            The (M, dim) array of the locations of the new sites in Cartesian
+            coordinates.
+
+        Returns
+        -------
+        List[int]
+            The IDs of the new sites.
+        """
+        locations = np.asarray(locations, dtype=float).reshape(-1, self.dim)
+        assert len(site_classes) == len(
+            locations
+        ), "A site class must be given for each location"
+
+        periodized = self.lattice.get_periodized_cartesian_coords(locations)
+        periodized_coords = self._get_rounded_coords(periodized)
+        offset_periodized_coords = self._coords_with_offset(periodized)
+
+        new_site_ids = []
+        for site_class, coords, lookup_row in zip(
+            site_classes, periodized_coords, offset_periodized_coords
+        ):
+            lookup_coords = tuple(lookup_row)
+            assert (
+                self._location_lookup.get(lookup_coords, None) is None
+            ), "That site is already occupied"
+
+            new_site_id = len(self._sites)
+            self._sites[new_site_id] = {
+                SITE_CLASS: site_class,
+                LOCATION: coords,
+                SITE_ID: new_site_id,
+            }
+            self._location_lookup[lookup_coords] = new_site_id
+            self.site_ids.append(new_site_id)
+            new_site_ids.append(new_site_id)
+
+        return new_site_ids
+
     def site_at(self, location: Tuple[float]) -> Dict:
         """Retrieves the site at a particular location. Uses float equality to check.
 
@@ -0,0 +1,223 @@
+import json
+import mmap
+import struct
+from typing import Dict, List
+
+import numpy as np
+from monty.json import MontyDecoder, MontyEncoder
+
+from .utils import format_diff
+
+ARCHIVE_MAGIC = b"PYLATRES"
+
+# index offset, number of diffs, number of keyframes, metadata offset,
+# metadata length, followed by the magic bytes
+_FOOTER = struct.Struct("<5q8s")
+
+
+def _encode(obj) -> bytes:
+    return json.dumps(obj, cls=MontyEncoder).encode()
+
+
+def _decode(blob):
+    # States are serialized with their @module and @class, and are decoded
+    # back into SimulationStates
+    return json.loads(bytes(blob).decode(), cls=MontyDecoder)
+
+
+def is_result_archive(fpath: str) -> bool:
+    """Checks whether a file is a result archive written by write_result_archive.
+
+    Parameters
+    ----------
+    fpath : str
+        The path of the file.
+
+    Returns
+    -------
+    bool
+        True if the file starts with the archive magic bytes.
+    """
+    with open(fpath, "rb") as f:
+        return f.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+
+
+def write_result_archive(result, fpath: str, keyframe_interval: int = 1000) -> str:
+    """Writes a result to an indexed archive file which can be opened lazily
+    with LazySimulationResult (see simulation_result).
+
+    The archive stores every diff as a separate JSON blob, followed by full
+    states (keyframes) at every keyframe_interval steps and at the last step,
+    and an index of the offsets of all blobs. Reading a step then only requires
+    decoding the nearest preceding keyframe and the diffs after it.
+
+    Parameters
+    ----------
+    result : SimulationResult
+        The result to write.
+    fpath : str
+        The path of the archive.
+    keyframe_interval : int, optional
+        The number of steps between keyframes, by default 1000
+
+    Returns
+    -------
+    str
+        The path of the archive.
+    """
+    num_diffs = len(result) - 1
+    diff_offsets: List[int] = []
+    keyframe_steps: List[int] = []
+    keyframe_offsets: List[int] = []
+
+    with open(fpath, "wb") as f:
+        f.write(ARCHIVE_MAGIC)
+
+        for diff in result.diffs():
+            diff_offsets.append(f.tell())
+            f.write(_encode(diff))
+        diff_offsets.append(f.tell())
+
+        live_state = result.initial_state.copy()
+        diffs = result.diffs()
+        for step_no in range(num_diffs + 1):
+            if step_no > 0:
+                live_state.batch_update(next(diffs))
+
+            if step_no % keyframe_interval == 0 or step_no == num_diffs:
+                keyframe_steps.append(step_no)
+                keyframe_offsets.append(f.tell())
+                f.write(_encode(live_state.as_dict()))
+        keyframe_offsets.append(f.tell())
+
+        index_offset = f.tell()
+        f.write(np.array(diff_offsets, dtype="<i8").tobytes())
+        f.write(np.array(keyframe_steps, dtype="<i8").tobytes())
+        f.write(np.array(keyframe_offsets, dtype="<i8").tobytes())
+
+        metadata = {
+            "termination_reason": result.termination_reason,
+            "output": None,
+        }
+        if num_diffs == 0 and result.output is not None:
+            metadata["output"] = result.output.as_dict()
+
+        meta_offset = f.tell()
+        meta_blob = _encode(metadata)
+        f.write(meta_blob)
+
+        f.write(
+            _FOOTER.pack(
+                index_offset,
+                num_diffs,
+                len(keyframe_steps),
+                meta_offset,
+                len(meta_blob),
+                ARCHIVE_MAGIC,
+            )
+        )
+
+    return fpath
+
+
+class _ArchiveDiffs:
+    """A read-only sequence of the diffs in an archive, decoded on access."""
+
+    def __init__(self, buffer: mmap.mmap, offsets: np.ndarray):
+        self._buffer = buffer
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx: int) -> Dict:
+        if idx < 0:
+            idx += len(self)
+        start, end = int(self._offsets[idx]), int(self._offsets[idx + 1])
+        return format_diff(_decode(self._buffer[start:end]))
+
+
+class ResultArchive:
+    """An archive written by write_result_archive, opened read-only.
+
+    The file is memory-mapped, and only its index and metadata are read when it
+    is opened. Diffs and keyframes are decoded on access.
+
+    Attributes
+    ----------
+    diffs : Sequence[Dict]
+        The diffs of the archived result, decoded when they are indexed.
+    keyframe_steps : np.ndarray
+        The step numbers of the stored keyframes, in ascending order.
+    termination_reason : str
+        The termination reason of the archived result.
+    output : SimulationState
+        The output of the archived result, if it recorded no history.
+    """
+
+    def __init__(self, fpath: str):
+        """Opens the archive.
+
+        Parameters
+        ----------
+        fpath : str
+            The path of the archive.
+
+        Raises
+        ------
+        ValueError
+            If the file is not a result archive.
+        """
+        with open(fpath, "rb") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._buffer[: len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+            raise ValueError(f"{fpath} is not a result archive")
+
+        (
+            index_offset,
+            num_diffs,
+            num_keyframes,
+            meta_offset,
+            meta_length,
+            _,
+        ) = _FOOTER.unpack_from(self._buffer, len(self._buffer) - _FOOTER.size)
+
+        def _read_index(offset, length):
+            return np.frombuffer(self._buffer, dtype="<i8", count=length, offset=offset)
+
+        diff_offsets = _read_index(index_offset, num_diffs + 1)
+        offset = index_offset + 8 * (num_diffs + 1)
+        self.keyframe_steps = _read_index(offset, num_keyframes)
+        offset += 8 * num_keyframes
+        self._keyframe_offsets = _read_index(offset, num_keyframes + 1)
+
+        self.diffs = _ArchiveDiffs(self._buffer, diff_offsets)
+
+        metadata = _decode(self._buffer[meta_offset : meta_offset + meta_length])
+        self.termination_reason = metadata["termination_reason"]
+        self.output = metadata["output"]
+
+    def keyframe(self, keyframe_idx: int):
+        """Decodes a keyframe.
+
+        Parameters
+        ----------
+        keyframe_idx : int
+            The index of the keyframe, i.e. its position in keyframe_steps.
+
+        Returns
+        -------
+        SimulationState
+            The state at the step of the keyframe.
+        """
+        start = int(self._keyframe_offsets[keyframe_idx])
+        end = int(self._keyframe_offsets[keyframe_idx + 1])
+        return _decode(self._buffer[start:end])
+
+    def close(self) -> None:
+        """Closes the memory map of the archive."""
+        self.diffs = None
+        self.keyframe_steps = None
+        self._keyframe_offsets = None
+        self._buffer.close()
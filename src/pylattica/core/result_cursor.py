@@ -0,0 +1,166 @@
+from typing import Dict
+
+from .simulation_result import SimulationResult
+from .simulation_state import SimulationState
+
+
+class ResultCursor:
+    """Walks through the steps of a SimulationResult in either direction.
+
+    The cursor keeps one materialized state. Moving forward applies the diffs
+    of the result to it, and moving backward undoes them with their inverses,
+    so moving by k steps costs O(k) diffs rather than a replay from the start
+    of the result. Inverses are taken from the result if it recorded them (see
+    the record_inverse option of Runner.run), and are otherwise computed and
+    cached by the cursor as it moves forward. When a step is requested whose
+    inverse is not known, or which is closer to a stored state of the result
+    (see SimulationResult.load_steps) than to the cursor, the cursor jumps to
+    the nearest stored state at or before the step and moves forward from there.
+
+    The state returned by the cursor is modified as the cursor moves. Copy it
+    (an O(1) operation) to keep a step.
+    """
+
+    def __init__(self, result: SimulationResult, step_no: int = 0):
+        """Instantiates the ResultCursor.
+
+        Parameters
+        ----------
+        result : SimulationResult
+            The result to walk through.
+        step_no : int, optional
+            The step at which the cursor starts, by default 0
+        """
+        self.result = result
+        self._inverses: Dict[int, Dict] = {}
+        self._jump_to(0)
+        self.seek(step_no)
+
+    @property
+    def step_no(self) -> int:
+        """The step at which the cursor currently is."""
+        return self._step_no
+
+    @property
+    def state(self) -> SimulationState:
+        """The state of the result at the current step."""
+        return self._state
+
+    def __len__(self) -> int:
+        return len(self.result)
+
+    def forward(self, num_steps: int = 1) -> SimulationState:
+        """Moves the cursor forward.
+
+        Parameters
+        ----------
+        num_steps : int, optional
+            The number of steps to move, by default 1
+
+        Returns
+        -------
+        SimulationState
+            The state at the new step.
+        """
+        return self._move_to(self._step_no + num_steps)
+
+    def backward(self, num_steps: int = 1) -> SimulationState:
+        """Moves the cursor backward.
+
+        Parameters
+        ----------
+        num_steps : int, optional
+            The number of steps to move, by default 1
+
+        Returns
+        -------
+        SimulationState
+            The state at the new step.
+        """
+        return self._move_to(self._step_no - num_steps)
+
+    def seek(self, step_no: int) -> SimulationState:
+        """Moves the cursor to a step.
+
+        Parameters
+        ----------
+        step_no : int
+            The step to move to. Negative values count from the end of the result.
+
+        Returns
+        -------
+        SimulationState
+            The state at the step.
+
+        Raises
+        ------
+        IndexError
+            If the step is outside of the result.
+        """
+        if step_no < 0:
+            step_no += len(self.result)
+        return self._move_to(step_no)
+
+    def _move_to(self, step_no: int) -> SimulationState:
+        num_steps = len(self.result)
+        if step_no < 0 or step_no >= num_steps:
+            raise IndexError(
+                f"Step {step_no} is outside of a result with {num_steps} steps"
+            )
+
+        base = self._nearest_stored_step(step_no)
+        jump_cost = step_no - base
+        if step_no < self._step_no:
+            can_move_back = self._can_move_back_to(step_no)
+            if jump_cost < self._step_no - step_no or not can_move_back:
+                self._jump_to(base)
+            else:
+                while self._step_no > step_no:
+                    self._step_back()
+        elif jump_cost < step_no - self._step_no:
+            self._jump_to(base)
+
+        while self._step_no < step_no:
+            self._step_forward()
+
+        return self._state
+
+    def _inverse(self, diff_idx: int) -> Dict:
+        inverse = self.result.inverse_diff(diff_idx)
+        if inverse is None:
+            inverse = self._inverses.get(diff_idx)
+        return inverse
+
+    def _can_move_back_to(self, step_no: int) -> bool:
+        return all(
+            self._inverse(diff_idx) is not None
+            for diff_idx in range(step_no, self._step_no)
+        )
+
+    def _nearest_stored_step(self, step_no: int) -> int:
+        # The initial state is always available as step 0
+        stored = self.result._stored_states  # pylint: disable=protected-access
+        return max((s for s in stored if s <= step_no), default=0)
+
+    def _jump_to(self, step_no: int) -> None:
+        if step_no == 0:
+            state = self.result.initial_state
+        else:
+            state = self.result._stored_states[  # pylint: disable=protected-access
+                step_no
+            ]
+        self._state = state.copy()
+        self._step_no = step_no
+
+    def _step_forward(self) -> None:
+        diff_idx = self._step_no
+        diff = self.result._diff(diff_idx)  # pylint: disable=protected-access
+        if self._inverse(diff_idx) is None:
+            self._inverses[diff_idx] = self._state.inverse_update(diff)
+        self._state.batch_update(diff)
+        self._step_no += 1
+
+    def _step_back(self) -> None:
+        diff_idx = self._step_no - 1
+        self._state.restore(self._inverse(diff_idx))
+        self._step_no -= 1
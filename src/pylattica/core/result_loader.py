@@ -0,0 +1,326 @@
+"""Reconstruction of the steps of a SimulationResult in parallel.
+
+Reconstructing steps means replaying diffs, which is inherently sequential.
+To spread the work over several processes, the diffs are divided into
+contiguous segments and reconstructed as a parallel prefix scan:
+
+1. Each worker composes the diffs of one segment into a single net diff.
+2. The parent applies the net diffs in order to obtain the state at the
+   start of every segment, which costs one diff application per segment.
+3. Each worker replays its segment from its start state, and returns the
+   states (or state arrays) at the requested interval.
+
+If the result already has keyframes (stored states, or the keyframes of an
+archive) close to the start of every segment, the segments start at those
+keyframes instead and the first two phases are skipped.
+"""
+
+import multiprocessing as mp
+import sys
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .compact_diff import ValueTable
+from .constants import GENERAL, SITES
+from .simulation_state import SimulationState
+
+_loader_globals = {}
+
+
+def _split_diff(diff: Dict) -> Tuple[Dict, Dict]:
+    if GENERAL in diff:
+        return diff.get(SITES, {}), diff[GENERAL]
+    return diff, {}
+
+
+def _segment_starts(result, num_diffs: int, num_segments: int) -> Tuple[list, bool]:
+    # Returns the first step of each segment, and whether all of them are
+    # keyframes of the result
+    num_segments = max(1, min(num_segments, num_diffs))
+    targets = [num_diffs * seg // num_segments for seg in range(num_segments)]
+    keyframes = result._keyframe_step_nos()  # pylint: disable=protected-access
+    segment_length = num_diffs / num_segments
+
+    starts = []
+    for target in targets:
+        preceding = [k for k in keyframes if k <= target]
+        starts.append(max(preceding))
+
+    near = all(t - s <= segment_length / 2 for t, s in zip(targets, starts))
+    if near and len(set(starts)) == len(starts):
+        return starts, True
+    return targets, False
+
+
+def _compose_segment(start: int, end: int, key: Any = None) -> Dict:
+    """Composes the diffs in [start, end) into one net diff. If a key is given,
+    only the values of that key are composed, as a map of site ID to value."""
+    result = _loader_globals["result"]
+    net_sites = {}
+    net_general = {}
+    for idx in range(start, end):
+        site_updates, general_updates = _split_diff(
+            result._diff(idx)  # pylint: disable=protected-access
+        )
+        if key is not None:
+            for site_id, updates in site_updates.items():
+                if key in updates:
+                    net_sites[site_id] = updates[key]
+            continue
+
+        net_general.update(general_updates)
+        for site_id, updates in site_updates.items():
+            prev = net_sites.get(site_id)
+            net_sites[site_id] = updates if prev is None else {**prev, **updates}
+
+    if key is not None:
+        return net_sites
+    return {SITES: net_sites, GENERAL: net_general}
+
+
+def _replay_states(
+    start: int, end: int, start_state: SimulationState, interval: int
+) -> List[Tuple[int, SimulationState]]:
+    result = _loader_globals["result"]
+    if start_state is None:
+        start_state = result._keyframe_state(start)  # pylint: disable=protected-access
+
+    state = start_state
+    stored = []
+    for idx in range(start, end):
+        result._apply_diff(state, idx)  # pylint: disable=protected-access
+        step_no = idx + 1
+        if step_no % interval == 0:
+            stored.append((step_no, state.copy()))
+    # The states are pickled together, so site states shared between them stay
+    # shared when they are returned to the parent
+    return stored
+
+
+def _state_codes(state: SimulationState, key: Any, table: ValueTable) -> np.ndarray:
+    codes = np.empty(len(_loader_globals["site_ids"]), dtype=np.int64)
+    for col, site_id in enumerate(_loader_globals["site_ids"]):
+        site_state = state.get_site_state(site_id)
+        val = None if site_state is None else site_state.get(key)
+        codes[col] = table.code(val)
+    return codes
+
+
+def _replay_codes(
+    start: int,
+    end: int,
+    start_codes: np.ndarray,
+    start_values: List[Any],
+    key: Any,
+    interval: int,
+) -> Tuple[np.ndarray, List[Any]]:
+    result = _loader_globals["result"]
+    columns = _loader_globals["columns"]
+
+    table = ValueTable()
+    for val in start_values:
+        table.code(val)
+
+    if start_codes is None:
+        start_state = result._keyframe_state(start)  # pylint: disable=protected-access
+        codes = _state_codes(start_state, key, table)
+    else:
+        codes = start_codes.copy()
+
+    rows = []
+    for idx in range(start, end):
+        site_updates, _ = _split_diff(
+            result._diff(idx)  # pylint: disable=protected-access
+        )
+        for site_id, updates in site_updates.items():
+            if key in updates:
+                col = columns.get(site_id)
+                if col is not None:
+                    codes[col] = table.code(updates[key])
+        if (idx + 1) % interval == 0:
+            rows.append(codes.copy())
+
+    if len(rows) == 0:
+        return np.zeros((0, len(codes)), dtype=np.int64), table.values(
+            np.arange(len(table))
+        )
+    return np.stack(rows), table.values(np.arange(len(table)))
+
+
+def _run_tasks(func, params: List[list], workers: int) -> list:
+    if workers == 1 or len(params) <= 1 or sys.platform.startswith("win"):
+        return [func(*p) for p in params]
+
+    with mp.get_context("fork").Pool(min(workers, len(params))) as pool:
+        return pool.starmap(func, params)
+
+
+def _num_workers(workers: int) -> int:
+    if workers is None:
+        return mp.cpu_count()
+    return workers
+
+
+def load_states(
+    result, interval: int = 1, workers: int = None
+) -> Dict[int, SimulationState]:
+    """Reconstructs the states of a result at every interval steps, with the
+    diffs divided among worker processes.
+
+    Parameters
+    ----------
+    result : SimulationResult
+        The result to reconstruct.
+    interval : int, optional
+        The interval between reconstructed steps, by default 1
+    workers : int, optional
+        The number of worker processes. If left unspecified, one worker for each
+        CPU will be used.
+
+    Returns
+    -------
+    Dict[int, SimulationState]
+        The reconstructed states, keyed by step number, including step 0.
+    """
+    workers = _num_workers(workers)
+    num_diffs = len(result) - 1
+    states = {0: result.initial_state.copy()}
+    if num_diffs == 0:
+        return states
+
+    _loader_globals["result"] = result
+    try:
+        starts, from_keyframes = _segment_starts(result, num_diffs, workers)
+        ends = starts[1:] + [num_diffs]
+
+        if from_keyframes:
+            start_states = [None] * len(starts)
+        else:
+            nets = _run_tasks(
+                _compose_segment,
+                [[s, e] for s, e in zip(starts[:-1], ends[:-1])],
+                workers,
+            )
+            start_states = [result.initial_state.copy()]
+            for net in nets:
+                start_state = start_states[-1].copy()
+                start_state.batch_update(net)
+                start_states.append(start_state)
+
+        segments = _run_tasks(
+            _replay_states,
+            [
+                [s, e, state, interval]
+                for s, e, state in zip(starts, ends, start_states)
+            ],
+            workers,
+        )
+    finally:
+        _loader_globals.clear()
+
+    for segment in segments:
+        states.update(segment)
+    return states
+
+
+def load_arrays(
+    result, key: Any, interval: int = 1, workers: int = None
+) -> Tuple[np.ndarray, List[Any], np.ndarray]:
+    """Reconstructs only the values of a single state key, at every interval
+    steps, as an array of integer codes with one row per step and one column per
+    site. The columns follow the sorted IDs of the sites in the initial state,
+    and sites without a value for the key are given the code of None. Codes
+    are numbered in order of first appearance in the array, read row by row,
+    so they do not depend on the number of workers.
+
+    Parameters
+    ----------
+    result : SimulationResult
+        The result to reconstruct.
+    key : Any
+        The state key whose values should be reconstructed, e.g. the phase key.
+    interval : int, optional
+        The interval between reconstructed steps, by default 1
+    workers : int, optional
+        The number of worker processes. If left unspecified, one worker for each
+        CPU will be used.
+
+    Returns
+    -------
+    Tuple[np.ndarray, List[Any], np.ndarray]
+        The reconstructed step numbers, the list of values indexed by code, and
+        the array of codes.
+    """
+    workers = _num_workers(workers)
+    num_diffs = len(result) - 1
+
+    site_ids = sorted(result.initial_state.site_ids())
+    _loader_globals["result"] = result
+    _loader_globals["site_ids"] = site_ids
+    _loader_globals["columns"] = {site_id: col for col, site_id in enumerate(site_ids)}
+    try:
+        table = ValueTable()
+        initial_codes = _state_codes(result.initial_state, key, table)
+        step_nos = [0]
+        blocks = [initial_codes[np.newaxis, :]]
+
+        if num_diffs > 0:
+            starts, from_keyframes = _segment_starts(result, num_diffs, workers)
+            ends = starts[1:] + [num_diffs]
+
+            if from_keyframes:
+                start_codes = [None] * len(starts)
+            else:
+                nets = _run_tasks(
+                    _compose_segment,
+                    [[s, e, key] for s, e in zip(starts[:-1], ends[:-1])],
+                    workers,
+                )
+                start_codes = [initial_codes]
+                columns = _loader_globals["columns"]
+                for net in nets:
+                    codes = start_codes[-1].copy()
+                    for site_id, val in net.items():
+                        col = columns.get(site_id)
+                        if col is not None:
+                            codes[col] = table.code(val)
+                    start_codes.append(codes)
+
+            start_values = table.values(np.arange(len(table)))
+            segments = _run_tasks(
+                _replay_codes,
+                [
+                    [s, e, codes, start_values, key, interval]
+                    for s, e, codes in zip(starts, ends, start_codes)
+                ],
+                workers,
+            )
+
+            for start, end, (rows, values) in zip(starts, ends, segments):
+                lookup = np.array([table.code(val) for val in values], dtype=np.int64)
+                blocks.append(lookup[rows])
+                step_nos.extend(
+                    step_no
+                    for step_no in range(start + 1, end + 1)
+                    if step_no % interval == 0
+                )
+    finally:
+        _loader_globals.clear()
+
+    # The table depends on the order in which the segments met the values, so
+    # the codes are renumbered in order of first appearance in the array
+    codes = np.concatenate(blocks)
+    used, first_seen = np.unique(codes, return_index=True)
+    order = used[np.argsort(first_seen)]
+    canonical = np.zeros(len(table), dtype=np.int64)
+    canonical[order] = np.arange(len(order))
+    codes = canonical[codes]
+
+    max_code = max(len(order) - 1, 0)
+    for dtype in [np.uint8, np.uint16, np.uint32]:
+        if max_code <= np.iinfo(dtype).max:
+            codes = codes.astype(dtype)
+            break
+
+    return np.array(step_nos), table.values(order), codes
@@ -0,0 +1,60 @@
+import random
+from typing import Union
+
+import numpy as np
+
+Seed = Union[int, np.random.SeedSequence]
+
+
+def seed_sequence(seed: Seed = None) -> np.random.SeedSequence:
+    """Returns a numpy SeedSequence for a seed. If no seed is given, the
+    sequence is derived from the global random and numpy.random modules,
+    so that seeding those modules continues to make unseeded runs
+    reproducible.
+
+    Parameters
+    ----------
+    seed : Seed, optional
+        An integer seed, or an existing SeedSequence, by default None
+
+    Returns
+    -------
+    np.random.SeedSequence
+        The SeedSequence.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+
+    if seed is None:
+        seed = [random.getrandbits(64), int.from_bytes(np.random.bytes(8), "little")]
+
+    return np.random.SeedSequence(seed)
+
+
+def default_rng(seed: Seed = None) -> np.random.Generator:
+    """Returns a numpy Generator seeded from seed_sequence(seed).
+
+    Parameters
+    ----------
+    seed : Seed, optional
+        An integer seed, or an existing SeedSequence, by default None
+
+    Returns
+    -------
+    np.random.Generator
+        The Generator.
+    """
+    return np.random.default_rng(seed_sequence(seed))
+
+
+def seed_global_rngs(seed_seq: np.random.SeedSequence) -> None:
+    """Seeds the global random and numpy.random modules from a SeedSequence.
+
+    Parameters
+    ----------
+    seed_seq : np.random.SeedSequence
+        The sequence from which both seeds are drawn.
+    """
+    random_seed, np_seed = seed_seq.generate_state(2)
+    random.seed(int(random_seed))
+    np.random.seed(int(np_seed))
@@ -1,2 +1,6 @@
 from .synchronous_runner import SynchronousRunner
 from .asynchronous_runner import AsynchronousRunner
+from .sublattice_runner import SublatticeRunner
+from .kmc_runner import KineticMonteCarloRunner, RateTree
+from .ensemble_runner import EnsembleRunner, EnsembleResult
+from .parameter_sweep import ParameterSweep, SweepConfig
@@ -1,13 +1,24 @@
+import math
+import multiprocessing as mp
 from collections import deque
+from typing import Deque, List, Set, Tuple
 
+import numpy as np
 from tqdm import tqdm
 
 from ..basic_controller import BasicController
-from ..simulation_result import SimulationResult
+from ..neighborhoods import AbstractNeighborhood
+from ..rng import seed_sequence
 from ..simulation_state import SimulationState
+from ..utils import printif
 
 from .base_runner import Runner
-from .common import merge_updates
+from .common import merge_updates, seed_run
+from .step_recorder import StepRecorder
+
+mp_globals = {}
+
+NO_SITES_MESSAGE = "The controller provided no further sites to update"
 
 
 class AsynchronousRunner(Runner):
@@ -25,17 +36,54 @@ class AsynchronousRunner(Runner):
     a neighboring cell, it must be applied asynchronously because otherwise it's
     effects could interfere with the effects of neighboring applications. Specify
     that this mode should be used with the is_async initialization parameter.
+
+    The asynchronous runner can also be parallelized with `parallel = True`. In
+    this mode, sites are drawn in the usual order, and collected into batches
+    of sites whose neighborhoods (as given by the controller's get_neighborhood)
+    do not overlap. A site which conflicts with a site already in the batch, or
+    with a site deferred from it, is deferred to the start of the next batch. The
+    update rule is applied to every site of a batch concurrently in worker
+    processes, and the updates are recorded as one step per site in the order the
+    sites were drawn. Because the update rule at a site may only read and write
+    that site and its neighbors, updates within a batch commute, so each batch
+    has the same effect as updating its sites one after another. The trajectory
+    as a whole is not the one a serial run with the same draws would produce,
+    however: deferred sites are visited after later draws, and sites requested by
+    the controller as next sites are only queued once the batch is complete, so
+    they are visited after the rest of the batch rather than immediately.
     """
 
+    def __init__(
+        self, parallel: bool = False, workers: int = None, batch_size: int = None
+    ) -> None:
+        """Instantiates the AsynchronousRunner.
+
+        Parameters
+        ----------
+        parallel : bool, optional
+            If True, batches of non-overlapping sites are updated concurrently,
+            by default False
+        workers : int, optional
+            The number of worker processes used in parallel mode. If left unspecified,
+            one worker for each CPU will be created.
+        batch_size : int, optional
+            The largest number of sites updated concurrently in parallel mode. By
+            default, a quarter of the number of sites divided by the size of the
+            neighborhood of a site, and at least eight times the number of workers
+        """
+        self.parallel = parallel
+        self.workers = workers
+        self.batch_size = batch_size
+
     def _run(
         self,
         _: SimulationState,
-        result: SimulationResult,
-        live_state: SimulationState,
+        recorder: StepRecorder,
         controller: BasicController,
         num_steps: int,
         verbose: bool = False,
-    ) -> SimulationResult:
+        seed_seq: np.random.SeedSequence = None,
+    ) -> None:
         """Run the simulation for the prescribed number of steps. Recall that one
         asynchronous simulation step involves one application of the update rule,
         and one normal simulation step applies the update rule to every site.
@@ -44,19 +92,19 @@ class AsynchronousRunner(Runner):
         ----------
         initial_state : SimulationState
             The starting state for the simulation.
+        recorder : StepRecorder
+            The recorder which applies and stores the updates of each step.
         controller : BasicController
             The controller (a descendent of BasicController) which implements the update rule.
         num_steps : int
             The number of steps for which the simulation should run.
         verbose : bool, optional
             If True, debug information is printed during the run, by default False
-
-        Returns
-        -------
-        BasicSimulationResult
-            The result of the simulation.
+        seed_seq : np.random.SeedSequence, optional
+            The sequence from which the RNG streams of parallel tasks are spawned,
+            by default None
         """
-
+        live_state = recorder.live_state
         site_queue = deque()
 
         def _add_sites_to_queue():
@@ -71,6 +119,18 @@ class AsynchronousRunner(Runner):
         if len(site_queue) == 0:
             raise RuntimeError("Controller provided no sites to update, ABORTING")
 
+        if self.parallel:
+            self._run_parallel(
+                recorder,
+                controller,
+                num_steps,
+                site_queue,
+                _add_sites_to_queue,
+                seed_sequence(seed_seq),
+                verbose,
+            )
+            return
+
         for _ in tqdm(range(num_steps), disable=(not verbose)):
             site_id = site_queue.popleft()
 
@@ -84,15 +144,180 @@ class AsynchronousRunner(Runner):
                 state_updates = controller_response
 
             state_updates = merge_updates(state_updates, site_id=site_id)
-            live_state.batch_update(state_updates)
+            if recorder.apply_step(state_updates):
+                break
+
             site_queue.extend(next_sites)
-            result.add_step(state_updates)
 
             if len(site_queue) == 0:
                 _add_sites_to_queue()
 
             if len(site_queue) == 0:
+                recorder.stop(NO_SITES_MESSAGE)
                 break
 
-        result.set_output(live_state)
-        return result
+    def _run_parallel(
+        self,
+        recorder: StepRecorder,
+        controller: BasicController,
+        num_steps: int,
+        site_queue: Deque[int],
+        add_sites_to_queue,
+        seed_seq: np.random.SeedSequence,
+        verbose: bool = False,
+    ) -> None:
+        neighborhood = controller.get_neighborhood()
+        if neighborhood is None:
+            raise ValueError(
+                "Parallel asynchronous runs require a controller whose "
+                "get_neighborhood method returns the neighborhood of the update rule"
+            )
+
+        live_state = recorder.live_state
+
+        if self.workers is None:
+            PROCESSES = mp.cpu_count()
+        else:
+            PROCESSES = self.workers
+
+        batch_size = self.batch_size
+        if batch_size is None:
+            # Every batch costs a round trip to the pool, so batches should be
+            # large, but once they hold a sizeable fraction of the sites which fit
+            # without overlapping, most drawn sites are deferred.
+            footprint_size = len(neighborhood.possible_neighbors_of(site_queue[0])) + 1
+            batch_size = max(8 * PROCESSES, live_state.size // (4 * footprint_size))
+
+        printif(verbose, f"Running in parallel using {PROCESSES} workers")
+
+        global mp_globals  # pylint: disable=global-variable-not-assigned
+        mp_globals["controller"] = controller
+        mp_globals["state"] = live_state.copy()
+
+        steps_taken = 0
+
+        with mp.get_context("fork").Pool(PROCESSES) as pool:
+            progress = tqdm(total=num_steps, disable=(not verbose))
+            while steps_taken < num_steps:
+                batch, footprints = select_site_batch(
+                    site_queue,
+                    add_sites_to_queue,
+                    neighborhood,
+                    min(batch_size, num_steps - steps_taken),
+                )
+
+                if len(batch) == 0:
+                    recorder.stop(NO_SITES_MESSAGE)
+                    break
+
+                chunk_size = math.ceil(len(batch) / PROCESSES)
+                params = []
+                for chunk_start in range(0, len(batch), chunk_size):
+                    chunk = batch[chunk_start : chunk_start + chunk_size]
+                    read_sites = set().union(
+                        *footprints[chunk_start : chunk_start + chunk_size]
+                    )
+                    site_states = {
+                        sid: live_state.get_site_state(sid) for sid in read_sites
+                    }
+                    params.append(
+                        [
+                            chunk,
+                            site_states,
+                            live_state.get_general_state(),
+                            seed_seq.spawn(1)[0],
+                        ]
+                    )
+
+                stop = False
+                for chunk_results in pool.starmap(_async_batch_parallel, params):
+                    for site_id, state_updates, next_sites in chunk_results:
+                        state_updates = merge_updates(state_updates, site_id=site_id)
+                        steps_taken += 1
+                        progress.update(1)
+                        if recorder.apply_step(state_updates):
+                            stop = True
+                            break
+                        site_queue.extend(next_sites)
+                    if stop:
+                        break
+
+                if stop:
+                    break
+            progress.close()
+
+
+def select_site_batch(
+    site_queue: Deque[int],
+    add_sites_to_queue,
+    neighborhood: AbstractNeighborhood,
+    max_size: int,
+) -> Tuple[List[int], List[Set[int]]]:
+    """Pops sites from the queue, drawing new ones when it is empty, until a
+    batch of sites with pairwise disjoint closed neighborhoods is assembled.
+    Sites which overlap a site already in the batch, or a site deferred from
+    it, are deferred and returned to the front of the queue in order.
+
+    Parameters
+    ----------
+    site_queue : Deque[int]
+        The queue of sites to visit.
+    add_sites_to_queue : Callable
+        Adds newly drawn sites to the queue.
+    neighborhood : AbstractNeighborhood
+        The neighborhood which bounds the effect of each update.
+    max_size : int
+        The largest number of sites to include in the batch.
+
+    Returns
+    -------
+    Tuple[List[int], List[Set[int]]]
+        The sites of the batch, and the closed neighborhood of each.
+    """
+    batch = []
+    footprints = []
+    deferred = []
+    claimed = set()
+
+    while len(batch) < max_size and len(deferred) < max_size:
+        if len(site_queue) == 0:
+            add_sites_to_queue()
+        if len(site_queue) == 0:
+            break
+
+        site_id = site_queue.popleft()
+        footprint = set(neighborhood.possible_neighbors_of(site_id))
+        footprint.add(site_id)
+
+        if footprint.isdisjoint(claimed):
+            batch.append(site_id)
+            footprints.append(footprint)
+        else:
+            deferred.append(site_id)
+
+        claimed.update(footprint)
+
+    site_queue.extendleft(reversed(deferred))
+    return batch, footprints
+
+
+def _async_batch_parallel(
+    site_ids: List[int], site_states: dict, general_state: dict, seed_seq
+):  # pragma: no cover
+    controller: BasicController = mp_globals["controller"]
+    seed_run(controller, seed_seq, seed_globals=True)
+    state: SimulationState = mp_globals["state"]
+    state.batch_update(site_states)
+    state.set_general_state(general_state)
+
+    results = []
+    for site_id in site_ids:
+        controller_response = controller.get_state_update(site_id, state)
+        next_sites = []
+        if isinstance(controller_response, tuple):
+            state_updates, next_sites = controller_response
+        else:
+            state_updates = controller_response
+        results.append((site_id, state_updates, next_sites))
+
+    return results
@@ -1,6 +1,15 @@
+from typing import List
+
+import numpy as np
+
 from ..basic_controller import BasicController
+from ..convergence import ConvergenceCriterion
+from ..observers import Observer
+from ..rng import Seed, seed_sequence
 from ..simulation_result import SimulationResult
 from ..simulation_state import SimulationState
+from .common import seed_run
+from .step_recorder import StepRecorder
 
 
 class Runner:
@@ -38,6 +47,12 @@ class Runner:
         controller: BasicController,
         num_steps: int,
         verbose=False,
+        observers: List[Observer] = None,
+        record_history: bool = True,
+        convergence: List[ConvergenceCriterion] = None,
+        seed: Seed = None,
+        compress_diffs: bool = False,
+        record_inverse: bool = False,
     ) -> SimulationResult:
         """Run the simulation for the prescribed number of steps. Recall that one
         asynchronous simulation step involves one application of the update rule,
@@ -53,18 +68,88 @@ class Runner:
             The number of steps for which the simulation should run.
         verbose : bool, optional
             If True, debug information is printed during the run, by default False
+        observers : List[Observer], optional
+            Observers which compute observables from each step while the simulation
+            runs, by default None
+        record_history : bool, optional
+            If False, the diffs of each step are not stored in the result. Only the
+            initial and final states are kept, and observables should be collected
+            with observers, by default True
+        convergence : List[ConvergenceCriterion], optional
+            Criteria under which the simulation should stop before num_steps steps
+            have been taken. The reason for stopping early is stored as the
+            termination_reason of the result, by default None
+        seed : Seed, optional
+            An integer or numpy SeedSequence from which every RNG stream of the run
+            is derived: the Generator of the controller (see BasicController.rng),
+            the global random and numpy.random modules, and the streams of each
+            parallel task. Runs with the same seed (and number of workers) produce
+            identical results. If None, the seed is drawn from the global random
+            modules, which are then left unseeded, by default None
+        compress_diffs : bool, optional
+            If True, the diffs of each step are stored in the compact, columnar
+            encoding of CompactDiff, by default False
+        record_inverse : bool, optional
+            If True, the inverse of each step is stored in the result, so that it
+            can be stepped through backwards in O(diff) time with a ResultCursor,
+            by default False
 
         Returns
         -------
         BasicSimulationResult
             The result of the simulation.
         """
+        seed_globals = seed is not None
+        setup_seq, run_seq = seed_sequence(seed).spawn(2)
+        seed_run(controller, setup_seq, seed_globals)
+        controller.pre_run(initial_state)
+        return self._run_prepared(
+            initial_state,
+            controller,
+            num_steps,
+            verbose=verbose,
+            observers=observers,
+            record_history=record_history,
+            convergence=convergence,
+            seed_seq=run_seq,
+            compress_diffs=compress_diffs,
+            record_inverse=record_inverse,
+            seed_globals=seed_globals,
+        )
+
+    def _run_prepared(
+        self,
+        initial_state: SimulationState,
+        controller: BasicController,
+        num_steps: int,
+        verbose=False,
+        observers: List[Observer] = None,
+        record_history: bool = True,
+        convergence: List[ConvergenceCriterion] = None,
+        seed_seq: np.random.SeedSequence = None,
+        compress_diffs: bool = False,
+        record_inverse: bool = False,
+        seed_globals: bool = False,
+    ) -> SimulationResult:
+        # Runs the simulation for a controller whose pre_run has already been
+        # called, e.g. once for a whole ensemble of replicas.
+        controller_seq, runner_seq = seed_sequence(seed_seq).spawn(2)
+        seed_run(controller, controller_seq, seed_globals)
 
         result = controller.instantiate_result(initial_state.copy())
-        controller.pre_run(initial_state)
+        if compress_diffs:
+            result.compress = True
         live_state = initial_state.copy()
+        recorder = StepRecorder(
+            result,
+            live_state,
+            observers=observers,
+            record_history=record_history,
+            convergence=convergence,
+            record_inverse=record_inverse,
+        )
 
-        self._run(initial_state, result, live_state, controller, num_steps, verbose)
+        self._run(initial_state, recorder, controller, num_steps, verbose, runner_seq)
 
         result.set_output(live_state)
         return result
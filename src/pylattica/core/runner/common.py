@@ -1,24 +1,30 @@
-from ..constants import GENERAL, SITES
+import numpy as np
 
+from ..rng import seed_global_rngs
+from ..utils import merge_updates  # pylint: disable=unused-import
 
-def merge_updates(new_updates, curr_updates=None, site_id=None):
-    if new_updates is None:
-        return curr_updates
 
-    if curr_updates is None:
-        curr_updates = {SITES: {}, GENERAL: {}}
+def seed_run(
+    controller, seed_seq: np.random.SeedSequence, seed_globals: bool = False
+) -> None:
+    """Derives the RNG streams used while applying the update rule, in the main
+    process or in a worker, from a SeedSequence. The controller, and through it
+    its neighborhood, is given a numpy Generator. Optionally, the global random
+    and numpy.random modules are seeded too, for controllers which still use
+    them. Runners only do so in the main process when the caller passed a seed,
+    so that unseeded runs leave the global state of the caller alone, and in
+    worker processes, whose global state is their own.
 
-    # if this is a total
-    if SITES in new_updates or GENERAL in new_updates:
-        curr_updates[SITES].update(new_updates.get(SITES, {}))
-        curr_updates[GENERAL].update(new_updates.get(GENERAL, {}))
-    # if these updates only include site updates
-    elif set(map(type, new_updates.keys())) == {int}:
-        curr_updates[SITES].update(new_updates)
-    # if these updates only apply to a single site
-    elif site_id is not None:
-        curr_updates[SITES].update({site_id: new_updates})
-    else:
-        raise ValueError("Bad combination of arguments for merge_updates")
-
-    return curr_updates
+    Parameters
+    ----------
+    controller : BasicController
+        The controller which should receive a Generator.
+    seed_seq : np.random.SeedSequence
+        The sequence from which the streams are spawned.
+    seed_globals : bool, optional
+        Whether to seed the global random modules, by default False
+    """
+    controller_seq, global_seq = seed_seq.spawn(2)
+    controller.set_rng(np.random.default_rng(controller_seq))
+    if seed_globals:
+        seed_global_rngs(global_seq)
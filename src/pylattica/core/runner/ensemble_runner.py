@@ -0,0 +1,232 @@
+import copy
+import multiprocessing as mp
+import sys
+from typing import List, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from ..basic_controller import BasicController
+from ..convergence import ConvergenceCriterion
+from ..observers import Observer
+from ..rng import Seed, seed_sequence
+from ..simulation_result import SimulationResult
+from ..simulation_state import SimulationState
+from ..utils import printif
+from .base_runner import Runner
+from .common import seed_run
+from .synchronous_runner import SynchronousRunner
+
+_ensemble_globals = {}
+
+
+class EnsembleResult:
+    """The outcome of running an ensemble of replicas of a simulation.
+
+    Attributes
+    ----------
+    results : List[SimulationResult]
+        The result of each replica, in replica order.
+    observations : List[List[Tuple[List[int], List]]]
+        For each replica, the (steps, values) recorded by each observer, in the
+        order the observers were provided.
+    """
+
+    def __init__(
+        self,
+        results: List[SimulationResult],
+        observations: List[List[Tuple[List[int], List]]],
+    ):
+        self.results = results
+        self.observations = observations
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def observable(self, observer_idx: int = 0) -> Tuple[List[int], List[List]]:
+        """Returns the values recorded by one observer across every replica.
+
+        Parameters
+        ----------
+        observer_idx : int, optional
+            The position of the observer in the list passed to the run, by default 0
+
+        Returns
+        -------
+        Tuple[List[int], List[List]]
+            The steps recorded by the longest replica, and the list of values
+            recorded by each replica.
+        """
+        replica_obs = [obs[observer_idx] for obs in self.observations]
+        longest_steps = max((steps for steps, _ in replica_obs), key=len)
+        return longest_steps, [values for _, values in replica_obs]
+
+    def mean_observable(self, observer_idx: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """Averages a numeric observable over the replicas. If some replicas
+        stopped early, only the steps recorded by every replica are included.
+
+        Parameters
+        ----------
+        observer_idx : int, optional
+            The position of the observer in the list passed to the run, by default 0
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            The recorded steps and the mean value of the observable at each one.
+        """
+        steps, values = self.observable(observer_idx)
+        num_points = min(len(v) for v in values)
+        stacked = np.array([v[:num_points] for v in values], dtype=float)
+        return np.array(steps[:num_points]), stacked.mean(axis=0)
+
+
+class EnsembleRunner:
+    """Runs many independent replicas of the same simulation in parallel.
+
+    The controller's pre_run is called once, before the replicas are
+    distributed, so structures and neighborhoods built there or in the
+    controller's constructor are built a single time. Worker processes are
+    forked from the parent and share those objects read-only, without
+    pickling them.
+
+    Each replica is given its own RNG stream, spawned from a single
+    numpy SeedSequence. The Generator of the controller (and, if a seed was
+    given, the global random and numpy.random modules) are seeded from that
+    stream before the replica runs, so an ensemble run with the same seed
+    produces the same replicas regardless of the number of workers.
+    """
+
+    def __init__(self, runner: Runner = None, workers: int = None) -> None:
+        """Instantiates the EnsembleRunner.
+
+        Parameters
+        ----------
+        runner : Runner, optional
+            The runner used for each replica, by default a serial SynchronousRunner
+        workers : int, optional
+            The number of worker processes. If left unspecified, one worker for each
+            CPU will be created.
+        """
+        if runner is None:
+            runner = SynchronousRunner()
+
+        if getattr(runner, "parallel", False):
+            raise ValueError(
+                "EnsembleRunner parallelizes over replicas, so the runner for each "
+                "replica must not be parallel itself"
+            )
+
+        self.runner = runner
+        self.workers = workers
+
+    def run(
+        self,
+        initial_state: SimulationState,
+        controller: BasicController,
+        num_steps: int,
+        num_replicas: int,
+        seed: Seed = None,
+        verbose: bool = False,
+        observers: List[Observer] = None,
+        record_history: bool = True,
+        convergence: List[ConvergenceCriterion] = None,
+    ) -> EnsembleResult:
+        """Runs num_replicas replicas of the simulation.
+
+        Parameters
+        ----------
+        initial_state : SimulationState
+            The starting state shared by every replica.
+        controller : BasicController
+            The controller which implements the update rule.
+        num_steps : int
+            The number of steps for which each replica should run.
+        num_replicas : int
+            The number of replicas to run.
+        seed : Seed, optional
+            An integer or numpy SeedSequence from which the RNG stream of every
+            replica is derived. If None, the seed is drawn from the global random
+            modules, which are then left unseeded, by default None
+        verbose : bool, optional
+            If True, progress information is printed, by default False
+        observers : List[Observer], optional
+            Observers which are copied into every replica. Their recorded values are
+            collected in the observations of the EnsembleResult, by default None
+        record_history : bool, optional
+            If False, replicas do not store their diffs, and only the initial and
+            final states are returned for each, by default True
+        convergence : List[ConvergenceCriterion], optional
+            Criteria which are copied into every replica, by default None
+
+        Returns
+        -------
+        EnsembleResult
+            The results and observations of every replica.
+        """
+        seed_globals = seed is not None
+        seed_seq = seed_sequence(seed)
+        seed_run(controller, seed_seq.spawn(1)[0], seed_globals)
+        controller.pre_run(initial_state)
+
+        _ensemble_globals["runner"] = self.runner
+        _ensemble_globals["controller"] = controller
+        _ensemble_globals["initial_state"] = initial_state
+        _ensemble_globals["num_steps"] = num_steps
+        _ensemble_globals["observers"] = [] if observers is None else observers
+        _ensemble_globals["record_history"] = record_history
+        _ensemble_globals["convergence"] = [] if convergence is None else convergence
+        _ensemble_globals["seed_globals"] = seed_globals
+
+        seeds = seed_seq.spawn(num_replicas)
+
+        try:
+            if self.workers is None:
+                processes = mp.cpu_count()
+            else:
+                processes = self.workers
+
+            if processes == 1 or sys.platform.startswith("win"):
+                printif(verbose, f"Running {num_replicas} replicas in series.")
+                outcomes = [_run_replica(s) for s in tqdm(seeds, disable=(not verbose))]
+            else:
+                printif(
+                    verbose,
+                    f"Running {num_replicas} replicas using {processes} workers",
+                )
+                with mp.get_context("fork").Pool(processes) as pool:
+                    outcomes = list(
+                        tqdm(
+                            pool.imap(_run_replica, seeds),
+                            total=num_replicas,
+                            disable=(not verbose),
+                        )
+                    )
+        finally:
+            # the workers have their own copies, and the parent's should not
+            # outlive the run
+            _ensemble_globals.clear()
+
+        results = [res for res, _ in outcomes]
+        observations = [obs for _, obs in outcomes]
+        return EnsembleResult(results, observations)
+
+
+def _run_replica(seed_seq: np.random.SeedSequence):
+    observers = copy.deepcopy(_ensemble_globals["observers"])
+    convergence = copy.deepcopy(_ensemble_globals["convergence"])
+    runner = _ensemble_globals["runner"]
+    # The controller was prepared once for the whole ensemble by EnsembleRunner.run,
+    # so the replicas skip the preparation done by Runner.run
+    result = runner._run_prepared(  # pylint: disable=protected-access
+        _ensemble_globals["initial_state"],
+        _ensemble_globals["controller"],
+        _ensemble_globals["num_steps"],
+        observers=observers,
+        record_history=_ensemble_globals["record_history"],
+        convergence=convergence,
+        seed_seq=seed_seq,
+        seed_globals=_ensemble_globals["seed_globals"],
+    )
+    observations = [(obs.steps, obs.values) for obs in observers]
+    return result, observations
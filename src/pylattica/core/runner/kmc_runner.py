@@ -0,0 +1,226 @@
+import math
+from typing import List
+
+import numpy as np
+from tqdm import tqdm
+
+from ..constants import GENERAL, SIMULATION_TIME, SITES
+from ..kinetic_controller import KineticController
+from ..rng import seed_sequence
+from ..simulation_state import SimulationState
+
+from .base_runner import Runner
+from .common import merge_updates
+from .step_recorder import StepRecorder
+
+NO_EVENTS_MESSAGE = "No events with a nonzero rate remain"
+MAX_TIME_MESSAGE = "The maximum simulation time was reached"
+
+
+class RateTree:
+    """A Fenwick (binary indexed) tree over the rates of a fixed set of events.
+    It supports changing a single rate and selecting an event with probability
+    proportional to its rate, both in O(log N) time.
+
+    Because rates are updated by adding differences, rounding errors accumulate
+    in the partial sums. The tree is rebuilt from the stored rates after every
+    N updates to keep them bounded.
+    """
+
+    def __init__(self, rates: List[float]):
+        """Instantiates the RateTree.
+
+        Parameters
+        ----------
+        rates : List[float]
+            The initial, non-negative rate of each event.
+        """
+        self._rates = [float(rate) for rate in rates]
+        for rate in self._rates:
+            _check_rate(rate)
+        self._top_bit = 1 << (len(self._rates).bit_length() - 1) if self._rates else 0
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        size = len(self._rates)
+        tree = [0.0] + self._rates
+        for idx in range(1, size + 1):
+            parent = idx + (idx & -idx)
+            if parent <= size:
+                tree[parent] += tree[idx]
+        self._tree = tree
+        self._total = math.fsum(self._rates)
+        self._updates_since_rebuild = 0
+
+    def __len__(self) -> int:
+        return len(self._rates)
+
+    @property
+    def total(self) -> float:
+        """The sum of all rates."""
+        return self._total
+
+    def rate(self, idx: int) -> float:
+        """Returns the rate of an event.
+
+        Parameters
+        ----------
+        idx : int
+            The index of the event.
+
+        Returns
+        -------
+        float
+            Its rate.
+        """
+        return self._rates[idx]
+
+    def update(self, idx: int, rate: float) -> None:
+        """Sets the rate of an event.
+
+        Parameters
+        ----------
+        idx : int
+            The index of the event.
+        rate : float
+            The new, non-negative rate.
+        """
+        rate = float(rate)
+        _check_rate(rate)
+        delta = rate - self._rates[idx]
+        if delta == 0:
+            return
+
+        self._rates[idx] = rate
+        self._total += delta
+        self._updates_since_rebuild += 1
+        if self._updates_since_rebuild >= len(self._rates):
+            self._rebuild()
+            return
+
+        tree_idx = idx + 1
+        while tree_idx < len(self._tree):
+            self._tree[tree_idx] += delta
+            tree_idx += tree_idx & -tree_idx
+
+    def find(self, value: float) -> int:
+        """Returns the index of the event whose interval contains the provided
+        value, when the interval [0, total) is divided into consecutive intervals
+        with lengths equal to the rates. Drawing the value uniformly from
+        [0, total) selects each event with probability proportional to its rate.
+
+        Parameters
+        ----------
+        value : float
+            A value in [0, total).
+
+        Returns
+        -------
+        int
+            The index of the selected event.
+        """
+        pos = 0
+        step = self._top_bit
+        while step > 0:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] <= value:
+                pos = nxt
+                value -= self._tree[nxt]
+            step >>= 1
+
+        # Rounding can leave the value just past the last interval, or on an
+        # event with zero rate. Fall back to the nearest preceding event with a
+        # nonzero rate.
+        pos = min(pos, len(self._rates) - 1)
+        while pos > 0 and self._rates[pos] == 0:
+            pos -= 1
+        return pos
+
+
+def _check_rate(rate: float) -> None:
+    if not rate >= 0:
+        raise ValueError(f"Rates must be non-negative, got {rate}")
+
+
+class KineticMonteCarloRunner(Runner):
+    """Class for orchestrating the running of the simulation. This Runner
+    implements rejection-free kinetic Monte Carlo (the BKL or Gillespie algorithm),
+    and must be used with a KineticController.
+
+    The rates of every site are computed once at the start of the run and kept
+    in a RateTree. One simulation step consists of selecting a site with
+    probability proportional to its rate, applying the update rule there to carry
+    out an event, and recomputing the rates of the sites affected by the event.
+    Unlike the AsynchronousRunner, every step is an event, so no steps are
+    wasted on sites where nothing can happen.
+
+    After each event, the physical time is advanced by an exponentially
+    distributed waiting time with a mean of one over the total rate. The time is
+    stored in the general state under the SIMULATION_TIME key, and recorded with
+    the updates of every step. The event times and sites are drawn from a
+    Generator derived from the seed of the run. The run stops early when no event has a nonzero
+    rate, or when the next event would occur after `max_time`.
+    """
+
+    def __init__(self, max_time: float = None) -> None:
+        """Instantiates the KineticMonteCarloRunner.
+
+        Parameters
+        ----------
+        max_time : float, optional
+            The physical time at which the simulation stops, by default None
+        """
+        self.max_time = max_time
+
+    def _run(
+        self,
+        _: SimulationState,
+        recorder: StepRecorder,
+        controller: KineticController,
+        num_steps: int,
+        verbose: bool = False,
+        seed_seq: np.random.SeedSequence = None,
+    ) -> None:
+        if not isinstance(controller, KineticController):
+            raise ValueError("The KineticMonteCarloRunner requires a KineticController")
+
+        live_state = recorder.live_state
+        site_ids = live_state.site_ids()
+        site_idxs = {site_id: idx for idx, site_id in enumerate(site_ids)}
+        rates = RateTree(controller.get_rates(site_ids, live_state))
+        time = live_state.get_general_state().get(SIMULATION_TIME, 0.0)
+        rng = np.random.default_rng(seed_sequence(seed_seq))
+
+        for _ in tqdm(range(num_steps), disable=(not verbose)):
+            total_rate = rates.total
+            if total_rate <= 0:
+                recorder.stop(NO_EVENTS_MESSAGE)
+                break
+
+            time += -math.log(1.0 - rng.random()) / total_rate
+            if self.max_time is not None and time > self.max_time:
+                recorder.stop(MAX_TIME_MESSAGE)
+                break
+
+            site_id = site_ids[rates.find(rng.random() * total_rate)]
+            updates = merge_updates(
+                controller.get_state_update(site_id, live_state), site_id=site_id
+            )
+            if updates is None:
+                updates = {SITES: {}, GENERAL: {}}
+            updates[GENERAL][SIMULATION_TIME] = time
+
+            stop = recorder.apply_step(updates)
+
+            affected = [
+                affected_id
+                for affected_id in controller.get_affected_sites(site_id, updates)
+                if affected_id in site_idxs
+            ]
+            for affected_id, rate in zip(
+                affected, controller.get_rates(affected, live_state)
+            ):
+                rates.update(site_idxs[affected_id], rate)
+
+            if stop:
+                break
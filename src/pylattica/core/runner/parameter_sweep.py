@@ -0,0 +1,338 @@
+import hashlib
+import itertools
+import json
+import multiprocessing as mp
+import os
+import sys
+from typing import Callable, Dict, List
+
+import numpy as np
+from tqdm import tqdm
+
+from ..basic_controller import BasicController
+from ..periodic_structure import PeriodicStructure
+from ..rng import seed_global_rngs
+from ..simulation_result import SimulationResult
+from ..simulation_state import SimulationState
+from ..utils import printif
+from .base_runner import Runner
+from .synchronous_runner import SynchronousRunner
+
+_sweep_globals = {}
+
+
+class SweepConfig:
+    """A single configuration in a parameter sweep: the structure and starting
+    state of the simulation, how to build its controller, and how long to run it.
+
+    The controller is built by calling controller_factory(structure, **controller_params)
+    inside the process that runs the configuration. The factory is identified in
+    the cache key by its module and qualified name, so it should be a module-level
+    function or class rather than a lambda.
+    """
+
+    def __init__(
+        self,
+        structure: PeriodicStructure,
+        initial_state: SimulationState,
+        controller_factory: Callable[..., BasicController],
+        controller_params: Dict = None,
+        num_steps: int = 1,
+        seed: int = 0,
+    ):
+        """Instantiates the SweepConfig.
+
+        Parameters
+        ----------
+        structure : PeriodicStructure
+            The structure on which the simulation runs.
+        initial_state : SimulationState
+            The starting state of the simulation.
+        controller_factory : Callable[..., BasicController]
+            Builds the controller from the structure and the controller parameters.
+        controller_params : Dict, optional
+            JSON-serializable keyword arguments for the factory, by default None
+        num_steps : int, optional
+            The number of steps to run, by default 1
+        seed : int, optional
+            The seed from which the RNG streams used to build the controller and
+            to run the simulation are derived, by default 0
+        """
+        self.structure = structure
+        self.initial_state = initial_state
+        self.controller_factory = controller_factory
+        self.controller_params = {} if controller_params is None else controller_params
+        self.num_steps = num_steps
+        self.seed = seed
+
+    @classmethod
+    def grid(
+        cls,
+        structure: PeriodicStructure,
+        initial_state: SimulationState,
+        controller_factory: Callable[..., BasicController],
+        param_grid: Dict[str, List],
+        num_steps: int,
+        seeds: List[int] = (0,),
+    ) -> List["SweepConfig"]:
+        """Builds one configuration for every combination of the parameter values
+        and seeds provided.
+
+        Parameters
+        ----------
+        structure : PeriodicStructure
+            The structure shared by every configuration.
+        initial_state : SimulationState
+            The starting state shared by every configuration.
+        controller_factory : Callable[..., BasicController]
+            Builds the controller from the structure and the controller parameters.
+        param_grid : Dict[str, List]
+            A mapping of each controller parameter to the values it should take.
+        num_steps : int
+            The number of steps to run each configuration.
+        seeds : List[int], optional
+            The seeds with which every parameter combination is run, by default (0,)
+
+        Returns
+        -------
+        List[SweepConfig]
+            The configurations of the sweep.
+        """
+        names = list(param_grid.keys())
+        configs = []
+        for values in itertools.product(*param_grid.values()):
+            for seed in seeds:
+                configs.append(
+                    cls(
+                        structure,
+                        initial_state,
+                        controller_factory,
+                        dict(zip(names, values)),
+                        num_steps=num_steps,
+                        seed=seed,
+                    )
+                )
+        return configs
+
+    def spec(self) -> Dict:
+        """Returns a JSON-serializable description of everything that determines
+        the outcome of this configuration.
+
+        Returns
+        -------
+        Dict
+            The description.
+        """
+        factory = self.controller_factory
+        return {
+            "structure": self.structure.as_dict(),
+            "initial_state": self.initial_state.as_dict(),
+            "controller": f"{factory.__module__}.{factory.__qualname__}",
+            "controller_params": self.controller_params,
+            "num_steps": self.num_steps,
+            "seed": self.seed,
+        }
+
+
+def _stable_hash(spec: Dict) -> str:
+    encoded = json.dumps(spec, sort_keys=True, default=_json_default)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _json_default(obj):
+    # Encodes values which JSON does not support in a form which does not depend
+    # on where they live in memory, so that the keys of later sweeps match
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if callable(obj) and "<" not in getattr(obj, "__qualname__", "<"):
+        return f"{obj.__module__}.{obj.__qualname__}"
+    if hasattr(obj, "__dict__") and not callable(obj):
+        cls = type(obj)
+        return {"@class": f"{cls.__module__}.{cls.__qualname__}", "attrs": vars(obj)}
+    raise TypeError(
+        f"Cannot build a cache key from {obj!r}; sweep parameters must be JSON "
+        "serializable, numpy values, module-level functions or classes, or "
+        "objects whose attributes are"
+    )
+
+
+class ParameterSweep:
+    """Runs many simulation configurations over a process pool, caching each
+    result on disk.
+
+    Every configuration is keyed by a SHA-256 hash of its structure, initial
+    state, controller factory and parameters, seed and number of steps, as well
+    as the runner used. Configurations whose key is already present in the cache
+    directory are loaded from there rather than run again, so repeated sweeps
+    only compute the configurations that are new.
+    """
+
+    def __init__(
+        self,
+        runner: Runner = None,
+        cache_dir: str = None,
+        workers: int = None,
+        record_history: bool = True,
+    ):
+        """Instantiates the ParameterSweep.
+
+        Parameters
+        ----------
+        runner : Runner, optional
+            The runner used for each configuration, by default a serial
+            SynchronousRunner
+        cache_dir : str, optional
+            The directory in which results are cached. If None, nothing is cached,
+            by default None
+        workers : int, optional
+            The number of worker processes. If left unspecified, one worker for each
+            CPU will be created.
+        record_history : bool, optional
+            If False, only the initial and final states of each run are stored,
+            by default True
+        """
+        if runner is None:
+            runner = SynchronousRunner()
+
+        if getattr(runner, "parallel", False):
+            raise ValueError(
+                "ParameterSweep parallelizes over configurations, so its runner "
+                "must not be parallel itself"
+            )
+
+        self.runner = runner
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.record_history = record_history
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, config: SweepConfig) -> str:
+        """Returns the cache key of a configuration.
+
+        Parameters
+        ----------
+        config : SweepConfig
+            The configuration.
+
+        Returns
+        -------
+        str
+            A hex digest identifying the configuration and this sweep's runner.
+        """
+        spec = config.spec()
+        spec["runner"] = {
+            "class": type(self.runner).__name__,
+            "params": vars(self.runner),
+            "record_history": self.record_history,
+        }
+        return _stable_hash(spec)
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def is_cached(self, config: SweepConfig) -> bool:
+        """Checks whether the result of a configuration is already in the cache.
+
+        Parameters
+        ----------
+        config : SweepConfig
+            The configuration.
+
+        Returns
+        -------
+        bool
+            True if a cached result exists.
+        """
+        if self.cache_dir is None:
+            return False
+        return os.path.exists(self._cache_path(self.key(config)))
+
+    def run(
+        self, configs: List[SweepConfig], verbose: bool = False
+    ) -> List[SimulationResult]:
+        """Runs every configuration which is not already cached, and returns the
+        results of all of them.
+
+        Parameters
+        ----------
+        configs : List[SweepConfig]
+            The configurations to run.
+        verbose : bool, optional
+            If True, progress information is printed, by default False
+
+        Returns
+        -------
+        List[SimulationResult]
+            The result of each configuration, in the order provided.
+        """
+        results = [None for _ in configs]
+        keys = [self.key(config) for config in configs]
+        pending = []
+        for idx, key in enumerate(keys):
+            if self.cache_dir is not None and os.path.exists(self._cache_path(key)):
+                results[idx] = SimulationResult.from_file(self._cache_path(key))
+            else:
+                pending.append(idx)
+
+        printif(
+            verbose,
+            f"Found {len(configs) - len(pending)} cached results, "
+            f"running {len(pending)} configurations",
+        )
+
+        _sweep_globals["sweep"] = self
+        _sweep_globals["configs"] = configs
+        _sweep_globals["keys"] = keys
+
+        if self.workers is None:
+            processes = mp.cpu_count()
+        else:
+            processes = self.workers
+
+        if processes == 1 or len(pending) <= 1 or sys.platform.startswith("win"):
+            computed = [
+                _run_config(idx) for idx in tqdm(pending, disable=(not verbose))
+            ]
+        else:
+            with mp.get_context("fork").Pool(processes) as pool:
+                computed = list(
+                    tqdm(
+                        pool.imap(_run_config, pending),
+                        total=len(pending),
+                        disable=(not verbose),
+                    )
+                )
+
+        for idx, result in zip(pending, computed):
+            results[idx] = result
+
+        return results
+
+
+def _run_config(config_idx: int) -> SimulationResult:
+    sweep: ParameterSweep = _sweep_globals["sweep"]
+    config: SweepConfig = _sweep_globals["configs"][config_idx]
+
+    setup_seq, run_seq = np.random.SeedSequence(config.seed).spawn(2)
+    seed_global_rngs(setup_seq)
+    controller = config.controller_factory(config.structure, **config.controller_params)
+    result = sweep.runner.run(
+        config.initial_state,
+        controller,
+        config.num_steps,
+        record_history=sweep.record_history,
+        seed=run_seq,
+    )
+
+    if sweep.cache_dir is not None:
+        key = _sweep_globals["keys"][config_idx]
+        path = sweep._cache_path(key)  # pylint: disable=protected-access
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        result.to_file(tmp_path)
+        os.replace(tmp_path, path)
+
+    return result
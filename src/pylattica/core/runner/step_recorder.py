@@ -0,0 +1,113 @@
+from typing import Dict, List
+
+from ..constants import GENERAL, SITES
+from ..convergence import ConvergenceCriterion
+from ..observers import Observer
+from ..simulation_result import SimulationResult
+from ..simulation_state import SimulationState
+
+
+class StepRecorder:
+    """Applies the updates produced by a Runner to the live simulation state
+    and records them. Each step is offered to the observers of the run, and
+    is stored in the SimulationResult unless history recording is disabled.
+    The recorder also checks the convergence criteria of the run after each
+    step, and tells the Runner when the simulation should stop.
+    """
+
+    def __init__(
+        self,
+        result: SimulationResult,
+        live_state: SimulationState,
+        observers: List[Observer] = None,
+        record_history: bool = True,
+        convergence: List[ConvergenceCriterion] = None,
+        record_inverse: bool = False,
+    ):
+        """Instantiates the StepRecorder.
+
+        Parameters
+        ----------
+        result : SimulationResult
+            The result in which steps should be stored.
+        live_state : SimulationState
+            The state to which updates are applied as the simulation runs.
+        observers : List[Observer], optional
+            The observers that should see each step, by default None
+        record_history : bool, optional
+            If False, diffs are not stored in the result, by default True
+        convergence : List[ConvergenceCriterion], optional
+            Criteria under which the run should stop early, by default None
+        record_inverse : bool, optional
+            If True, the inverse of every recorded step is stored alongside it, so
+            that the result can be stepped through backwards, by default False
+        """
+        self.result = result
+        self.live_state = live_state
+        self.observers = [] if observers is None else observers
+        self.record_history = record_history
+        self.convergence = [] if convergence is None else convergence
+        self.record_inverse = record_inverse
+        self.step_no = 0
+
+        for observer in self.observers:
+            observer.start(live_state)
+
+        for criterion in self.convergence:
+            criterion.start(live_state)
+
+    def apply_step(self, updates: Dict) -> bool:
+        """Applies the updates of a single step to the live state, records them
+        in the result, and notifies the observers.
+
+        Parameters
+        ----------
+        updates : Dict
+            The updates of the step, formatted as {"SITES": ..., "GENERAL": ...},
+            or None if the controller produced no updates
+
+        Returns
+        -------
+        bool
+            True if a convergence criterion was met and the run should stop.
+        """
+        if updates is None:
+            updates = {SITES: {}, GENERAL: {}}
+
+        self.step_no += 1
+
+        for observer in self.observers:
+            observer.update(updates, self.live_state)
+
+        for criterion in self.convergence:
+            criterion.update(updates, self.live_state)
+
+        inverse = None
+        if self.record_history and self.record_inverse:
+            inverse = self.live_state.inverse_update(updates)
+
+        self.live_state.batch_update(updates)
+
+        if self.record_history:
+            self.result.add_step(updates, inverse=inverse)
+
+        for observer in self.observers:
+            if self.step_no % observer.interval == 0:
+                observer.record(self.step_no, self.live_state)
+
+        for criterion in self.convergence:
+            if criterion.is_converged(self.step_no, self.live_state):
+                self.stop(criterion.reason)
+                return True
+
+        return False
+
+    def stop(self, reason: str) -> None:
+        """Records the reason the run stopped before taking all of its steps.
+
+        Parameters
+        ----------
+        reason : str
+            A description of why the run stopped.
+        """
+        self.result.termination_reason = reason
@@ -0,0 +1,180 @@
+import math
+import multiprocessing as mp
+from typing import List
+
+import numpy as np
+from tqdm import tqdm
+
+from ..basic_controller import BasicController
+from ..rng import seed_sequence
+from ..simulation_state import SimulationState
+from ..utils import printif
+
+from .base_runner import Runner
+from .common import merge_updates, seed_run
+from .step_recorder import StepRecorder
+
+mp_globals = {}
+
+
+class SublatticeRunner(Runner):
+    """Class for orchestrating the running of the simulation. This Runner
+    implements the sublattice (or checkerboard) update strategy.
+
+    Before the run, the sites are partitioned into color classes using the
+    neighborhood returned by the controller's get_neighborhood method, such that
+    no two sites of the same class are neighbors (see
+    AbstractNeighborhood.color_classes). One simulation step is a sweep through
+    the color classes in order. The update rule is applied to every site of a class
+    against the current state, and the updates of the whole class are applied
+    together before the next class is visited. Each color class is recorded as a
+    separate step of the result, so that the recorded history, observers and
+    convergence criteria see every intermediate state. A run of `num_steps`
+    sweeps therefore records `num_steps` times the number of colors steps.
+
+    With `distance = 1` (the default), the update rule may read the neighbors of a
+    site but must only write the site itself, as in checkerboard Metropolis
+    updates of spin models. With `distance = 2`, the closed neighborhoods of the
+    sites in a class are disjoint, so update rules which also write neighboring
+    sites are allowed.
+
+    The updates of a color class are computed with the controller's
+    get_state_updates method, which controllers may override with a vectorized
+    implementation. Alternatively, specify `parallel = True` to split each class
+    across worker processes.
+    """
+
+    def __init__(
+        self, distance: int = 1, parallel: bool = False, workers: int = None
+    ) -> None:
+        """Instantiates the SublatticeRunner.
+
+        Parameters
+        ----------
+        distance : int, optional
+            The minimum number of neighbor hops between sites of the same color
+            class, by default 1
+        parallel : bool, optional
+            If True, the sites of each color class are distributed across worker
+            processes, by default False
+        workers : int, optional
+            The number of worker processes used in parallel mode. If left unspecified,
+            one worker for each CPU will be created.
+        """
+        self.distance = distance
+        self.parallel = parallel
+        self.workers = workers
+
+    def _run(
+        self,
+        _: SimulationState,
+        recorder: StepRecorder,
+        controller: BasicController,
+        num_steps: int,
+        verbose: bool = False,
+        seed_seq: np.random.SeedSequence = None,
+    ) -> None:
+        neighborhood = controller.get_neighborhood()
+        if neighborhood is None:
+            raise ValueError(
+                "Sublattice runs require a controller whose get_neighborhood "
+                "method returns the neighborhood of the update rule"
+            )
+
+        live_state = recorder.live_state
+        site_ids = set(live_state.site_ids())
+        color_classes = [
+            [site_id for site_id in color if site_id in site_ids]
+            for color in neighborhood.color_classes(self.distance)
+        ]
+        color_classes = [color for color in color_classes if len(color) > 0]
+        printif(verbose, f"Partitioned sites into {len(color_classes)} color classes")
+
+        if self.parallel:
+            self._run_parallel(
+                recorder,
+                controller,
+                num_steps,
+                color_classes,
+                seed_sequence(seed_seq),
+                verbose,
+            )
+            return
+
+        for _ in tqdm(range(num_steps), disable=(not verbose)):
+            for color in color_classes:
+                updates = controller.get_state_updates(color, live_state)
+                if recorder.apply_step(updates):
+                    return
+
+    def _run_parallel(
+        self,
+        recorder: StepRecorder,
+        controller: BasicController,
+        num_steps: int,
+        color_classes: List[List[int]],
+        seed_seq: np.random.SeedSequence,
+        verbose: bool = False,
+    ) -> None:
+        live_state = recorder.live_state
+        neighborhood = controller.get_neighborhood()
+
+        if self.workers is None:
+            PROCESSES = mp.cpu_count()
+        else:
+            PROCESSES = self.workers
+
+        printif(verbose, f"Running in parallel using {PROCESSES} workers")
+
+        global mp_globals  # pylint: disable=global-variable-not-assigned
+        mp_globals["controller"] = controller
+        mp_globals["state"] = live_state.copy()
+
+        chunked_classes = []
+        for color in color_classes:
+            chunk_size = math.ceil(len(color) / PROCESSES)
+            chunks = []
+            for chunk_start in range(0, len(color), chunk_size):
+                chunk = color[chunk_start : chunk_start + chunk_size]
+                read_sites = set(chunk)
+                for site_id in chunk:
+                    read_sites.update(neighborhood.possible_neighbors_of(site_id))
+                chunks.append((chunk, read_sites))
+            chunked_classes.append(chunks)
+
+        with mp.get_context("fork").Pool(PROCESSES) as pool:
+            for _ in tqdm(range(num_steps), disable=(not verbose)):
+                for chunks in chunked_classes:
+                    general_state = live_state.get_general_state()
+                    params = [
+                        [
+                            chunk,
+                            {sid: live_state.get_site_state(sid) for sid in read_sites},
+                            general_state,
+                            chunk_seed,
+                        ]
+                        for (chunk, read_sites), chunk_seed in zip(
+                            chunks, seed_seq.spawn(len(chunks))
+                        )
+                    ]
+
+                    updates = None
+                    for chunk_updates in pool.starmap(
+                        _sublattice_batch_parallel, params
+                    ):
+                        updates = merge_updates(chunk_updates, updates)
+
+                    if recorder.apply_step(updates):
+                        return
+
+
+def _sublattice_batch_parallel(
+    site_ids: List[int], site_states: dict, general_state: dict, seed_seq
+):  # pragma: no cover
+    controller: BasicController = mp_globals["controller"]
+    seed_run(controller, seed_seq, seed_globals=True)
+    state: SimulationState = mp_globals["state"]
+    state.batch_update(site_states)
+    state.set_general_state(general_state)
+
+    return controller.get_state_updates(site_ids, state)
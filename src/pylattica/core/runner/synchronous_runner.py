@@ -2,15 +2,17 @@ import math
 import multiprocessing as mp
 from typing import List
 
+import numpy as np
 from tqdm import tqdm
 
 from ..basic_controller import BasicController
-from ..simulation_result import SimulationResult
+from ..rng import seed_sequence
 from ..simulation_state import SimulationState
 from ..utils import printif
 
 from .base_runner import Runner
-from .common import merge_updates
+from .common import merge_updates, seed_run
+from .step_recorder import StepRecorder
 
 mp_globals = {}
 
@@ -31,7 +33,11 @@ class SynchronousRunner(Runner):
     dramatic improvements in speed for the simulation. Specify this using
     `parallel = True` during initialization. You can further specify the number
     of workers to use during parallel processing with the `workers` parameter.
-    If left unspecified, one worker for each CPU will be created.
+    If left unspecified, one worker for each CPU will be created. Each worker
+    applies the update rule to a fixed batch of sites and keeps its own copy of
+    the state, to which it applies the updates of every step. In every step it
+    receives its own RNG stream, spawned from the seed of the run, so parallel
+    runs with the same seed and number of workers are reproducible.
     """
 
     def __init__(self, parallel: bool = False, workers: int = None) -> None:
@@ -41,16 +47,18 @@ class SynchronousRunner(Runner):
     def _run(
         self,
         initial_state: SimulationState,
-        result: SimulationResult,
-        live_state: SimulationState,
+        recorder: StepRecorder,
         controller: BasicController,
         num_steps: int,
         verbose: bool = False,
+        seed_seq: np.random.SeedSequence = None,
     ):
+        seed_seq = seed_sequence(seed_seq)
+
         if self.parallel:
             global mp_globals  # pylint: disable=global-variable-not-assigned
             mp_globals["controller"] = controller
-            mp_globals["initial_state"] = initial_state
+            mp_globals["initial_state"] = recorder.live_state.copy()
 
             if self.workers is None:
                 PROCESSES = mp.cpu_count()
@@ -58,44 +66,73 @@ class SynchronousRunner(Runner):
                 PROCESSES = self.workers  # pragma: no cover
 
             printif(verbose, f"Running in parallel using {PROCESSES} workers")
-            num_sites = initial_state.size
-            chunk_size = math.ceil(num_sites / PROCESSES)
+            site_ids = initial_state.site_ids()
+            chunk_size = math.ceil(len(site_ids) / PROCESSES)
+            site_batches = [
+                site_ids[i : i + chunk_size]
+                for i in range(0, len(site_ids), chunk_size)
+            ]
             printif(
                 verbose,
-                f"Distributing {num_sites} update tasks to {PROCESSES} workers in chunks of {chunk_size}",
+                f"Distributing {len(site_ids)} update tasks to {PROCESSES} workers in chunks of {chunk_size}",
             )
-            with mp.get_context("fork").Pool(PROCESSES) as pool:
-                updates = {}
+
+            ctx = mp.get_context("fork")
+            connections = []
+            processes = []
+            for _ in site_batches:
+                conn, worker_conn = ctx.Pipe()
+                process = ctx.Process(target=_step_worker, args=(worker_conn,))
+                process.start()
+                worker_conn.close()
+                connections.append(conn)
+                processes.append(process)
+
+            try:
+                last_updates = None
                 for _ in tqdm(range(num_steps)):
                     updates = self._take_step_parallel(
-                        updates, pool, chunk_size=chunk_size
+                        connections,
+                        site_batches,
+                        last_updates,
+                        seed_seq=seed_seq,
                     )
-                    result.add_step(updates)
+                    if recorder.apply_step(updates):
+                        break
+                    last_updates = updates
+            finally:
+                for conn in connections:
+                    conn.send(None)
+                    conn.close()
+                for process in processes:
+                    process.join()
         else:
             printif(verbose, "Running in series.")
             for _ in tqdm(range(num_steps)):
-                updates = self._take_step(live_state, controller)
-                live_state.batch_update(updates)
-                result.add_step(updates)
-
-        result.set_output(live_state)
-        return result
-
-    def _take_step_parallel(self, updates: dict, pool, chunk_size) -> SimulationState:
-        params = []
-        site_ids = mp_globals["initial_state"].site_ids()
-        num_sites = len(site_ids)
-        site_batches = [
-            site_ids[i : i + chunk_size] for i in range(0, num_sites, chunk_size)
-        ]
+                updates = self._take_step(recorder.live_state, controller)
+                if recorder.apply_step(updates):
+                    break
 
-        for batch in site_batches:
-            params.append([batch, updates])
-
-        results = pool.starmap(_step_batch_parallel, params)
+    def _take_step_parallel(
+        self,
+        connections: list,
+        site_batches: List[List[int]],
+        last_updates: dict,
+        seed_seq: np.random.SeedSequence,
+    ) -> dict:
+        # Each worker owns one batch of sites for the whole run and keeps its
+        # own copy of the state, so it only needs the updates of the last step.
+        for conn, batch, batch_seed in zip(
+            connections, site_batches, seed_seq.spawn(len(site_batches))
+        ):
+            conn.send((last_updates, batch, batch_seed))
+
+        results = [conn.recv() for conn in connections]
         all_updates = None
-        for batch_update_res in results:
-            all_updates = merge_updates(all_updates, batch_update_res)
+        for succeeded, batch_update_res in results:
+            if not succeeded:
+                raise batch_update_res
+            all_updates = merge_updates(batch_update_res, all_updates)
 
         return all_updates
 
@@ -108,18 +145,22 @@ class SynchronousRunner(Runner):
         return updates
 
 
-def _step_batch_parallel(id_batch: List[int], last_updates: dict):  # pragma: no cover
+def _step_worker(conn) -> None:  # pragma: no cover
+    controller = mp_globals["controller"]
     state = mp_globals["initial_state"]
-    state.batch_update(last_updates)
-    return _step_batch(id_batch, state, mp_globals["controller"])
+    while (task := conn.recv()) is not None:
+        last_updates, id_batch, seed_seq = task
+        try:
+            if last_updates is not None:
+                state.batch_update(last_updates)
+            seed_run(controller, seed_seq, seed_globals=True)
+            conn.send((True, _step_batch(id_batch, state, controller)))
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            conn.send((False, exc))
+    conn.close()
 
 
 def _step_batch(
     id_batch: List[int], previous_state: SimulationState, controller: BasicController
 ):
-    batch_updates = None
-    for site_id in id_batch:
-        site_updates = controller.get_state_update(site_id, previous_state)
-        batch_updates = merge_updates(site_updates, batch_updates, site_id)
-
-    return batch_updates
+    return controller.get_state_updates(id_batch, previous_state)
@@ -1,10 +1,15 @@
 import tqdm
 
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
+import numpy as np
 from monty.serialization import dumpfn, loadfn
 import datetime
+from .compact_diff import CompactDiff, ValueTable
+from .constants import GENERAL, SITES
+from .result_archive import ResultArchive, is_result_archive, write_result_archive
 from .simulation_state import SimulationState
+from .utils import format_diff
 
 
 class SimulationResult:
@@ -14,34 +19,72 @@ class SimulationResult:
     ----------
     initial_state : SimulationState
         The state with which the simulation started.
+    termination_reason : str
+        If the run that produced this result stopped before taking all of its
+        steps, a description of why. None otherwise.
+    compress : bool
+        If True, the diffs of steps added from then on are stored as CompactDiffs,
+        which use far less memory than the nested dictionaries of updates. When
+        steps are reconstructed, they are applied column by column; the state of
+        every updated site is still replaced with a new dictionary, so replaying
+        them is not vectorized beyond skipping the dictionaries of updates. They
+        are decoded when the result is serialized.
     """
 
     @classmethod
     def from_file(cls, fpath):
+        """Loads a result from a file written by to_file or to_archive. Archives
+        are opened lazily (see LazySimulationResult).
+
+        Parameters
+        ----------
+        fpath : str
+            The path of the file.
+
+        Returns
+        -------
+        SimulationResult
+            The loaded result.
+        """
+        if is_result_archive(fpath):
+            return LazySimulationResult(fpath)
         return loadfn(fpath)
 
     @classmethod
     def from_dict(cls, res_dict):
         diffs = res_dict["diffs"]
-        res = cls(SimulationState.from_dict(res_dict["initial_state"]))
+        res = cls(
+            SimulationState.from_dict(res_dict["initial_state"]),
+            compress=res_dict.get("compress", False),
+        )
         for diff in diffs:
-            formatted = {int(k): v for k, v in diff.items() if k != "GENERAL"}
-            res.add_step(formatted)
+            res.add_step(format_diff(diff))
+
+        res.termination_reason = res_dict.get("termination_reason")
+        if res_dict.get("output") is not None:
+            res.set_output(SimulationState.from_dict(res_dict["output"]))
         return res
 
-    def __init__(self, starting_state: SimulationState):
+    def __init__(self, starting_state: SimulationState, compress: bool = False):
         """Initializes a SimulationResult with the specified starting_state.
 
         Parameters
         ----------
         starting_state : SimulationState
             The state with which the simulation started.
+        compress : bool, optional
+            If True, diffs are stored as CompactDiffs, by default False
         """
         self.initial_state = starting_state
+        self.compress = compress
+        self._value_table = ValueTable()
         self._diffs: list[dict] = []
+        self._inverse_diffs: list[dict] = []
         self._stored_states = {}
+        self.output = None
+        self.termination_reason = None
 
-    def add_step(self, updates: Dict[int, Dict]) -> None:
+    def add_step(self, updates: Dict[int, Dict], inverse: Dict = None) -> None:
         """Takes a set of updates as a dictionary mapping site IDs
         to the new values for various state parameters. For instance, if at the
         new step, my_state_attribute at site 23 changed to 12, updates would look
@@ -57,9 +100,58 @@ class SimulationResult:
         ----------
         updates : dict
             The changes associated with a new simulation step.
+        inverse : dict, optional
+            The inverse of the updates with respect to the previous step, as
+            produced by SimulationState.inverse_update. If provided, it is stored
+            so that the step can be undone without replaying the result, by
+            default None
         """
+        self._inverse_diffs.append(inverse)
+        if self.compress:
+            updates = CompactDiff.encode(updates, self._value_table)
         self._diffs.append(updates)
 
+    def _diff(self, idx: int) -> Dict:
+        diff = self._diffs[idx]
+        if isinstance(diff, CompactDiff):
+            return diff.decode(self._value_table)
+        return diff
+
+    def _apply_diff(self, state: SimulationState, idx: int) -> None:
+        # Compact diffs are applied column by column rather than decoded
+        diff = self._diffs[idx]
+        if isinstance(diff, CompactDiff):
+            diff.apply(state, self._value_table)
+        else:
+            state.batch_update(diff)
+
+    def inverse_diff(self, idx: int) -> Dict:
+        """Returns the stored inverse of a diff, if it was recorded.
+
+        Parameters
+        ----------
+        idx : int
+            The index of the diff, i.e. the diff which produces step idx + 1.
+
+        Returns
+        -------
+        Dict
+            The inverse, or None if it was not recorded.
+        """
+        return self._inverse_diffs[idx]
+
+    def diffs(self) -> Iterator[Dict]:
+        """Yields the updates recorded for each step after the first, in order,
+        in the format in which they were added.
+
+        Returns
+        -------
+        Iterator[Dict]
+            The updates of each recorded step.
+        """
+        for idx in range(len(self._diffs)):
+            yield self._diff(idx)
+
     def __len__(self) -> int:
         return len(self._diffs) + 1
 
@@ -72,9 +164,25 @@ class SimulationResult:
             The list of steps
         """
         live_state = self.initial_state.copy()
-        for diff in self._diffs:
+        for idx in range(len(self._diffs)):
             yield live_state
-            live_state.batch_update(diff)
+            self._apply_diff(live_state, idx)
+
+    def site_updates(self) -> Iterator[Dict[int, Dict]]:
+        """Yields the site updates recorded for each step after the first, in
+        order. Diffs that also carry general state updates are unwrapped so that
+        every yielded value maps site IDs to the updated state values.
+
+        Returns
+        -------
+        Iterator[Dict[int, Dict]]
+            The site updates of each recorded step.
+        """
+        for diff in self.diffs():
+            if GENERAL in diff or SITES in diff:
+                yield diff.get(SITES, {})
+            else:
+                yield diff
 
     @property
     def last_step(self) -> SimulationState:
@@ -85,6 +193,9 @@ class SimulationResult:
         SimulationState
             The last step of the simulation
         """
+        if len(self._diffs) == 0 and self.output is not None:
+            # the run that produced this result did not record its history
+            return self.output
         return self.get_step(len(self) - 1)
 
     @property
@@ -94,18 +205,83 @@ class SimulationResult:
     def set_output(self, step: SimulationState):
         self.output = step
 
-    def load_steps(self, interval=1):
+    def load_steps(
+        self, interval: int = 1, parallel: bool = False, workers: int = None
+    ) -> None:
+        """Reconstructs and stores the states at every interval steps, so that
+        get_step returns them without replaying the diffs.
+
+        Parameters
+        ----------
+        interval : int, optional
+            The interval between stored steps, by default 1
+        parallel : bool, optional
+            If True, the diffs are divided into segments which are reconstructed
+            in worker processes, starting from the stored states of the result
+            where possible (see result_loader.load_states), by default False
+        workers : int, optional
+            The number of worker processes used in parallel mode. If left
+            unspecified, one worker for each CPU will be used.
+        """
+        if parallel:
+            from .result_loader import load_states
+
+            for step_no, state in load_states(self, interval, workers).items():
+                self._stored_states.setdefault(step_no, state)
+            return
+
         live_state = self.initial_state.copy()
         self._stored_states[0] = self.initial_state.copy()
         for ud_idx in tqdm.tqdm(
             range(0, len(self._diffs)), desc="Constructing result from diffs"
         ):
             step_no = ud_idx + 1
-            live_state.batch_update(self._diffs[ud_idx])
+            self._apply_diff(live_state, ud_idx)
             if step_no % interval == 0 and self._stored_states.get(step_no) is None:
                 stored_state = live_state.copy()
                 self._stored_states[step_no] = stored_state
 
+    def load_arrays(
+        self, key, interval: int = 1, parallel: bool = False, workers: int = None
+    ):
+        """Reconstructs the values of a single state key, e.g. the phase of each
+        site, at every interval steps without materializing full states.
+
+        Parameters
+        ----------
+        key : Any
+            The state key whose values should be reconstructed.
+        interval : int, optional
+            The interval between reconstructed steps, by default 1
+        parallel : bool, optional
+            If True, the steps are reconstructed in worker processes, by default
+            False
+        workers : int, optional
+            The number of worker processes used in parallel mode. If left
+            unspecified, one worker for each CPU will be used.
+
+        Returns
+        -------
+        Tuple[np.ndarray, List[Any], np.ndarray]
+            The step numbers, the list of values indexed by code, and an array of
+            codes with one row per step and one column per site, in the order of
+            the sorted site IDs of the initial state.
+        """
+        from .result_loader import load_arrays
+
+        if not parallel:
+            workers = 1
+        return load_arrays(self, key, interval, workers)
+
+    def _keyframe_step_nos(self) -> List[int]:
+        # The steps whose states are available without replaying diffs
+        return sorted(set(self._stored_states) | {0})
+
+    def _keyframe_state(self, step_no: int) -> SimulationState:
+        if step_no == 0:
+            return self.initial_state.copy()
+        return self._stored_states[step_no].copy()
+
     def get_step(self, step_no) -> SimulationState:
         """Retrieves the step at the provided number.
 
@@ -126,16 +302,22 @@ class SimulationResult:
         else:
             state = self.initial_state.copy()
             for ud_idx in range(0, step_no):
-                state.batch_update(self._diffs[ud_idx])
+                self._apply_diff(state, ud_idx)
             return state
 
     def as_dict(self):
-        return {
+        d = {
             "initial_state": self.initial_state.as_dict(),
-            "diffs": self._diffs,
+            "diffs": list(self.diffs()),
+            "termination_reason": self.termination_reason,
+            "compress": self.compress,
             "@module": self.__class__.__module__,
             "@class": self.__class__.__name__,
         }
+        if len(self._diffs) == 0 and self.output is not None:
+            # without a history, the output is the only record of the final state
+            d["output"] = self.output.as_dict()
+        return d
 
     def to_file(self, fpath: str = None) -> None:
         """Serializes this result to the specified filepath.
@@ -152,3 +334,126 @@ class SimulationResult:
 
         dumpfn(self, fpath)
         return fpath
+
+    def to_archive(self, fpath: str, keyframe_interval: int = 1000) -> str:
+        """Writes this result to an indexed archive, which from_file opens lazily
+        without reading the whole file.
+
+        Parameters
+        ----------
+        fpath : str
+            The path of the archive.
+        keyframe_interval : int, optional
+            The number of steps between the full states stored in the archive,
+            by default 1000
+
+        Returns
+        -------
+        str
+            The path of the archive.
+        """
+        return write_result_archive(self, fpath, keyframe_interval=keyframe_interval)
+
+
+class LazySimulationResult(SimulationResult):
+    """A SimulationResult backed by an archive written by write_result_archive.
+
+    The archive is memory-mapped, and only its index is read when it is opened.
+    Diffs and keyframes are decoded on demand, so len(result), get_step and
+    last_step are cheap regardless of the size of the archive: get_step decodes
+    the nearest keyframe at or before the requested step and the diffs after it,
+    and the last step is always a keyframe. Lazy results are read-only.
+    """
+
+    def __init__(self, fpath: str):
+        """Opens the archive.
+
+        Parameters
+        ----------
+        fpath : str
+            The path of the archive.
+        """
+        super().__init__(None)
+        self.fpath = fpath
+        self._archive = ResultArchive(fpath)
+        self._diffs = self._archive.diffs
+        self.termination_reason = self._archive.termination_reason
+        self.output = self._archive.output
+
+    def close(self) -> None:
+        """Closes the memory map of the archive."""
+        self._diffs = None
+        self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __getstate__(self):
+        # memory maps cannot be pickled, so the archive is reopened instead
+        return {"fpath": self.fpath}
+
+    def __setstate__(self, state):
+        self.__init__(state["fpath"])
+
+    @property
+    def initial_state(self) -> SimulationState:
+        if self._initial_state is None:
+            self._initial_state = self._archive.keyframe(0)
+        return self._initial_state
+
+    @initial_state.setter
+    def initial_state(self, state: SimulationState) -> None:
+        self._initial_state = state
+
+    def _keyframe_step_nos(self) -> List[int]:
+        return sorted(
+            set(self._archive.keyframe_steps.tolist()) | set(self._stored_states)
+        )
+
+    def _keyframe_state(self, step_no: int) -> SimulationState:
+        stored = self._stored_states.get(step_no)
+        if stored is not None:
+            return stored.copy()
+        if step_no == 0:
+            return self.initial_state.copy()
+        keyframe_idx = int(np.searchsorted(self._archive.keyframe_steps, step_no))
+        return self._archive.keyframe(keyframe_idx)
+
+    def add_step(self, updates: Dict, inverse: Dict = None) -> None:
+        raise RuntimeError("Results loaded lazily from an archive are read-only")
+
+    def inverse_diff(self, idx: int) -> Dict:
+        return None
+
+    def get_step(self, step_no) -> SimulationState:
+        """Retrieves the step at the provided number, starting from the nearest
+        keyframe at or before it.
+
+        Parameters
+        ----------
+        step_no : int
+            The number of the step to return.
+
+        Returns
+        -------
+        SimulationState
+            The simulation state at the requested step.
+        """
+        stored = self._stored_states.get(step_no)
+        if stored is not None:
+            return stored
+
+        keyframe_steps = self._archive.keyframe_steps
+        keyframe_idx = int(np.searchsorted(keyframe_steps, step_no, side="right")) - 1
+        base = int(keyframe_steps[keyframe_idx])
+        if base == 0:
+            state = self.initial_state.copy()
+        else:
+            state = self._archive.keyframe(keyframe_idx)
+
+        for ud_idx in range(base, step_no):
+            self._apply_diff(state, ud_idx)
+        return state
@@ -1,11 +1,110 @@
 from __future__ import annotations
 
 import copy
-from typing import Dict, List
+from itertools import chain
+from typing import Dict, Iterator, List, Tuple, Union
 
 from .constants import SITE_ID, SITES, GENERAL
 from .periodic_structure import PeriodicStructure
 
+# The number of consecutive site IDs stored in each chunk of a _SiteMap
+_CHUNK_SIZE = 64
+
+
+class _SiteMap:
+    """A map of site IDs to site states, divided into chunks of consecutive site
+    IDs. Copies share their chunks with the original, and a chunk is only
+    duplicated when a site in it is changed, so copying costs one reference per
+    chunk and changing a site after copying costs at most one chunk.
+    """
+
+    def __init__(self, site_states: Union[Dict[int, Dict], _SiteMap] = None):
+        self._chunks: Dict[int, Dict[int, Dict]] = {}
+        # The chunks which are not shared with any copy of this map
+        self._owned = set()
+        self._size = 0
+        if isinstance(site_states, _SiteMap):
+            self._chunks = dict(site_states._chunks)
+            self._size = len(site_states)
+            # the chunks are now shared, so neither map may modify them in place
+            site_states._owned.clear()
+        elif site_states is not None:
+            for site_id, site_state in site_states.items():
+                self[site_id] = site_state
+
+    def _writable_chunk(self, chunk_idx: int) -> Dict[int, Dict]:
+        chunk = self._chunks.get(chunk_idx)
+        if chunk is None:
+            chunk = {}
+        elif chunk_idx in self._owned:
+            return chunk
+        else:
+            chunk = dict(chunk)
+        self._chunks[chunk_idx] = chunk
+        self._owned.add(chunk_idx)
+        return chunk
+
+    def get(self, site_id: int, default: Dict = None) -> Dict:
+        chunk = self._chunks.get(site_id // _CHUNK_SIZE)
+        if chunk is None:
+            return default
+        return chunk.get(site_id, default)
+
+    def __setitem__(self, site_id: int, site_state: Dict) -> None:
+        chunk = self._writable_chunk(site_id // _CHUNK_SIZE)
+        if site_id not in chunk:
+            self._size += 1
+        chunk[site_id] = site_state
+
+    def set_values(self, key, site_ids: List[int], values: List) -> None:
+        # Replaces the states of many sites with copies in which key is set,
+        # looking up the chunk only when consecutive site IDs leave it
+        chunk_idx = None
+        chunk = None
+        for site_id, val in zip(site_ids, values):
+            if site_id // _CHUNK_SIZE != chunk_idx:
+                chunk_idx = site_id // _CHUNK_SIZE
+                chunk = self._writable_chunk(chunk_idx)
+            old_state = chunk.get(site_id)
+            if old_state is None:
+                old_state = {SITE_ID: site_id}
+                self._size += 1
+            chunk[site_id] = {**old_state, key: val}
+
+    def pop(self, site_id: int, default: Dict = None) -> Dict:
+        chunk_idx = site_id // _CHUNK_SIZE
+        chunk = self._chunks.get(chunk_idx)
+        if chunk is None or site_id not in chunk:
+            return default
+        self._size -= 1
+        return self._writable_chunk(chunk_idx).pop(site_id)
+
+    def __contains__(self, site_id: int) -> bool:
+        return site_id in self._chunks.get(site_id // _CHUNK_SIZE, ())
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[int]:
+        return chain.from_iterable(self._chunks.values())
+
+    def keys(self) -> Iterator[int]:
+        return iter(self)
+
+    def values(self) -> Iterator[Dict]:
+        return chain.from_iterable(chunk.values() for chunk in self._chunks.values())
+
+    def items(self) -> Iterator[Tuple[int, Dict]]:
+        return chain.from_iterable(chunk.items() for chunk in self._chunks.values())
+
+    def copy(self) -> _SiteMap:
+        return _SiteMap(self)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, _SiteMap):
+            other = dict(other.items())
+        return dict(self.items()) == other
+
 
 class SimulationState:
     """Representation of the state during a single step of the simulation. This is essentially
@@ -14,11 +113,23 @@ class SimulationState:
 
     Additionally, there is a concept of general simulation state that is separate from the state
     of any specific site in the simulation.
+
+    Copies of a SimulationState share structure with the original (see copy). The
+    dictionaries storing the state of each site and the general state are never
+    modified in place; updating them replaces them with new dictionaries. The
+    site states are stored in chunks of consecutive site IDs, and a copy only
+    duplicates the chunks containing the sites it (or its original) updates. As
+    a consequence, the dictionaries returned by get_site_state and
+    get_general_state must be treated as read-only. Use copy(deep=True) to
+    obtain a copy which is safe to modify in place.
     """
 
     def as_dict(self):
         return {
-            "state": self._state,
+            "state": {
+                SITES: dict(self._state[SITES].items()),
+                GENERAL: self._state[GENERAL],
+            },
             "@module": self.__class__.__module__,
             "@class": self.__class__.__name__,
         }
@@ -38,21 +149,46 @@ class SimulationState:
 
         return state
 
-    def __init__(self, state: Dict = None):
+    def __init__(self, state: Union[Dict, SimulationState] = None):
         """Initializes the SimulationState.
 
         Parameters
         ----------
-        state : dict, optional
-            A state to store. should be a map with keys "GENERAL" and "SITES", by default None
+        state : Union[Dict, SimulationState], optional
+            A state to store. should be a map with keys "GENERAL" and "SITES", by default None.
+            The map is deep copied. A SimulationState may be passed instead, in which case
+            the new state shares structure with it (see copy).
         """
+        self._version = 0
         if state is None:
             self._state = {
-                SITES: {},
+                SITES: _SiteMap(),
                 GENERAL: {},
             }
+        elif isinstance(state, SimulationState):
+            self._state = {
+                SITES: state._state[SITES].copy(),
+                GENERAL: state._state[GENERAL],
+            }
         else:
-            self._state = copy.deepcopy(state)
+            state = copy.deepcopy(state)
+            self._state = {
+                SITES: _SiteMap(state.get(SITES, {})),
+                GENERAL: state.get(GENERAL, {}),
+            }
+
+    @property
+    def version(self) -> int:
+        """A counter which is incremented whenever the state is modified through
+        its methods, so that quantities derived from the state can be cached
+        until it changes.
+
+        Returns
+        -------
+        int
+            The number of modifications of this state.
+        """
+        return self._version
 
     @property
     def size(self) -> int:
@@ -63,7 +199,7 @@ class SimulationState:
         int
             The number of sites for which state information is stored.
         """
-        return len(self.site_ids())
+        return len(self._state[SITES])
 
     def site_ids(self) -> List[int]:
         """A list of site IDs for which some state is stored.
@@ -121,6 +257,7 @@ class SimulationState:
         """
         old_state = self.get_general_state()
         self._state[GENERAL] = {**old_state, **updates}
+        self._version += 1
 
     def set_site_state(self, site_id: int, updates: dict) -> None:
         """Updates the state stored for site with ID site_id.
@@ -137,6 +274,23 @@ class SimulationState:
             old_state = {SITE_ID: site_id}
 
         self._state[SITES][site_id] = {**old_state, **updates}
+        self._version += 1
+
+    def set_site_values(self, key, site_ids: List[int], values: List) -> None:
+        """Sets the value of a single state key at many sites.
+
+        Parameters
+        ----------
+        key : Any
+            The state key to set.
+        site_ids : List[int]
+            The IDs of the sites to update. Sites in the same chunk are updated
+            fastest if they are consecutive, e.g. if the IDs are sorted.
+        values : List
+            The new value at each site.
+        """
+        self._state[SITES].set_values(key, site_ids, values)
+        self._version += 1
 
     def batch_update(self, update_batch: Dict) -> None:
         """Applies a batch update to many sites and the general state. Takes a dictionary
@@ -156,24 +310,105 @@ class SimulationState:
         """
 
         if GENERAL in update_batch:
-            for site_id, updates in update_batch.get(SITES, {}).items():
-                self.set_site_state(site_id, updates)
-
+            site_updates = update_batch.get(SITES, {})
             self.set_general_state(update_batch[GENERAL])
         else:
-            for site_id, updates in update_batch.items():
-                self.set_site_state(site_id, updates)
+            site_updates = update_batch
+
+        if len(site_updates) == 0:
+            return
+
+        self._version += 1
+        site_states = self._state[SITES]
+        for site_id, updates in site_updates.items():
+            old_state = site_states.get(site_id)
+            if old_state is None:
+                old_state = {SITE_ID: site_id}
+            site_states[site_id] = {**old_state, **updates}
+
+    def inverse_update(self, update_batch: Dict) -> Dict:
+        """Returns the inverse of an update batch with respect to this state.
+        Passing the inverse to restore after the batch has been applied with
+        batch_update returns the state to how it is now.
+
+        The inverse refers to the current state dictionaries of the sites in the
+        batch (or None for sites without state) and to the current general state.
+        Since these dictionaries are never modified in place, this costs one
+        reference per updated site.
+
+        Parameters
+        ----------
+        update_batch : Dict
+            The updates, formatted as for batch_update.
+
+        Returns
+        -------
+        Dict
+            The inverse, formatted as {"SITES": {site_id: old_state}, "GENERAL": old_state}
+        """
+        if GENERAL in update_batch:
+            site_updates = update_batch.get(SITES, {})
+            general = self._state[GENERAL]
+        else:
+            site_updates = update_batch
+            general = None
+
+        site_states = self._state[SITES]
+        return {
+            SITES: {site_id: site_states.get(site_id) for site_id in site_updates},
+            GENERAL: general,
+        }
+
+    def restore(self, inverse: Dict) -> None:
+        """Undoes a batch update using its inverse, as produced by inverse_update.
+
+        Parameters
+        ----------
+        inverse : Dict
+            The inverse of the update to undo.
+        """
+        self._version += 1
+        if inverse[GENERAL] is not None:
+            self._state[GENERAL] = inverse[GENERAL]
+
+        if len(inverse[SITES]) == 0:
+            return
+
+        site_states = self._state[SITES]
+        for site_id, old_state in inverse[SITES].items():
+            if old_state is None:
+                site_states.pop(site_id, None)
+            else:
+                site_states[site_id] = old_state
+
+    def copy(self, deep: bool = False) -> SimulationState:
+        """Creates a new simulation state identical to this one. Changing the copy
+        with the methods of SimulationState will not change the original, and
+        vice versa.
+
+        By default, the copy shares the site states and the general state of the
+        original, which are never modified in place by SimulationState. Copying
+        then costs one reference per chunk of site states, and the first update
+        of a chunk by either state duplicates that chunk. Code which modifies the
+        dictionaries returned by get_site_state or get_general_state (or values
+        stored in them) in place would change both states; it should request a
+        deep copy instead.
 
-    def copy(self) -> SimulationState:
-        """Creates a new simulation state identical to this one. This is a deepcopy
-        operation, so changing the copy will not change the original.
+        Parameters
+        ----------
+        deep : bool, optional
+            If True, the site states and the general state are deep copied, as
+            copy did before copies shared structure, by default False
 
         Returns
         -------
         SimulationState
             The copy of this SimulationState
         """
-        return SimulationState(self._state)
+        if deep:
+            return SimulationState(self.as_dict()["state"])
+
+        return SimulationState(self)
 
     def __eq__(self, other: SimulationState) -> bool:
         return self._state == other._state
@@ -1,3 +1,52 @@
+from typing import Dict
+
+from .constants import GENERAL, SITES
+
+
 def printif(cond, statement):  # pragma: no cover
     if cond:
         print(statement)
+
+
+def merge_updates(new_updates, curr_updates=None, site_id=None):
+    if new_updates is None:
+        return curr_updates
+
+    if curr_updates is None:
+        curr_updates = {SITES: {}, GENERAL: {}}
+
+    # if this is a total
+    if SITES in new_updates or GENERAL in new_updates:
+        curr_updates[SITES].update(new_updates.get(SITES, {}))
+        curr_updates[GENERAL].update(new_updates.get(GENERAL, {}))
+    # if these updates only include site updates
+    elif set(map(type, new_updates.keys())) == {int}:
+        curr_updates[SITES].update(new_updates)
+    # if these updates only apply to a single site
+    elif site_id is not None:
+        curr_updates[SITES].update({site_id: new_updates})
+    else:
+        raise ValueError("Bad combination of arguments for merge_updates")
+
+    return curr_updates
+
+
+def format_diff(diff: Dict) -> Dict:
+    """Restores the integer site IDs of a diff which was read from JSON.
+
+    Parameters
+    ----------
+    diff : Dict
+        The diff, with site IDs as strings.
+
+    Returns
+    -------
+    Dict
+        The diff, with site IDs as integers.
+    """
+    if SITES in diff:
+        return {
+            SITES: {int(k): v for k, v in diff[SITES].items()},
+            GENERAL: diff.get(GENERAL, {}),
+        }
+    return {int(k): v for k, v in diff.items() if k != GENERAL}
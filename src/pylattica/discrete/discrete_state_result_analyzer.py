@@ -5,8 +5,9 @@ import numpy as np
 import plotly.graph_objects as go
 from functools import lru_cache
 
-from ..core import SimulationResult, SimulationState
+from ..core import SimulationResult
 from .discrete_step_analyzer import DiscreteStepAnalyzer
+from .phase_counter import PhaseCounter
 
 
 class DiscreteResultAnalyzer:
@@ -32,15 +33,77 @@ class DiscreteResultAnalyzer:
         Returns
         -------
         List[str]
-            A list of every phase present in any step of the result.
+            A list of every phase present in any step of the result. As in
+            DiscreteStepAnalyzer.phases_present, sites without a phase are ignored.
         """
-        analyzer = DiscreteStepAnalyzer()
-        phases = []
-        for step in self._result.steps():
-            curr_phases = analyzer.phases_present(step)
-            phases = phases + curr_phases
+        counter = PhaseCounter(self._result.initial_state)
+        for site_updates in self._result.site_updates():
+            counter.update(site_updates)
+
+        return frozenset(phase for phase in counter.phases if phase is not None)
+
+    def phase_count_series(
+        self, interval: int = 1
+    ) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """Builds the phase counts at every interval-th step of the result. The
+        phases of the initial state are counted once, and the counts are then
+        carried forward through the diffs of the result, so the total cost is
+        proportional to the combined size of the diffs. Sites without a phase
+        are counted under None, so that the counts of every step add up to the
+        number of sites.
 
-        return frozenset(phases)
+        Parameters
+        ----------
+        interval : int, optional
+            The spacing between the steps at which counts are recorded, by default 1
+
+        Returns
+        -------
+        Tuple[np.ndarray, List[str], np.ndarray]
+            The recorded step indices, the phases in the order of the count columns,
+            and a (num_recorded_steps, num_phases) array of site counts.
+        """
+        step_idxs, phases, counts, _ = self._count_series(interval)
+        return step_idxs, phases, counts
+
+    def _count_series(self, interval: int):
+        counter = PhaseCounter(self._result.initial_state)
+        step_idxs = [0]
+        rows = [counter.counts()]
+        totals = [counter.total]
+
+        for step_no, site_updates in enumerate(self._result.site_updates(), start=1):
+            counter.update(site_updates)
+            if step_no % interval == 0:
+                step_idxs.append(step_no)
+                rows.append(counter.counts())
+                totals.append(counter.total)
+
+        counts = np.zeros((len(rows), len(counter.phases)), dtype=np.int64)
+        for row_idx, row in enumerate(rows):
+            counts[row_idx, : len(row)] = row
+
+        return np.array(step_idxs), list(counter.phases), counts, np.array(totals)
+
+    def phase_fraction_series(
+        self, interval: int = 1
+    ) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """Like phase_count_series, but reports the fraction of sites occupied
+        by each phase rather than the number of sites.
+
+        Parameters
+        ----------
+        interval : int, optional
+            The spacing between the steps at which fractions are recorded, by default 1
+
+        Returns
+        -------
+        Tuple[np.ndarray, List[str], np.ndarray]
+            The recorded step indices, the phases in the order of the fraction columns,
+            and a (num_recorded_steps, num_phases) array of site fractions.
+        """
+        step_idxs, phases, counts, totals = self._count_series(interval)
+        return step_idxs, phases, counts / totals[:, None]
 
     def plot_phase_fractions(self, min_prevalence=0.01) -> None:
         """In a Jupyter Notebook environment, plots the phase prevalence traces for the simulation.
@@ -53,15 +116,15 @@ class DiscreteResultAnalyzer:
         fig.update_layout(width=800, height=800)
         fig.update_yaxes(range=[-0.05, 1.05], title="Volume Fraction")
 
-        analyzer = DiscreteStepAnalyzer()
         traces = []
 
-        step_idxs, steps = self._get_steps_to_plot()
+        num_points = min(100, len(self._result))
+        step_size = max(1, round(len(self._result) / num_points))
+        step_idxs, phases, fractions = self.phase_fraction_series(step_size)
         fig.update_xaxes(range=[0, step_idxs[-1]], title="Simulation Step")
 
-        for phase in self.all_phases():
-            ys = [analyzer.cell_fraction(step, phase) for step in steps]
-            traces.append((step_idxs, ys, phase))
+        for col_idx, phase in enumerate(phases):
+            traces.append((step_idxs, fractions[:, col_idx], phase))
 
         filtered_traces = [t for t in traces if max(t[1]) > min_prevalence]
 
@@ -78,9 +141,10 @@ class DiscreteResultAnalyzer:
         Dict[str, float]
         """
         analyzer = DiscreteStepAnalyzer()
+        last_fracs = analyzer.phase_fractions(self._result.last_step)
         fracs = {}
         for phase in self.all_phases():
-            fracs[phase] = analyzer.cell_fraction(self._result.last_step, phase)
+            fracs[phase] = last_fracs.get(phase, 0.0)
 
         return fracs
 
@@ -109,10 +173,3 @@ class DiscreteResultAnalyzer:
         xs = np.arange(len(self.steps))
         ys = [step.phase_count for step in self.steps]
         plt.plot(xs, ys)
-
-    def _get_steps_to_plot(self) -> Tuple[List[int], List[SimulationState]]:
-        num_points = min(100, len(self._result))
-        step_size = max(1, round(len(self._result) / num_points))
-        self._result.load_steps(step_size)
-        step_idxs = list(range(0, len(self._result), step_size))
-        return step_idxs, [self._result.get_step(step_idx) for step_idx in step_idxs]
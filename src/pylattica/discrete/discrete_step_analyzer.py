@@ -1,6 +1,10 @@
-from typing import List
+import weakref
+from typing import Dict, List, Tuple
 
-from ..core import SimulationState, StateAnalyzer
+import numpy as np
+
+from ..core import PeriodicStructure, SimulationState, StateAnalyzer
+from ..core.constants import SITE_ID
 from .state_constants import DISCRETE_OCCUPANCY
 
 
@@ -9,6 +13,97 @@ class DiscreteStepAnalyzer(StateAnalyzer):
     specified by categorical occupancies for each site in the simulation
     """
 
+    def __init__(self, structure: PeriodicStructure = None):
+        """Initializes the DiscreteStepAnalyzer with the structure provided.
+
+        Parameters
+        ----------
+        structure : PeriodicStructure, optional
+            The structure to use as the source for site class information.
+        """
+        super().__init__(structure)
+        # The last analyzed state, its version, and its phase codes by site class
+        self._codes_cache = (None, None, {})
+
+    def _phase_codes(
+        self, state: SimulationState, site_class: str = None
+    ) -> Tuple[List, np.ndarray]:
+        # Returns the phases found in the state, and the index in that list of
+        # the phase of every site. Both are kept until the state changes.
+        state_ref, version, by_class = self._codes_cache
+        if state_ref is None or state_ref() is not state or version != state.version:
+            by_class = {}
+            self._codes_cache = (weakref.ref(state), state.version, by_class)
+
+        if site_class not in by_class:
+            if self._structure is not None:
+                site_states = [
+                    state.get_site_state(site[SITE_ID])
+                    for site in self._structure.sites(site_class)
+                ]
+            else:
+                site_states = state.all_site_states()
+
+            phase_codes = {}
+            codes = np.fromiter(
+                (
+                    phase_codes.setdefault(
+                        site_state.get(DISCRETE_OCCUPANCY), len(phase_codes)
+                    )
+                    for site_state in site_states
+                ),
+                dtype=np.int64,
+                count=len(site_states),
+            )
+            by_class[site_class] = (list(phase_codes), codes)
+
+        return by_class[site_class]
+
+    def phase_counts(self, state: SimulationState, site_class: str = None) -> Dict:
+        """Counts the sites occupied by every phase in the provided state in a
+        single pass. Each site is assigned an integer code for its phase and the
+        codes are tallied with np.bincount, so the cost does not grow with the
+        number of phases. The codes are kept until the state is modified, so
+        further queries about the same state only repeat the tally.
+
+        Parameters
+        ----------
+        state : SimulationState
+            The state to analyze.
+        site_class : str, optional
+            If this analyzer was given a structure, restricts the count to sites
+            of this class, by default None
+
+        Returns
+        -------
+        Dict
+            A mapping of each phase present in the state to the number of sites
+            it occupies. Sites without a phase are counted under None.
+        """
+        phases, codes = self._phase_codes(state, site_class)
+        counts = np.bincount(codes, minlength=len(phases))
+        return dict(zip(phases, counts.tolist()))
+
+    def phase_fractions(self, state: SimulationState) -> Dict:
+        """Returns the fraction of sites occupied by every phase in the provided
+        state. See phase_counts.
+
+        Parameters
+        ----------
+        state : SimulationState
+            The state to analyze.
+
+        Returns
+        -------
+        Dict
+            A mapping of each phase present in the state to its site fraction.
+        """
+        total_occupied_cells = state.size
+        return {
+            phase: count / total_occupied_cells
+            for phase, count in self.phase_counts(state).items()
+        }
+
     def cell_fraction(self, state: SimulationState, phase_name: str) -> float:
         """Returns the fraction of sites in the provided state which are occupied
         by the specified phase.
@@ -45,7 +140,7 @@ class DiscreteStepAnalyzer(StateAnalyzer):
         int
             The number of sites occupied by the specified phase.
         """
-        return self.get_site_count_where_equal(state, {DISCRETE_OCCUPANCY: phase_name})
+        return self.phase_counts(state).get(phase_name, 0)
 
     def cell_ratio(self, step: SimulationState, p1: str, p2: str) -> float:
         """Returns the occupancy ratio between two phases in the provided simulation state.
@@ -64,7 +159,8 @@ class DiscreteStepAnalyzer(StateAnalyzer):
         float
             The ratio of the occupancies of the two phases.
         """
-        return self.cell_count(step, p1) / self.cell_count(step, p2)
+        counts = self.phase_counts(step)
+        return counts.get(p1, 0) / counts.get(p2, 0)
 
     def phase_count(self, step: SimulationState) -> int:
         """The number of phases present in the specified simulation state.
@@ -92,10 +188,7 @@ class DiscreteStepAnalyzer(StateAnalyzer):
         Returns
         -------
         List[str]
-            A list of the phases identified.
+            A list of the phases identified. Sites without a phase are ignored.
         """
-        return list(
-            set(
-                site_state[DISCRETE_OCCUPANCY] for site_state in state.all_site_states()
-            )
-        )
+        phases, _ = self._phase_codes(state)
+        return [phase for phase in phases if phase is not None]
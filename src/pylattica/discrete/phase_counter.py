@@ -0,0 +1,132 @@
+from typing import Dict, List
+
+import numpy as np
+
+from ..core import Observer, SimulationState
+from ..core.constants import SITES
+from .state_constants import DISCRETE_OCCUPANCY
+
+
+class PhaseCounter:
+    """Keeps a running count of the number of sites occupied by each phase.
+    The counter is initialized from a full SimulationState and is then kept
+    current by feeding it the site updates of each subsequent step, so the
+    cost of following a simulation is proportional to the size of its diffs
+    rather than to the number of sites.
+    """
+
+    def __init__(self, state: SimulationState, phase_key: str = DISCRETE_OCCUPANCY):
+        """Instantiates the PhaseCounter by counting the phases of every site
+        in the provided state.
+
+        Parameters
+        ----------
+        state : SimulationState
+            The state from which counting starts.
+        phase_key : str, optional
+            The site state key holding the phase, by default DISCRETE_OCCUPANCY
+        """
+        self._phase_key = phase_key
+        self.phases: List = []
+        self._codes: Dict = {}
+        self._counts: List[int] = []
+        self._site_codes: Dict[int, int] = {}
+
+        for site_id, site_state in zip(state.site_ids(), state.all_site_states()):
+            code = self._code(site_state.get(phase_key))
+            self._site_codes[site_id] = code
+            self._counts[code] += 1
+
+    def _code(self, phase) -> int:
+        code = self._codes.get(phase)
+        if code is None:
+            code = len(self.phases)
+            self._codes[phase] = code
+            self.phases.append(phase)
+            self._counts.append(0)
+        return code
+
+    @property
+    def total(self) -> int:
+        """The number of sites being counted."""
+        return len(self._site_codes)
+
+    def update(self, site_updates: Dict[int, Dict]) -> None:
+        """Applies the site updates of one simulation step to the counts.
+        Only updates which touch the phase key are considered.
+
+        Parameters
+        ----------
+        site_updates : Dict[int, Dict]
+            A mapping of site IDs to the state values updated at those sites.
+        """
+        key = self._phase_key
+        for site_id, updates in site_updates.items():
+            if key in updates:
+                new_code = self._code(updates[key])
+            elif site_id not in self._site_codes:
+                new_code = self._code(None)
+            else:
+                continue
+
+            old_code = self._site_codes.get(site_id)
+            if old_code == new_code:
+                continue
+
+            if old_code is not None:
+                self._counts[old_code] -= 1
+            self._counts[new_code] += 1
+            self._site_codes[site_id] = new_code
+
+    def counts(self) -> np.ndarray:
+        """Returns the current counts as an array aligned with the phases attribute.
+
+        Returns
+        -------
+        np.ndarray
+            The number of sites occupied by each phase.
+        """
+        return np.array(self._counts, dtype=np.int64)
+
+    def as_dict(self) -> Dict:
+        """Returns the current counts of the phases which occupy at least one site.
+
+        Returns
+        -------
+        Dict
+            A mapping of phase to the number of sites it occupies.
+        """
+        return {
+            phase: count for phase, count in zip(self.phases, self._counts) if count > 0
+        }
+
+
+class PhaseCountObserver(Observer):
+    """An Observer which records the number of sites occupied by each phase
+    while a simulation runs. The counts are maintained incrementally with a
+    PhaseCounter, so recording them costs nothing beyond the size of each
+    step's updates.
+    """
+
+    def __init__(self, interval: int = 1, phase_key: str = DISCRETE_OCCUPANCY):
+        """Instantiates the PhaseCountObserver.
+
+        Parameters
+        ----------
+        interval : int, optional
+            The number of steps between recorded counts, by default 1
+        phase_key : str, optional
+            The site state key holding the phase, by default DISCRETE_OCCUPANCY
+        """
+        super().__init__(interval)
+        self._phase_key = phase_key
+        self.counter: PhaseCounter = None
+
+    def reset(self, state: SimulationState) -> None:
+        self.counter = PhaseCounter(state, phase_key=self._phase_key)
+
+    def update(self, updates: Dict, _: SimulationState) -> None:
+        self.counter.update(updates.get(SITES, {}))
+
+    def value(self, _: SimulationState) -> Dict:
+        return self.counter.as_dict()
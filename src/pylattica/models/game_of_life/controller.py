@@ -1,4 +1,5 @@
 from ...core import BasicController, SimulationState, PeriodicStructure
+from ...core.neighborhood_cache import build_neighborhood
 from ...structures.square_grid import MooreNbHoodBuilder
 from ...discrete.state_constants import DISCRETE_OCCUPANCY
 
@@ -14,13 +15,18 @@ class GameOfLifeController(BasicController):
     variant = None
 
     def __init__(self, structure: PeriodicStructure, variant="B3/S23"):
+        super().__init__()
         if self.variant is None:
             self.variant = variant
         self.born, self.survive = process_variant_string(self.variant)
         self.structure = structure
 
     def pre_run(self, _):
-        self.neighborhood = MooreNbHoodBuilder().get(self.structure)
+        self.neighborhood = build_neighborhood(MooreNbHoodBuilder(), self.structure)
+
+    def get_neighborhood(self):
+        # The neighborhood is only built in pre_run
+        return getattr(self, "neighborhood", None)
 
     def get_state_update(self, site_id, curr_state: SimulationState):
         alive_neighbor_count = 0
@@ -1,5 +1,7 @@
 from ...core import BasicController
+from ...core.constants import GENERAL, SITES
 from ...core.neighborhood_builders import NeighborhoodBuilder
+from ...core.neighborhood_cache import build_neighborhood
 from ...core.periodic_structure import PeriodicStructure
 from ...core.simulation_state import SimulationState
 from ...discrete import PhaseSet
@@ -15,6 +17,7 @@ class GrowthController(BasicController):
         background_phase: str = VACANT,
         nb_builder: NeighborhoodBuilder = None,
     ) -> None:
+        super().__init__()
         self.background_phase = background_phase
         self.phase_set: PhaseSet = phase_set
 
@@ -23,7 +26,38 @@ class GrowthController(BasicController):
         else:
             self.nb_builder = nb_builder
 
-        self.nb_graph = self.nb_builder.get(periodic_struct)
+        self.nb_graph = build_neighborhood(self.nb_builder, periodic_struct)
+
+    def get_neighborhood(self):
+        return self.nb_graph
+
+    def get_state_updates(self, site_ids, prev_state: SimulationState):
+        # The neighbors of all the background sites are gathered at once, which
+        # draws the neighborhoods of stochastic neighborhoods in a single call
+        background_ids = [
+            site_id
+            for site_id in site_ids
+            if prev_state.get_site_state(site_id)[DISCRETE_OCCUPANCY]
+            == self.background_phase
+        ]
+        updates = {}
+        if len(background_ids) == 0:
+            return {SITES: updates, GENERAL: {}}
+
+        nb_rows = self.nb_graph.sample_neighbors(background_ids).tolist()
+        for site_id, nb_ids in zip(background_ids, nb_rows):
+            counts = {}
+            for nb_id in nb_ids:
+                if nb_id < 0:
+                    break
+                nb_phase = prev_state.get_site_state(nb_id)[DISCRETE_OCCUPANCY]
+                if nb_phase != self.background_phase:
+                    counts[nb_phase] = counts.get(nb_phase, 0) + 1
+
+            if len(counts) > 0:
+                updates[site_id] = {DISCRETE_OCCUPANCY: max(counts, key=counts.get)}
+
+        return {SITES: updates, GENERAL: {}}
 
     def get_state_update(self, site_id: int, prev_state: SimulationState):
         curr_state = prev_state.get_site_state(site_id)
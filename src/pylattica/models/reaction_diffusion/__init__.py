@@ -0,0 +1,7 @@
+from .gray_scott import (
+    GrayScottModel,
+    U_CONCENTRATION,
+    V_CONCENTRATION,
+    EXPLICIT,
+    SEMI_IMPLICIT,
+)
@@ -0,0 +1,303 @@
+from typing import Dict, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+from scipy import sparse
+from scipy.sparse.linalg import splu
+from tqdm import tqdm
+
+from ...core.constants import GENERAL, SIMULATION_TIME, SITES
+from ...core.neighborhood_builders import NeighborhoodBuilder
+from ...core.neighborhood_cache import build_neighborhood
+from ...core.periodic_structure import PeriodicStructure
+from ...core.simulation_result import SimulationResult
+from ...core.simulation_state import SimulationState
+from ...structures.square_grid.neighborhoods import MooreNbHoodBuilder
+
+U_CONCENTRATION = "U_CONCENTRATION"
+V_CONCENTRATION = "V_CONCENTRATION"
+
+EXPLICIT = "explicit"
+SEMI_IMPLICIT = "semi_implicit"
+
+
+class GrayScottModel:
+    """The Gray-Scott reaction-diffusion model on an arbitrary PeriodicStructure.
+
+    Two chemical species U and V diffuse over the sites of the structure and
+    react according to U + 2V -> 3V. U is fed into the system at a rate F and V
+    is removed at a rate F + k:
+
+        du/dt = D_u * Lap(u) - u * v^2 + F * (1 - u)
+        dv/dt = D_v * Lap(v) + u * v^2 - (F + k) * v
+
+    The concentrations are stored as float arrays with one entry per site, in
+    the order of the site IDs of the structure, and the discrete Laplacian Lap
+    is the negated graph Laplacian of the neighborhood of the structure (see
+    AbstractNeighborhood.laplacian), so that a diffusion step is a single sparse
+    matrix-vector product.
+
+    Two time integration schemes are available. EXPLICIT is the forward Euler
+    method, which is only stable for time steps below max_explicit_time_step.
+    SEMI_IMPLICIT treats diffusion implicitly and the reaction explicitly, and
+    is stable for much larger time steps: each step solves (I - dt * D * Lap) x = b
+    for both species, with LU factorizations computed once per time step size.
+
+    The states of the simulation are recorded in a SimulationResult every
+    output_interval time steps. Each recorded step stores the concentrations of
+    every site under U_CONCENTRATION and V_CONCENTRATION, and the physical time
+    under SIMULATION_TIME in the general state.
+    """
+
+    def __init__(
+        self,
+        structure: PeriodicStructure,
+        feed_rate: float = 0.037,
+        kill_rate: float = 0.06,
+        diffusion_u: float = 0.2,
+        diffusion_v: float = 0.1,
+        nb_builder: NeighborhoodBuilder = None,
+        weighted: bool = False,
+    ) -> None:
+        """Instantiates the GrayScottModel.
+
+        Parameters
+        ----------
+        structure : PeriodicStructure
+            The structure on which the species diffuse.
+        feed_rate : float, optional
+            The feed rate F, by default 0.037
+        kill_rate : float, optional
+            The kill rate k, by default 0.06
+        diffusion_u : float, optional
+            The diffusion coefficient of U, per neighbor connection, by default 0.2
+        diffusion_v : float, optional
+            The diffusion coefficient of V, per neighbor connection, by default 0.1
+        nb_builder : NeighborhoodBuilder, optional
+            The builder of the neighborhood over which the species diffuse, by
+            default a MooreNbHoodBuilder of size 1
+        weighted : bool, optional
+            Whether the weights of the neighbor connections should scale the
+            diffusion between neighbors, by default False
+        """
+        self.structure = structure
+        self.feed_rate = feed_rate
+        self.kill_rate = kill_rate
+        self.diffusion_u = diffusion_u
+        self.diffusion_v = diffusion_v
+
+        if nb_builder is None:
+            self.nb_builder = MooreNbHoodBuilder(1, dim=structure.dim)
+        else:
+            self.nb_builder = nb_builder
+
+        self.neighborhood = build_neighborhood(self.nb_builder, structure)
+        self.site_ids = np.array(structure.site_ids, dtype=np.int64)
+        self.laplacian = -self.neighborhood.laplacian(weighted)[self.site_ids][
+            :, self.site_ids
+        ].tocsr()
+        self._factorizations = {}
+
+    @property
+    def max_explicit_time_step(self) -> float:
+        """The largest time step for which the EXPLICIT scheme is stable for
+        diffusion, estimated from the largest neighbor count (or total weight)
+        of any site.
+        """
+        max_degree = float(np.max(np.abs(self.laplacian.diagonal()), initial=0))
+        diffusion = max(self.diffusion_u, self.diffusion_v)
+        if max_degree == 0 or diffusion == 0:
+            return np.inf
+        return 1 / (diffusion * max_degree)
+
+    def reaction(self, u: np.ndarray, v: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the rates of change of the concentrations due to the reaction,
+        feeding and removal terms.
+
+        Parameters
+        ----------
+        u : np.ndarray
+            The concentrations of U.
+        v : np.ndarray
+            The concentrations of V.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            The rates of change of U and V.
+        """
+        uvv = u * v * v
+        return (
+            -uvv + self.feed_rate * (1 - u),
+            uvv - (self.feed_rate + self.kill_rate) * v,
+        )
+
+    def explicit_step(
+        self, u: np.ndarray, v: np.ndarray, dt: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Advances the concentrations by one forward Euler step.
+
+        Parameters
+        ----------
+        u : np.ndarray
+            The concentrations of U.
+        v : np.ndarray
+            The concentrations of V.
+        dt : float
+            The time step.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            The new concentrations of U and V.
+        """
+        du, dv = self.reaction(u, v)
+        du += self.diffusion_u * (self.laplacian @ u)
+        dv += self.diffusion_v * (self.laplacian @ v)
+        return u + dt * du, v + dt * dv
+
+    def _factorization(self, diffusion: float, dt: float):
+        key = (diffusion, dt)
+        if key not in self._factorizations:
+            identity = sparse.identity(len(self.site_ids), format="csc")
+            self._factorizations[key] = splu(
+                (identity - dt * diffusion * self.laplacian).tocsc()
+            )
+        return self._factorizations[key]
+
+    def semi_implicit_step(
+        self, u: np.ndarray, v: np.ndarray, dt: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Advances the concentrations by one step, treating diffusion with the
+        backward Euler method and the reaction with the forward Euler method.
+
+        Parameters
+        ----------
+        u : np.ndarray
+            The concentrations of U.
+        v : np.ndarray
+            The concentrations of V.
+        dt : float
+            The time step.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            The new concentrations of U and V.
+        """
+        du, dv = self.reaction(u, v)
+        return (
+            self._factorization(self.diffusion_u, dt).solve(u + dt * du),
+            self._factorization(self.diffusion_v, dt).solve(v + dt * dv),
+        )
+
+    def get_state(
+        self, u: ArrayLike, v: ArrayLike, time: float = 0.0
+    ) -> SimulationState:
+        """Builds a SimulationState holding the provided concentrations.
+
+        Parameters
+        ----------
+        u : ArrayLike
+            The concentrations of U, in the order of the site IDs of the structure.
+        v : ArrayLike
+            The concentrations of V, in the order of the site IDs of the structure.
+        time : float, optional
+            The physical time of the state, by default 0.0
+
+        Returns
+        -------
+        SimulationState
+            The state.
+        """
+        state = SimulationState()
+        state.batch_update(self._updates(np.asarray(u), np.asarray(v), time))
+        return state
+
+    def get_arrays(self, state: SimulationState) -> Tuple[np.ndarray, np.ndarray]:
+        """Extracts the concentrations from a SimulationState.
+
+        Parameters
+        ----------
+        state : SimulationState
+            The state.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            The concentrations of U and V, in the order of the site IDs of the
+            structure.
+        """
+        site_states = [state.get_site_state(site_id) for site_id in self.site_ids]
+        u = np.array([s[U_CONCENTRATION] for s in site_states], dtype=float)
+        v = np.array([s[V_CONCENTRATION] for s in site_states], dtype=float)
+        return u, v
+
+    def _updates(self, u: np.ndarray, v: np.ndarray, time: float) -> Dict:
+        site_updates = {
+            site_id: {U_CONCENTRATION: u_val, V_CONCENTRATION: v_val}
+            for site_id, u_val, v_val in zip(
+                self.site_ids.tolist(), u.tolist(), v.tolist()
+            )
+        }
+        return {SITES: site_updates, GENERAL: {SIMULATION_TIME: time}}
+
+    def run(
+        self,
+        initial_state: SimulationState,
+        num_steps: int,
+        dt: float = 1.0,
+        method: str = SEMI_IMPLICIT,
+        output_interval: int = 1,
+        verbose: bool = False,
+    ) -> SimulationResult:
+        """Integrates the model from an initial state.
+
+        Parameters
+        ----------
+        initial_state : SimulationState
+            The initial concentrations (see get_state).
+        num_steps : int
+            The number of time steps to take.
+        dt : float, optional
+            The time step, by default 1.0
+        method : str, optional
+            The time integration scheme, EXPLICIT or SEMI_IMPLICIT, by default
+            SEMI_IMPLICIT
+        output_interval : int, optional
+            The number of time steps between the states recorded in the result,
+            by default 1. The final state is always recorded.
+        verbose : bool, optional
+            Whether to show a progress bar, by default False
+
+        Returns
+        -------
+        SimulationResult
+            The result, with one step per recorded state.
+        """
+        if method == EXPLICIT:
+            if dt > self.max_explicit_time_step:
+                raise ValueError(
+                    f"The time step {dt} is too large for the explicit scheme, "
+                    f"which is only stable up to {self.max_explicit_time_step}"
+                )
+            step = self.explicit_step
+        elif method == SEMI_IMPLICIT:
+            step = self.semi_implicit_step
+        else:
+            raise ValueError(f"Unknown time integration method {method}")
+
+        if output_interval < 1:
+            raise ValueError("output_interval must be at least 1")
+
+        result = SimulationResult(initial_state)
+        u, v = self.get_arrays(initial_state)
+        time = initial_state.get_general_state().get(SIMULATION_TIME, 0.0)
+
+        for step_no in tqdm(range(1, num_steps + 1), disable=(not verbose)):
+            u, v = step(u, v, dt)
+            time += dt
+            if step_no % output_interval == 0 or step_no == num_steps:
+                result.add_step(self._updates(u, v, time))
+
+        return result
@@ -0,0 +1,9 @@
+from .sandpile_model import (
+    SandpileModel,
+    Avalanche,
+    AvalancheStatistics,
+    GRAINS,
+    AVALANCHE_SIZE,
+    AVALANCHE_AREA,
+    AVALANCHE_DURATION,
+)
@@ -0,0 +1,368 @@
+from typing import NamedTuple, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+from tqdm import tqdm
+
+from ...core.constants import GENERAL, SITES
+from ...core.neighborhood_builders import NeighborhoodBuilder
+from ...core.neighborhood_cache import build_neighborhood
+from ...core.periodic_structure import PeriodicStructure
+from ...core.rng import Seed, default_rng
+from ...core.simulation_result import SimulationResult
+from ...core.simulation_state import SimulationState
+from ...structures.square_grid.neighborhoods import VonNeumannNbHood2DBuilder
+
+GRAINS = "GRAINS"
+AVALANCHE_SIZE = "AVALANCHE_SIZE"
+AVALANCHE_AREA = "AVALANCHE_AREA"
+AVALANCHE_DURATION = "AVALANCHE_DURATION"
+
+
+class Avalanche(NamedTuple):
+    """The extent of a single avalanche."""
+
+    size: int
+    """The total number of topplings."""
+    area: int
+    """The number of distinct sites which toppled."""
+    duration: int
+    """The number of toppling waves."""
+
+
+class AvalancheStatistics:
+    """Accumulates the statistics of avalanches as they occur, without storing
+    the individual avalanches: a histogram of their sizes, and the running mean
+    and variance of their sizes, areas and durations.
+    """
+
+    def __init__(self) -> None:
+        """Instantiates an empty AvalancheStatistics."""
+        self.count = 0
+        self.size_histogram = np.zeros(0, dtype=np.int64)
+        self._means = np.zeros(3)
+        self._sq_diffs = np.zeros(3)
+        self.max_size = 0
+
+    def add(self, avalanche: Avalanche) -> None:
+        """Records an avalanche.
+
+        Parameters
+        ----------
+        avalanche : Avalanche
+            The avalanche.
+        """
+        self.count += 1
+        if avalanche.size >= len(self.size_histogram):
+            grown = np.zeros(
+                max(avalanche.size + 1, 2 * len(self.size_histogram)), dtype=np.int64
+            )
+            grown[: len(self.size_histogram)] = self.size_histogram
+            self.size_histogram = grown
+        self.size_histogram[avalanche.size] += 1
+        self.max_size = max(self.max_size, avalanche.size)
+
+        # Welford's online algorithm
+        values = np.array(avalanche, dtype=float)
+        delta = values - self._means
+        self._means += delta / self.count
+        self._sq_diffs += delta * (values - self._means)
+
+    @property
+    def mean_size(self) -> float:
+        """The mean number of topplings per avalanche."""
+        return float(self._means[0])
+
+    @property
+    def mean_area(self) -> float:
+        """The mean number of distinct toppled sites per avalanche."""
+        return float(self._means[1])
+
+    @property
+    def mean_duration(self) -> float:
+        """The mean number of toppling waves per avalanche."""
+        return float(self._means[2])
+
+    @property
+    def size_variance(self) -> float:
+        """The variance of the number of topplings per avalanche."""
+        if self.count < 2:
+            return 0.0
+        return float(self._sq_diffs[0] / (self.count - 1))
+
+    def size_distribution(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the observed avalanche sizes and the fraction of avalanches
+        with each of them.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            The sizes, and their frequencies.
+        """
+        sizes = np.flatnonzero(self.size_histogram)
+        if self.count == 0:
+            return sizes, np.zeros(0)
+        return sizes, self.size_histogram[sizes] / self.count
+
+
+class SandpileModel:
+    """The Bak-Tang-Wiesenfeld sandpile, a model of self-organized criticality.
+
+    Each site holds a number of grains. A site with at least `threshold` grains
+    is unstable, and topples by giving one grain to each of its neighbors and
+    losing the grains it holds beyond those. Sites with fewer neighbors than
+    their threshold, such as those on the edges of a structure which is not
+    periodic, therefore lose grains when they topple. The system is driven by
+    adding single grains to random sites, and after each addition the unstable
+    sites topple until all of them are stable again: an avalanche.
+
+    Avalanches are relaxed in waves. The grain counts are stored as an integer
+    array, and the unstable sites are kept in an array-backed work queue: every
+    wave topples all the queued sites at once (as many times as their grain
+    counts allow, which is valid because the order of topplings does not
+    matter), distributes their grains with array operations, and queues the
+    neighbors which became unstable, each only once. Only the net change of the
+    grain counts of each driving step is recorded in the SimulationResult, and
+    the avalanche sizes are accumulated in an AvalancheStatistics rather than
+    recorded toppling by toppling.
+    """
+
+    def __init__(
+        self,
+        structure: PeriodicStructure,
+        nb_builder: NeighborhoodBuilder = None,
+        threshold: int = None,
+    ) -> None:
+        """Instantiates the SandpileModel.
+
+        Parameters
+        ----------
+        structure : PeriodicStructure
+            The structure on which the grains are placed.
+        nb_builder : NeighborhoodBuilder, optional
+            The builder of the neighborhood to which grains are given, by
+            default a VonNeumannNbHood2DBuilder of size 1
+        threshold : int, optional
+            The number of grains at which a site topples, by default the
+            largest number of neighbors of any site
+        """
+        self.structure = structure
+
+        if nb_builder is None:
+            self.nb_builder = VonNeumannNbHood2DBuilder(1)
+        else:
+            self.nb_builder = nb_builder
+
+        self.neighborhood = build_neighborhood(self.nb_builder, structure)
+        self.site_ids = np.array(structure.site_ids, dtype=np.int64)
+
+        neighbors = self.neighborhood.neighbor_positions(self.site_ids)
+        self.degrees = (neighbors >= 0).sum(axis=1)
+        self._nb_indptr = np.concatenate([[0], np.cumsum(self.degrees)])
+        self._nb_indices = neighbors[neighbors >= 0]
+
+        if threshold is None:
+            threshold = int(self.degrees.max(initial=0))
+        if threshold < self.degrees.max(initial=0):
+            raise ValueError(
+                "The threshold must be at least the number of neighbors of every site"
+            )
+        if len(self.degrees) > 0 and threshold <= self.degrees.min():
+            raise ValueError(
+                "At least one site must lose grains when it topples, otherwise "
+                "avalanches never end"
+            )
+        self.threshold = threshold
+        self.statistics = AvalancheStatistics()
+
+    def _topple_wave(
+        self, grains: np.ndarray, unstable: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # Topples the unstable sites as many times as possible, and returns the
+        # number of topplings of each, and the sites which received grains
+        topples = grains[unstable] // self.threshold
+        grains[unstable] -= topples * self.threshold
+
+        starts = self._nb_indptr[unstable]
+        counts = self.degrees[unstable]
+        offsets = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        receivers = self._nb_indices[np.repeat(starts, counts) + offsets]
+        amounts = np.repeat(topples, counts)
+        grains += np.bincount(receivers, weights=amounts, minlength=len(grains)).astype(
+            grains.dtype
+        )
+        return topples, receivers
+
+    def relax(self, grains: np.ndarray, sites: ArrayLike = None) -> Avalanche:
+        """Topples unstable sites until every site is stable, modifying the
+        grain counts in place.
+
+        Parameters
+        ----------
+        grains : np.ndarray
+            The grain counts.
+        sites : ArrayLike, optional
+            The indices of the sites which may be unstable, by default all sites
+
+        Returns
+        -------
+        Avalanche
+            The extent of the avalanche.
+        """
+        if sites is None:
+            sites = np.arange(len(grains))
+        sites = np.unique(np.asarray(sites, dtype=np.int64))
+        queue = sites[grains[sites] >= self.threshold]
+
+        toppled = np.zeros(len(grains), dtype=bool)
+        size = 0
+        duration = 0
+        while len(queue) > 0:
+            topples, receivers = self._topple_wave(grains, queue)
+            size += int(topples.sum())
+            duration += 1
+            toppled[queue] = True
+
+            # Each site is queued once, however many grains it received
+            candidates = np.unique(receivers)
+            queue = candidates[grains[candidates] >= self.threshold]
+
+        return Avalanche(size, int(toppled.sum()), duration)
+
+    def drive(
+        self, grains: np.ndarray, rng: np.random.Generator = None
+    ) -> Tuple[int, Avalanche]:
+        """Adds a grain to a random site and relaxes the resulting avalanche,
+        modifying the grain counts in place. The avalanche is added to the
+        statistics of the model.
+
+        Parameters
+        ----------
+        grains : np.ndarray
+            The grain counts.
+        rng : np.random.Generator, optional
+            The random number generator, by default a new unseeded Generator
+
+        Returns
+        -------
+        Tuple[int, Avalanche]
+            The index of the site to which the grain was added, and the avalanche.
+        """
+        if rng is None:
+            rng = default_rng()
+
+        site = int(rng.integers(len(grains)))
+        grains[site] += 1
+        avalanche = self.relax(grains, [site])
+        self.statistics.add(avalanche)
+        return site, avalanche
+
+    def get_state(self, grains: ArrayLike) -> SimulationState:
+        """Builds a SimulationState holding the provided grain counts.
+
+        Parameters
+        ----------
+        grains : ArrayLike
+            The grain counts, in the order of the site IDs of the structure.
+
+        Returns
+        -------
+        SimulationState
+            The state.
+        """
+        state = SimulationState()
+        state.batch_update(
+            {
+                SITES: {
+                    site_id: {GRAINS: count}
+                    for site_id, count in zip(
+                        self.site_ids.tolist(), np.asarray(grains).tolist()
+                    )
+                },
+                GENERAL: {},
+            }
+        )
+        return state
+
+    def get_grains(self, state: SimulationState) -> np.ndarray:
+        """Extracts the grain counts from a SimulationState.
+
+        Parameters
+        ----------
+        state : SimulationState
+            The state.
+
+        Returns
+        -------
+        np.ndarray
+            The grain counts, in the order of the site IDs of the structure.
+        """
+        return np.array(
+            [state.get_site_state(site_id)[GRAINS] for site_id in self.site_ids],
+            dtype=np.int64,
+        )
+
+    def run(
+        self,
+        initial_state: SimulationState,
+        num_grains: int,
+        output_interval: int = 1,
+        seed: Seed = None,
+        verbose: bool = False,
+    ) -> SimulationResult:
+        """Drives the sandpile with grains added one at a time, relaxing the
+        avalanche after each. The initial state is relaxed first.
+
+        Parameters
+        ----------
+        initial_state : SimulationState
+            The initial grain counts (see get_state).
+        num_grains : int
+            The number of grains to add.
+        output_interval : int, optional
+            The number of added grains between the states recorded in the
+            result, by default 1. The final state is always recorded.
+        seed : Seed, optional
+            The seed of the random number generator, by default None
+        verbose : bool, optional
+            Whether to show a progress bar, by default False
+
+        Returns
+        -------
+        SimulationResult
+            The result, with one step per recorded state. Each step updates the
+            grain counts which changed since the previous one, and records the
+            extent of the last avalanche in the general state.
+        """
+        if output_interval < 1:
+            raise ValueError("output_interval must be at least 1")
+
+        rng = default_rng(seed)
+        result = SimulationResult(initial_state)
+        grains = self.get_grains(initial_state)
+        self.relax(grains)
+        recorded = self.get_grains(initial_state)
+
+        for grain_no in tqdm(range(1, num_grains + 1), disable=(not verbose)):
+            _, avalanche = self.drive(grains, rng)
+
+            if grain_no % output_interval == 0 or grain_no == num_grains:
+                changed = np.flatnonzero(grains != recorded)
+                result.add_step(
+                    {
+                        SITES: {
+                            int(self.site_ids[idx]): {GRAINS: int(grains[idx])}
+                            for idx in changed
+                        },
+                        GENERAL: {
+                            AVALANCHE_SIZE: avalanche.size,
+                            AVALANCHE_AREA: avalanche.area,
+                            AVALANCHE_DURATION: avalanche.duration,
+                        },
+                    }
+                )
+                recorded[changed] = grains[changed]
+
+        return result
@@ -0,0 +1,10 @@
+from .spin_models import (
+    SpinModel,
+    IsingModel,
+    PottsModel,
+    SPIN,
+    ENERGY,
+    MAGNETIZATION,
+    METROPOLIS,
+    HEAT_BATH,
+)
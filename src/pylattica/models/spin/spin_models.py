@@ -0,0 +1,702 @@
+from abc import ABC, abstractmethod
+from typing import Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+from tqdm import tqdm
+
+from ...core.constants import GENERAL, SITES
+from ...core.neighborhood_builders import NeighborhoodBuilder
+from ...core.neighborhood_cache import build_neighborhood
+from ...core.neighborhoods import site_positions
+from ...core.periodic_structure import PeriodicStructure
+from ...core.rng import Seed, default_rng
+from ...core.simulation_result import SimulationResult
+from ...core.simulation_state import SimulationState
+from ...structures.square_grid.neighborhoods import (
+    MooreNbHoodBuilder,
+    VonNeumannNbHood2DBuilder,
+    VonNeumannNbHood3DBuilder,
+)
+
+SPIN = "SPIN"
+ENERGY = "ENERGY"
+MAGNETIZATION = "MAGNETIZATION"
+
+METROPOLIS = "metropolis"
+HEAT_BATH = "heat_bath"
+
+
+class SpinModel(ABC):
+    """A base class for lattice spin models with nearest neighbor interactions,
+    simulated with Monte Carlo sweeps.
+
+    The spins are stored as an integer array with one entry per site, in the
+    order of the site IDs of the structure, and the neighbors of every site are
+    precomputed as a padded array of indices into it (see
+    AbstractNeighborhood.neighbor_positions). By default, the sites interact with
+    their nearest neighbors on a square grid (the von Neumann neighborhood). The
+    neighborhood must be symmetric, and stochastic neighborhoods are sampled once,
+    when the model is created.
+
+    A sweep visits the sites one color class at a time (see
+    AbstractNeighborhood.color_classes). No two sites of a class are neighbors,
+    so the moves of all the sites of a class are independent of each other, and
+    are carried out at once with array operations on index arrays prepared for
+    each class when the model is created. Two kinds of moves are
+    available: METROPOLIS proposes a new spin value for each site and accepts it
+    with probability min(1, exp(-dE / T)), and HEAT_BATH draws the new value of
+    each site from the Boltzmann distribution over all values given its
+    neighbors. The energy and magnetization are updated incrementally from the
+    energy changes of the accepted moves and the counts of each spin value.
+
+    Subclasses define the allowed spin values and the local energies, and may
+    replace the generic moves, which are built on local_energies, with faster
+    ones specific to their energy function.
+    """
+
+    values: np.ndarray
+
+    def __init__(
+        self,
+        structure: PeriodicStructure,
+        coupling: float = 1.0,
+        field: float = 0.0,
+        nb_builder: NeighborhoodBuilder = None,
+    ) -> None:
+        """Instantiates the SpinModel.
+
+        Parameters
+        ----------
+        structure : PeriodicStructure
+            The structure on which the spins are placed.
+        coupling : float, optional
+            The coupling constant J between neighboring spins, positive for
+            ferromagnetic interactions, by default 1.0
+        field : float, optional
+            The external field h, by default 0.0
+        nb_builder : NeighborhoodBuilder, optional
+            The builder of the neighborhood of interacting sites, by default the
+            von Neumann neighborhood of size 1 for the dimension of the structure
+        """
+        self.structure = structure
+        self.coupling = coupling
+        self.field = field
+
+        if nb_builder is None:
+            self.nb_builder = _nearest_neighbor_builder(structure.dim)
+        else:
+            self.nb_builder = nb_builder
+
+        self.neighborhood = build_neighborhood(self.nb_builder, structure)
+        self.site_ids = np.array(structure.site_ids, dtype=np.int64)
+
+        self.neighbors = self.neighborhood.neighbor_positions(self.site_ids)
+        self.sublattices = [
+            site_positions(self.site_ids, site_ids)
+            for site_ids in self.neighborhood.color_classes(1)
+        ]
+        # The neighbors of the sites of each sublattice, with one row per
+        # neighbor slot so that they can be summed row by row, and which slots
+        # hold a neighbor (None if they all do)
+        self._sublattice_neighbors = []
+        for idxs in self.sublattices:
+            nbs = np.ascontiguousarray(self.neighbors[idxs].T)
+            mask = nbs >= 0
+            self._sublattice_neighbors.append((nbs, None if mask.all() else mask))
+
+    @property
+    def num_values(self) -> int:
+        """The number of allowed spin values."""
+        return len(self.values)
+
+    def value_indices(self, spins: np.ndarray) -> np.ndarray:
+        """Returns the index of each spin in the allowed spin values.
+
+        Parameters
+        ----------
+        spins : np.ndarray
+            The spins.
+
+        Returns
+        -------
+        np.ndarray
+            The indices.
+        """
+        return np.searchsorted(self.values, spins)
+
+    @abstractmethod
+    def local_energies(
+        self, spins: np.ndarray, idxs: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the energy of a set of sites for each of the allowed spin
+        values, split into the interaction with their neighbors and with the
+        external field.
+
+        Parameters
+        ----------
+        spins : np.ndarray
+            The spins of every site.
+        idxs : np.ndarray
+            The indices of the sites.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            The (number of sites, number of values) array of interaction
+            energies, and the array of field energies of each value.
+        """
+
+    @abstractmethod
+    def magnetization_from_counts(self, counts: np.ndarray) -> float:
+        """Returns the magnetization of a configuration with the provided number
+        of spins with each value.
+
+        Parameters
+        ----------
+        counts : np.ndarray
+            The number of spins with each of the allowed values.
+
+        Returns
+        -------
+        float
+            The magnetization.
+        """
+
+    def value_counts(self, spins: np.ndarray) -> np.ndarray:
+        """Returns the number of spins with each of the allowed values.
+
+        Parameters
+        ----------
+        spins : np.ndarray
+            The spins.
+
+        Returns
+        -------
+        np.ndarray
+            The counts.
+        """
+        return np.bincount(self.value_indices(spins), minlength=self.num_values)
+
+    def energy(self, spins: np.ndarray) -> float:
+        """Computes the total energy of a configuration from scratch.
+
+        Parameters
+        ----------
+        spins : np.ndarray
+            The spins.
+
+        Returns
+        -------
+        float
+            The energy.
+        """
+        idxs = np.arange(len(spins))
+        interaction, field = self.local_energies(spins, idxs)
+        current = self.value_indices(spins)
+        # every neighbor pair is counted from both of its sites
+        return float(interaction[idxs, current].sum() / 2 + field[current].sum())
+
+    def magnetization(self, spins: np.ndarray) -> float:
+        """Computes the magnetization of a configuration from scratch.
+
+        Parameters
+        ----------
+        spins : np.ndarray
+            The spins.
+
+        Returns
+        -------
+        float
+            The magnetization.
+        """
+        return self.magnetization_from_counts(self.value_counts(spins))
+
+    def _propose(self, current: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        # A uniformly chosen value other than the current one
+        offsets = rng.integers(1, self.num_values, size=len(current))
+        return (current + offsets) % self.num_values
+
+    def _metropolis(
+        self,
+        spins: np.ndarray,
+        idxs: np.ndarray,
+        nbs: np.ndarray,
+        mask: np.ndarray,
+        beta: float,
+        rng: np.random.Generator,
+    ) -> Tuple[float, np.ndarray]:
+        # Metropolis moves at the sites idxs of one sublattice, whose neighbors
+        # are nbs (see _sublattice_neighbors). Returns the changes in energy and
+        # in the value counts.
+        interaction, field = self.local_energies(spins, idxs)
+        energies = interaction + field
+        rows = np.arange(len(idxs))
+        current = self.value_indices(spins[idxs])
+        proposed = self._propose(current, rng)
+        delta = energies[rows, proposed] - energies[rows, current]
+        accept = rng.random(len(idxs)) < np.exp(-beta * np.maximum(delta, 0))
+        return self._apply_moves(spins, idxs, current, proposed, accept, delta)
+
+    def _heat_bath(
+        self,
+        spins: np.ndarray,
+        idxs: np.ndarray,
+        nbs: np.ndarray,
+        mask: np.ndarray,
+        beta: float,
+        rng: np.random.Generator,
+    ) -> Tuple[float, np.ndarray]:
+        # Heat bath moves at the sites of one sublattice, as for _metropolis
+        interaction, field = self.local_energies(spins, idxs)
+        energies = interaction + field
+        rows = np.arange(len(idxs))
+        current = self.value_indices(spins[idxs])
+        new = _draw_boltzmann(energies.T, beta, rng)
+        delta = energies[rows, new] - energies[rows, current]
+        return self._apply_moves(spins, idxs, current, new, new != current, delta)
+
+    def _apply_moves(
+        self,
+        spins: np.ndarray,
+        idxs: np.ndarray,
+        current: np.ndarray,
+        new: np.ndarray,
+        moved: np.ndarray,
+        delta: np.ndarray,
+    ) -> Tuple[float, np.ndarray]:
+        # Sets the sites idxs[moved] to the values with indices new[moved], given
+        # the indices of their current values and the energy change of each move
+        moved = np.flatnonzero(moved)
+        current, new = current[moved], new[moved]
+        spins[idxs[moved]] = self.values.take(new)
+        d_counts = np.bincount(new, minlength=self.num_values)
+        d_counts -= np.bincount(current, minlength=self.num_values)
+        return float(delta[moved].sum()), d_counts
+
+    def sweep(
+        self,
+        spins: np.ndarray,
+        temperature: float,
+        method: str = METROPOLIS,
+        rng: np.random.Generator = None,
+    ) -> Tuple[float, np.ndarray]:
+        """Carries out one Monte Carlo sweep, in which a move is attempted at
+        every site, modifying the spins in place.
+
+        Parameters
+        ----------
+        spins : np.ndarray
+            The spins.
+        temperature : float
+            The temperature, in units of energy.
+        method : str, optional
+            The kind of move, METROPOLIS or HEAT_BATH, by default METROPOLIS
+        rng : np.random.Generator, optional
+            The random number generator, by default a new unseeded Generator
+
+        Returns
+        -------
+        Tuple[float, np.ndarray]
+            The change in energy, and the change in the number of spins with
+            each value.
+        """
+        if not temperature > 0:
+            raise ValueError("The temperature must be positive")
+        if method not in (METROPOLIS, HEAT_BATH):
+            raise ValueError(f"Unknown Monte Carlo move {method}")
+        if rng is None:
+            rng = default_rng()
+
+        beta = 1 / temperature
+        d_energy = 0.0
+        d_counts = np.zeros(self.num_values, dtype=np.int64)
+        move = self._metropolis if method == METROPOLIS else self._heat_bath
+        for idxs, (nbs, mask) in zip(self.sublattices, self._sublattice_neighbors):
+            sub_energy, sub_counts = move(spins, idxs, nbs, mask, beta, rng)
+            d_energy += sub_energy
+            d_counts += sub_counts
+
+        return d_energy, d_counts
+
+    def random_spins(self, seed: Seed = None) -> np.ndarray:
+        """Returns a configuration with uniformly random spins.
+
+        Parameters
+        ----------
+        seed : Seed, optional
+            The seed of the random number generator, by default None
+
+        Returns
+        -------
+        np.ndarray
+            The spins.
+        """
+        rng = default_rng(seed)
+        return self.values[rng.integers(0, self.num_values, size=len(self.site_ids))]
+
+    def get_state(self, spins: ArrayLike) -> SimulationState:
+        """Builds a SimulationState holding the provided spins.
+
+        Parameters
+        ----------
+        spins : ArrayLike
+            The spins, in the order of the site IDs of the structure.
+
+        Returns
+        -------
+        SimulationState
+            The state.
+        """
+        spins = np.asarray(spins, dtype=self.values.dtype)
+        state = SimulationState()
+        state.batch_update(
+            {
+                SITES: {
+                    site_id: {SPIN: spin}
+                    for site_id, spin in zip(self.site_ids.tolist(), spins.tolist())
+                },
+                GENERAL: {
+                    ENERGY: self.energy(spins),
+                    MAGNETIZATION: self.magnetization(spins),
+                },
+            }
+        )
+        return state
+
+    def get_spins(self, state: SimulationState) -> np.ndarray:
+        """Extracts the spins from a SimulationState.
+
+        Parameters
+        ----------
+        state : SimulationState
+            The state.
+
+        Returns
+        -------
+        np.ndarray
+            The spins, in the order of the site IDs of the structure.
+        """
+        return np.array(
+            [state.get_site_state(site_id)[SPIN] for site_id in self.site_ids],
+            dtype=self.values.dtype,
+        )
+
+    def run(
+        self,
+        initial_state: SimulationState,
+        num_sweeps: int,
+        temperature: float,
+        method: str = METROPOLIS,
+        output_interval: int = 1,
+        seed: Seed = None,
+        verbose: bool = False,
+    ) -> SimulationResult:
+        """Carries out Monte Carlo sweeps from an initial state.
+
+        Parameters
+        ----------
+        initial_state : SimulationState
+            The initial spins (see get_state).
+        num_sweeps : int
+            The number of sweeps.
+        temperature : float
+            The temperature, in units of energy.
+        method : str, optional
+            The kind of move, METROPOLIS or HEAT_BATH, by default METROPOLIS
+        output_interval : int, optional
+            The number of sweeps between the states recorded in the result, by
+            default 1. The final state is always recorded.
+        seed : Seed, optional
+            The seed of the random number generator, by default None
+        verbose : bool, optional
+            Whether to show a progress bar, by default False
+
+        Returns
+        -------
+        SimulationResult
+            The result, with one step per recorded state. Each step updates the
+            spins which changed since the previous one, and records the energy
+            and magnetization in the general state.
+        """
+        if output_interval < 1:
+            raise ValueError("output_interval must be at least 1")
+
+        rng = default_rng(seed)
+        result = SimulationResult(initial_state)
+        spins = self.get_spins(initial_state)
+        recorded = spins.copy()
+        energy = self.energy(spins)
+        counts = self.value_counts(spins)
+
+        for sweep_no in tqdm(range(1, num_sweeps + 1), disable=(not verbose)):
+            d_energy, d_counts = self.sweep(spins, temperature, method, rng)
+            energy += d_energy
+            counts += d_counts
+
+            if sweep_no % output_interval == 0 or sweep_no == num_sweeps:
+                changed = np.flatnonzero(spins != recorded)
+                result.add_step(
+                    {
+                        SITES: {
+                            int(self.site_ids[idx]): {SPIN: spins[idx].item()}
+                            for idx in changed
+                        },
+                        GENERAL: {
+                            ENERGY: energy,
+                            MAGNETIZATION: self.magnetization_from_counts(counts),
+                        },
+                    }
+                )
+                recorded[changed] = spins[changed]
+
+        return result
+
+
+class IsingModel(SpinModel):
+    """The Ising model, with spins of -1 or 1 and the energy
+
+        E = -J * sum_<ij> s_i * s_j - h * sum_i s_i
+
+    where the first sum runs over pairs of neighbors. The magnetization is the
+    mean spin.
+
+    Moves only ever flip spins, and the energy change of a flip only depends on
+    the spin and the sum of its neighbors, so both kinds of moves look up their
+    probabilities and energy changes in tables indexed by these two integers.
+    """
+
+    values = np.array([-1, 1], dtype=np.int8)
+
+    def value_indices(self, spins: np.ndarray) -> np.ndarray:
+        # -1 and 1 have the indices 0 and 1
+        return (np.asarray(spins, dtype=np.intp) + 1) >> 1
+
+    def local_energies(
+        self, spins: np.ndarray, idxs: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        nbs = self.neighbors[idxs].T
+        nb_sum = _neighbor_sums(spins, nbs, nbs >= 0)
+        values = self.values.astype(float)
+        interaction = -self.coupling * nb_sum[:, np.newaxis] * values
+        return interaction, -self.field * values
+
+    def _flip_energies(self, width: int) -> np.ndarray:
+        # The energy change of flipping a spin with the value index v whose
+        # neighbors sum to m is entry v * (2 * width + 1) + m + width
+        nb_sums = np.arange(-width, width + 1)
+        return np.concatenate(
+            [2 * value * (self.coupling * nb_sums + self.field) for value in (-1, 1)]
+        )
+
+    def _metropolis(self, spins, idxs, nbs, mask, beta, rng):
+        current = spins[idxs]
+        nb_sum = _neighbor_sums(spins, nbs, mask)
+        keys = self.value_indices(current) * (2 * len(nbs) + 1) + nb_sum + len(nbs)
+        delta = self._flip_energies(len(nbs))
+        accept = np.exp(-beta * np.maximum(delta, 0))
+        flip = rng.random(len(idxs)) < accept[keys]
+        return self._flip(spins, idxs, current, flip, delta, keys)
+
+    def _heat_bath(self, spins, idxs, nbs, mask, beta, rng):
+        current = spins[idxs]
+        nb_sum = _neighbor_sums(spins, nbs, mask)
+        # the probability of an up spin given the sum of the neighbors
+        local_fields = self.coupling * np.arange(-len(nbs), len(nbs) + 1) + self.field
+        up_prob = (1 + np.tanh(beta * local_fields)) / 2
+        up = rng.random(len(idxs)) < up_prob[nb_sum + len(nbs)]
+        flip = up != (current > 0)
+        keys = self.value_indices(current) * (2 * len(nbs) + 1) + nb_sum + len(nbs)
+        return self._flip(
+            spins, idxs, current, flip, self._flip_energies(len(nbs)), keys
+        )
+
+    def _flip(
+        self,
+        spins: np.ndarray,
+        idxs: np.ndarray,
+        current: np.ndarray,
+        flip: np.ndarray,
+        delta: np.ndarray,
+        keys: np.ndarray,
+    ) -> Tuple[float, np.ndarray]:
+        # Flips the spins at idxs[flip], given the table of energy changes and
+        # the key of each site in it (see _flip_energies)
+        flip = np.flatnonzero(flip)
+        flipped = current[flip]
+        spins[idxs[flip]] = -flipped
+        # up spins flipped down, less down spins flipped up
+        net_down = int(flipped.sum(dtype=np.int64))
+        d_energy = float(delta[keys[flip]].sum())
+        return d_energy, np.array([net_down, -net_down], dtype=np.int64)
+
+    def magnetization_from_counts(self, counts: np.ndarray) -> float:
+        total = counts.sum()
+        if total == 0:
+            return 0.0
+        return float((counts * self.values).sum() / total)
+
+
+class PottsModel(SpinModel):
+    """The q-state Potts model, with spins from 0 to q - 1 and the energy
+
+        E = -J * sum_<ij> delta(s_i, s_j) - h * sum_i delta(s_i, 0)
+
+    where the first sum runs over pairs of neighbors, and the field favors the
+    value 0. The magnetization is the order parameter
+    (q * max_s n_s / N - 1) / (q - 1), where n_s is the number of spins with
+    value s, which is 0 for an even mixture of values and 1 when all the spins
+    are aligned.
+
+    The spin values are their own indices, and the energies of a site only
+    depend on how many of its neighbors hold each value, which are counted by
+    comparing the neighbor spins with each value.
+    """
+
+    def __init__(
+        self,
+        structure: PeriodicStructure,
+        num_states: int = 3,
+        coupling: float = 1.0,
+        field: float = 0.0,
+        nb_builder: NeighborhoodBuilder = None,
+    ) -> None:
+        """Instantiates the PottsModel.
+
+        Parameters
+        ----------
+        structure : PeriodicStructure
+            The structure on which the spins are placed.
+        num_states : int, optional
+            The number of spin values q, by default 3
+        coupling : float, optional
+            The coupling constant J between neighboring spins, by default 1.0
+        field : float, optional
+            The external field h, by default 0.0
+        nb_builder : NeighborhoodBuilder, optional
+            The builder of the neighborhood of interacting sites, by default the
+            von Neumann neighborhood of size 1 for the dimension of the structure
+        """
+        if num_states < 2:
+            raise ValueError("The Potts model requires at least two states")
+        # wide enough to add two values without overflow when proposing moves
+        self.values = np.arange(
+            num_states, dtype=np.min_scalar_type(2 * num_states - 2)
+        )
+        super().__init__(structure, coupling, field, nb_builder)
+
+    def value_indices(self, spins: np.ndarray) -> np.ndarray:
+        return np.asarray(spins, dtype=np.intp)
+
+    def local_energies(
+        self, spins: np.ndarray, idxs: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        nbs = self.neighbors[idxs].T
+        nb_spins = spins[nbs]
+        counts = np.stack(
+            [
+                _neighbor_matches(nb_spins, value, nbs >= 0)
+                for value in range(self.num_values)
+            ],
+            axis=1,
+        )
+
+        field = np.zeros(self.num_values)
+        field[0] = -self.field
+        return -self.coupling * counts, field
+
+    def _metropolis(self, spins, idxs, nbs, mask, beta, rng):
+        # the spins are their own value indices
+        dtype = self.values.dtype
+        current = spins[idxs].astype(dtype, copy=False)
+        proposed = current + rng.integers(1, self.num_values, len(idxs), dtype=dtype)
+        # the values are unsigned, so subtracting q wraps the sums below q around,
+        # and the smaller of the two is the sum modulo q
+        proposed = np.minimum(proposed, proposed - dtype.type(self.num_values))
+        nb_spins = spins[nbs]
+        d_matches = _neighbor_matches(nb_spins, proposed, mask)
+        d_matches -= _neighbor_matches(nb_spins, current, mask)
+        d_zeros = (proposed == 0).view(np.int8) - (current == 0).view(np.int8)
+        # the energy change for each change in the number of matching neighbors
+        # (rows) and in the number of zero spins (columns)
+        delta = np.add.outer(
+            -self.coupling * np.arange(-len(nbs), len(nbs) + 1),
+            -self.field * np.arange(-1, 2),
+        ).ravel()
+        keys = (d_matches + len(nbs)) * 3 + d_zeros + 1
+        keys = keys.astype(np.intp)
+        accept = np.exp(-beta * np.maximum(delta, 0))
+        move = rng.random(len(idxs)) < accept[keys]
+        return self._apply_moves(spins, idxs, current, proposed, move, delta[keys])
+
+    def _heat_bath(self, spins, idxs, nbs, mask, beta, rng):
+        current = spins[idxs]
+        nb_spins = spins[nbs]
+        energies = -self.coupling * np.stack(
+            [_neighbor_matches(nb_spins, value, mask) for value in self.values]
+        )
+        energies[0] -= self.field
+        new = _draw_boltzmann(energies, beta, rng)
+        flat = energies.ravel()
+        cols = np.arange(len(idxs))
+        delta = flat[new * len(idxs) + cols]
+        delta -= flat[self.value_indices(current) * len(idxs) + cols]
+        return self._apply_moves(spins, idxs, current, new, new != current, delta)
+
+    def magnetization_from_counts(self, counts: np.ndarray) -> float:
+        total = counts.sum()
+        if total == 0:
+            return 0.0
+        return float(
+            (self.num_values * counts.max() / total - 1) / (self.num_values - 1)
+        )
+
+
+def _nearest_neighbor_builder(dim: int) -> NeighborhoodBuilder:
+    if dim == 2:
+        return VonNeumannNbHood2DBuilder(1)
+    if dim == 3:
+        return VonNeumannNbHood3DBuilder(1)
+    # in one dimension, the Moore neighborhood only holds the nearest neighbors
+    return MooreNbHoodBuilder(1, dim=dim)
+
+
+def _neighbor_sums(spins: np.ndarray, nbs: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    # The sums of the neighbor spins, given one row of neighbors per neighbor slot
+    nb_spins = spins[nbs]
+    if mask is not None:
+        nb_spins = np.where(mask, nb_spins, 0)
+    # adding the rows one at a time is much faster than summing over axis 0
+    sums = np.zeros(nbs.shape[1], dtype=np.int32)
+    for row in nb_spins:
+        sums += row
+    return sums
+
+
+def _neighbor_matches(
+    nb_spins: np.ndarray, values: np.ndarray, mask: np.ndarray
+) -> np.ndarray:
+    # The number of neighbors of each site holding the value given for it
+    matches = nb_spins == values
+    if mask is not None:
+        matches &= mask
+    counts = np.zeros(matches.shape[1], dtype=np.int32)
+    for row in matches:
+        counts += row
+    return counts
+
+
+def _draw_boltzmann(
+    energies: np.ndarray, beta: float, rng: np.random.Generator
+) -> np.ndarray:
+    # Draws the value index of each site from the Boltzmann distribution, given
+    # the energies of the values (rows) at each site (columns)
+    weights = np.exp(-beta * (energies - energies.min(axis=0)))
+    draws = rng.random(energies.shape[1]) * weights.sum(axis=0)
+    # the number of values whose cumulative weight does not exceed the draw
+    new = np.zeros(energies.shape[1], dtype=np.intp)
+    cumulative = np.zeros(energies.shape[1])
+    for row in weights[:-1]:
+        cumulative += row
+        new += cumulative <= draws
+    return new
@@ -1,13 +1,14 @@
-import random
 import typing
 
 import numpy as np
 
 from ...core.constants import LOCATION, SITE_ID
 from ...core.distance_map import distance
+from ...core.neighborhood_cache import build_neighborhood
 from ...core.neighborhoods import Neighborhood
 from ...core.simulation import Simulation
 from ...core.periodic_structure import PeriodicStructure
+from ...core.rng import Seed, default_rng
 from ...core.simulation_state import SimulationState
 from ...discrete.phase_set import PhaseSet
 from ...discrete.state_constants import DISCRETE_OCCUPANCY
@@ -152,6 +153,7 @@ class DiscreteGridSetup:
         num_particles: int,
         bulk_phase: str,
         particle_phases: str,
+        seed: Seed = None,
     ) -> Simulation:
         """Generates a starting state with a one phase in the background and num_particles particles distributed
         onto it randomly
@@ -168,20 +170,24 @@ class DiscreteGridSetup:
             The name of the containing phase
         particle_phases : str
             The name of the particulate phase
+        seed : Seed, optional
+            The seed for the placement of the particles. If None, it is drawn
+            from the global random modules, by default None
 
         Returns
         -------
         Simulation
             The resulting Simulation.
         """
+        rng = default_rng(seed)
         structure = self._builder.build(size)
         state: SimulationState = self.setup_solid_phase(structure, bulk_phase)
         for _ in range(num_particles):
             rand_coords = tuple(
-                np.random.choice(int(structure.lattice.vec_lengths[0]))
+                int(rng.integers(int(structure.lattice.vec_lengths[0])))
                 for _ in range(structure.dim)
             )
-            phase: str = random.choice(particle_phases)
+            phase: str = particle_phases[rng.integers(len(particle_phases))]
             state: np.array = self.add_particle_to_state(
                 structure, state, rand_coords, radius, phase
             )
@@ -252,7 +258,9 @@ class DiscreteGridSetup:
                 state.set_site_state(site_id, {DISCRETE_OCCUPANCY: phase})
         return Simulation(state, structure)
 
-    def setup_noise(self, size: int, phases: typing.List[str]) -> Simulation:
+    def setup_noise(
+        self, size: int, phases: typing.List[str], seed: Seed = None
+    ) -> Simulation:
         """Generates an initial simulation state with sites randomly assigned one
         of the provided list of phases
 
@@ -262,17 +270,22 @@ class DiscreteGridSetup:
             The size of the simulation to generate.
         phases : typing.List[str]
             The phases to be randomly assigned
+        seed : Seed, optional
+            The seed for the assignment of phases. If None, it is drawn from the
+            global random modules, by default None
 
         Returns
         -------
         Simulation
             The resulting simulation.
         """
+        rng = default_rng(seed)
         structure = self._builder.build(size)
         state: SimulationState = self._build_blank_state(structure)
         for site in structure.sites():
             state.set_site_state(
-                site[SITE_ID], {DISCRETE_OCCUPANCY: random.choice(phases)}
+                site[SITE_ID],
+                {DISCRETE_OCCUPANCY: phases[rng.integers(len(phases))]},
             )
         return Simulation(state, structure)
 
@@ -283,6 +296,7 @@ class DiscreteGridSetup:
         background_spec: str,
         nuc_amts: typing.Dict[str, float],
         buffer: int = 2,
+        seed: Seed = None,
     ) -> Simulation:
         """Generates an initial simulation state with a background phase filling space and
         random sites filled in with other phases as specified by the provided ratios.
@@ -299,6 +313,9 @@ class DiscreteGridSetup:
             The ratios of the phases to assign to the selected sites
         buffer : int, optional
             The minimum distance between selected sites, by default 2
+        seed : Seed, optional
+            The seed for the selection of sites. If None, it is drawn from the
+            global random modules, by default None
 
         Returns
         -------
@@ -311,12 +328,13 @@ class DiscreteGridSetup:
             If the buffer between sites is too large, and the num_sites_desired cannot fit
             in the specifed simulation size, a RuntimeError is thrown
         """
+        rng = default_rng(seed)
         structure = self._builder.build(size)
         num_sites_desired = round(num_sites_desired)
         state = self.setup_solid_phase(structure, background_spec)
         if buffer is not None:
             nb_spec: MooreNbHoodBuilder = MooreNbHoodBuilder(buffer, dim=structure.dim)
-            nb_graph: Neighborhood = nb_spec.get(structure)
+            nb_graph: Neighborhood = build_neighborhood(nb_spec, structure)
         all_sites = structure.sites()
 
         nuc_species = []
@@ -352,7 +370,7 @@ class DiscreteGridSetup:
                     f"Too many nucleation sites at the specified buffer: {total_attempts} made at placing nuclei"
                 )
 
-            rand_site = random.choice(all_sites)
+            rand_site = all_sites[rng.integers(len(all_sites))]
             rand_site_id = rand_site[SITE_ID]
             if (
                 state.get_site_state(rand_site_id)[DISCRETE_OCCUPANCY]
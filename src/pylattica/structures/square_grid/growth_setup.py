@@ -1,7 +1,8 @@
-from ...core import SynchronousRunner, Simulation
+from ...core import SynchronousRunner, Simulation, EmptyUpdates
 from ...core.neighborhood_builders import NeighborhoodBuilder
 from ...discrete import PhaseSet
 from ...models.growth import GrowthController
+from ...core.rng import Seed, seed_sequence
 from .grid_setup import DiscreteGridSetup
 
 from typing import Dict
@@ -39,6 +40,7 @@ class GrowthSetup:
         nuc_amts: Dict[str, float],
         nb_builder: NeighborhoodBuilder,
         buffer: int = 2,
+        seed: Seed = None,
     ) -> Simulation:
         """Runs the growth simulation and produces a starting state.
 
@@ -57,12 +59,17 @@ class GrowthSetup:
             each particle.
         buffer : int, optional
             The minimum distance between seed sites, by default 2
+        seed : Seed, optional
+            The seed from which the placement of the nucleation sites and the growth
+            run are derived. If None, it is drawn from the global random modules,
+            by default None
 
         Returns
         -------
         Simulation
             The resulting Simulation.
         """
+        setup_seq, run_seq = seed_sequence(seed).spawn(2)
         setup = DiscreteGridSetup(self._phases, dim=self.dim)
 
         simulation = setup.setup_random_sites(
@@ -71,6 +78,7 @@ class GrowthSetup:
             background_spec=background_spec,
             nuc_amts=nuc_amts,
             buffer=buffer,
+            seed=setup_seq,
         )
 
         controller = GrowthController(
@@ -81,5 +89,11 @@ class GrowthSetup:
         )
 
         runner = SynchronousRunner(parallel=True)
-        res = runner.run(simulation.state, controller, num_steps=size)
+        res = runner.run(
+            simulation.state,
+            controller,
+            num_steps=size,
+            convergence=[EmptyUpdates()],
+            seed=run_seq,
+        )
         return Simulation(res.last_step, simulation.structure)
@@ -4,7 +4,7 @@ import time
 import sys
 
 from .structure_artist import StructureArtist
-from ..core import SimulationResult
+from ..core import ResultCursor, SimulationResult
 
 from PIL import Image
 
@@ -26,6 +26,7 @@ class ResultArtist:
         """
         self._step_artist = step_artist
         self.result = result
+        self._cursor = None
 
     def _get_images(self, **kwargs):
         draw_freq = kwargs.get("draw_freq", 1)
@@ -63,6 +64,8 @@ class ResultArtist:
         cell_size=20,
     ) -> None:
         """In a jupyter notebook environment, visualizes the step as a color coded phase grid.
+        Steps are retrieved with a ResultCursor, so showing a step near the previously
+        shown one, in either direction, does not replay the result.
 
         Parameters
         ----------
@@ -72,7 +75,9 @@ class ResultArtist:
             The size of each simulation cell, in pixels, by default 20
         """
         label = f"Step {step_no}"  # pragma: no cover
-        step = self.result.get_step(step_no)  # pragma: no cover
+        if self._cursor is None:  # pragma: no cover
+            self._cursor = ResultCursor(self.result)  # pragma: no cover
+        step = self._cursor.seek(step_no)  # pragma: no cover
         self._step_artist.jupyter_show(
             step, label=label, cell_size=cell_size
         )  # pragma: no cover
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from pylattica.core import SimulationResult, SimulationState, SynchronousRunner, BasicController
+from pylattica.core.compact_diff import CompactDiff, ValueTable
+
+
+@pytest.mark.parametrize("updates", [
+    { 3: { "a": 1 }, 1: { "a": 1, "b": "x" }, 300: { "b": "y" } },
+    { "SITES": { 5: { "a": 2.0 } }, "GENERAL": {} },
+    { "SITES": { 5: { "a": True } }, "GENERAL": { "t": 1.5 } },
+    { "SITES": { 70000: { "a": None } } },
+    { "SITES": {}, "GENERAL": { "t": 1 } },
+    {},
+])
+def test_round_trip(updates):
+    table = ValueTable()
+    diff = CompactDiff.encode(updates, table)
+    assert diff.decode(table) == updates
+
+
+def test_values_distinguished_by_type():
+    table = ValueTable()
+    updates = { 0: { "a": 1 }, 1: { "a": 1.0 }, 2: { "a": True } }
+    decoded = CompactDiff.encode(updates, table).decode(table)
+
+    assert [type(decoded[i]["a"]) for i in range(3)] == [int, float, bool]
+    assert len(table) == 3
+
+
+def test_unhashable_values():
+    table = ValueTable()
+    updates = { 0: { "a": [1, 2], "b": "x" }, 1: { "a": { "c": 3 } } }
+    assert CompactDiff.encode(updates, table).decode(table) == updates
+
+
+def test_run_length_encoded_column():
+    table = ValueTable()
+    updates = { i: { "phase": "A" if i < 500 else "B" } for i in range(1000) }
+    diff = CompactDiff.encode(updates, table)
+
+    site_ids, values = diff.column("phase", table)
+    assert (site_ids == np.arange(1000)).all()
+    assert values == ["A"] * 500 + ["B"] * 500
+    assert diff.decode(table) == updates
+
+
+def test_column_of_partial_key():
+    table = ValueTable()
+    diff = CompactDiff.encode({ 2: { "a": 1 }, 4: { "b": 2 }, 9: { "a": 3 } }, table)
+
+    site_ids, values = diff.column("a", table)
+    assert site_ids.tolist() == [2, 9]
+    assert values == [1, 3]
+
+    site_ids, values = diff.column("missing", table)
+    assert len(site_ids) == 0 and values == []
+
+
+@pytest.mark.parametrize("updates", [
+    { 3: { "a": 1 }, 1: { "a": 1, "b": "x" }, 300: { "b": "y" }, 7: {} },
+    { "SITES": { 2: { "a": [1] } }, "GENERAL": { "t": 1.5 } },
+])
+def test_apply_matches_batch_update(updates):
+    table = ValueTable()
+    diff = CompactDiff.encode(updates, table)
+
+    expected = SimulationState()
+    expected.set_site_state(3, { "a": 0, "c": 2 })
+    applied = expected.copy(deep=True)
+
+    expected.batch_update(updates)
+    diff.apply(applied, table)
+    assert applied == expected
+
+
+def test_compressed_result_matches_uncompressed():
+    state = SimulationState()
+    state.batch_update({ i: { "a": 0 } for i in range(20) })
+
+    plain = SimulationResult(state)
+    compressed = SimulationResult(state, compress=True)
+    for step in range(10):
+        updates = { "SITES": { i: { "a": step } for i in range(step, 20, 3) }, "GENERAL": { "step": step } }
+        plain.add_step(updates)
+        compressed.add_step(updates)
+
+    assert list(compressed.diffs()) == list(plain.diffs())
+    assert list(compressed.site_updates()) == list(plain.site_updates())
+    assert [s.as_dict() for s in compressed.steps()] == [s.as_dict() for s in plain.steps()]
+    assert compressed.get_step(4) == plain.get_step(4)
+    assert compressed.last_step == plain.last_step
+
+    rehydrated = SimulationResult.from_dict(compressed.as_dict())
+    assert rehydrated.compress
+    assert rehydrated.last_step == plain.last_step
+
+
+def test_runner_compress_diffs(square_grid_2D_4x4):
+    class CountingController(BasicController):
+        def get_state_update(self, site_id, prev_state):
+            return { "value": prev_state.get_site_state(site_id)["value"] + 1 }
+
+    state = SimulationState.from_struct(square_grid_2D_4x4)
+    for site_id in square_grid_2D_4x4.site_ids:
+        state.set_site_state(site_id, { "value": 0 })
+
+    result = SynchronousRunner().run(state, CountingController(), 5, compress_diffs=True)
+
+    assert result.compress
+    assert all(isinstance(diff, CompactDiff) for diff in result._diffs)
+    assert all(s["value"] == 5 for s in result.last_step.all_site_states())
@@ -0,0 +1,192 @@
+import pytest
+
+from pylattica.core import (
+    SynchronousRunner,
+    AsynchronousRunner,
+    SublatticeRunner,
+    BasicController,
+    SimulationState,
+    EmptyUpdates,
+    NoChange,
+    ObservablePlateau,
+    CycleDetection,
+)
+from pylattica.core import convergence
+from pylattica.structures.square_grid import VonNeumannNbHood2DBuilder
+
+
+class SaturatingController(BasicController):
+    """Counts each site up to a ceiling, after which it produces no updates."""
+
+    def __init__(self, ceiling):
+        self.ceiling = ceiling
+
+    def get_state_update(self, site_id: int, prev_state: SimulationState):
+        prev = prev_state.get_site_state(site_id)["value"]
+        if prev < self.ceiling:
+            return { "value": prev + 1 }
+        return {}
+
+
+class RepeatingController(BasicController):
+    """Always writes the current value back to the site."""
+
+    def get_state_update(self, site_id: int, prev_state: SimulationState):
+        return { "value": prev_state.get_site_state(site_id)["value"] }
+
+
+class CyclingController(BasicController):
+    """Cycles every site through the values 0, 1, ..., period - 1."""
+
+    def __init__(self, period):
+        self.period = period
+
+    def get_state_update(self, site_id: int, prev_state: SimulationState):
+        prev = prev_state.get_site_state(site_id)["value"]
+        return { "value": (prev + 1) % self.period }
+
+
+class IdleController(BasicController):
+    """Never produces an update."""
+
+    def __init__(self, neighborhood):
+        super().__init__()
+        self.neighborhood = neighborhood
+
+    def get_neighborhood(self):
+        return self.neighborhood
+
+    def get_state_update(self, site_id: int, prev_state: SimulationState):
+        return None
+
+
+@pytest.fixture
+def initial_state(square_grid_2D_4x4):
+    state = SimulationState.from_struct(square_grid_2D_4x4)
+    for site_id in square_grid_2D_4x4.site_ids:
+        state.set_site_state(site_id, { "value": 0 })
+    return state
+
+
+def test_runs_all_steps_without_criteria(initial_state):
+    result = SynchronousRunner().run(initial_state, SaturatingController(3), 10)
+    assert len(result) == 11
+    assert result.termination_reason is None
+
+
+def test_empty_updates(initial_state):
+    result = SynchronousRunner().run(
+        initial_state, SaturatingController(3), 100, convergence=[EmptyUpdates()]
+    )
+    assert len(result) == 5
+    assert "no updates" in result.termination_reason
+    assert result.last_step.get_site_state(0)["value"] == 3
+
+
+@pytest.mark.parametrize("runner", [SynchronousRunner(), SublatticeRunner()])
+def test_empty_updates_when_controller_returns_none(initial_state, runner, square_grid_2D_4x4):
+    controller = IdleController(VonNeumannNbHood2DBuilder().get(square_grid_2D_4x4))
+    result = runner.run(initial_state, controller, 5, convergence=[EmptyUpdates()])
+    assert len(result) == 2
+    assert "no updates" in result.termination_reason
+    assert result.last_step.get_site_state(0)["value"] == 0
+
+
+def test_no_change(initial_state):
+    result = SynchronousRunner().run(
+        initial_state, RepeatingController(), 100, convergence=[EmptyUpdates()]
+    )
+    assert len(result) == 101
+
+    result = SynchronousRunner().run(
+        initial_state, RepeatingController(), 100, convergence=[NoChange(3)]
+    )
+    assert len(result) == 4
+    assert "3 steps" in result.termination_reason
+
+
+def test_observable_plateau(initial_state):
+    def _total(state):
+        return sum(s["value"] for s in state.all_site_states())
+
+    criterion = ObservablePlateau(_total, window=3)
+    result = SynchronousRunner().run(
+        initial_state, SaturatingController(4), 100, convergence=[criterion]
+    )
+    assert len(result) == 7
+    assert result.termination_reason == criterion.reason
+
+
+def test_cycle_detection(initial_state):
+    criterion = CycleDetection()
+    result = SynchronousRunner().run(
+        initial_state, CyclingController(3), 100, convergence=[criterion]
+    )
+    assert criterion.period == 3
+    assert len(result) == 4
+    assert "period 3" in result.termination_reason
+
+    criterion = CycleDetection()
+    result = SynchronousRunner().run(
+        initial_state, SaturatingController(2), 100, convergence=[criterion]
+    )
+    assert criterion.period == 1
+    assert "fixed point" in result.termination_reason
+
+
+def test_cycle_detection_checks_states_on_hash_collisions(initial_state, monkeypatch):
+    monkeypatch.setattr(convergence, "_hash_value", lambda *_: 0)
+    criterion = CycleDetection()
+    SynchronousRunner().run(
+        initial_state, CyclingController(3), 100, convergence=[criterion]
+    )
+    assert criterion.period == 3
+
+
+def test_cycle_detection_distinguishes_types(initial_state):
+
+    class TruthController(BasicController):
+        def get_state_update(self, site_id: int, prev_state: SimulationState):
+            return { "value": True }
+
+    for site_id in initial_state.site_ids():
+        initial_state.set_site_state(site_id, { "value": 1 })
+
+    result = SynchronousRunner().run(
+        initial_state, TruthController(), 100, convergence=[CycleDetection()]
+    )
+    assert len(result) == 3
+    assert "fixed point" in result.termination_reason
+
+
+def test_cycle_detection_max_period(initial_state):
+    criterion = CycleDetection(max_period=2)
+    result = SynchronousRunner().run(
+        initial_state, CyclingController(3), 20, convergence=[criterion]
+    )
+    assert criterion.period is None
+    assert len(result) == 21
+
+
+def test_async_runner_convergence(initial_state):
+    result = AsynchronousRunner().run(
+        initial_state, RepeatingController(), 100, convergence=[NoChange(5)]
+    )
+    assert len(result) == 6
+    assert result.termination_reason is not None
+
+
+def test_async_runner_records_empty_queue(initial_state):
+
+    class FirstSiteController(RepeatingController):
+        called = False
+
+        def get_random_site(self, _):
+            if not self.called:
+                self.called = True
+                return 0
+            return []
+
+    result = AsynchronousRunner().run(initial_state, FirstSiteController(), 10)
+    assert len(result) == 2
+    assert "no further sites" in result.termination_reason
@@ -0,0 +1,112 @@
+import pytest
+import random
+
+from pylattica.core import (
+    AsynchronousRunner,
+    BasicController,
+    EnsembleRunner,
+    SimulationState,
+    SynchronousRunner,
+    StateFunctionObserver,
+)
+from pylattica.core.runner import ensemble_runner
+
+from helpers.helpers import skip_windows_due_to_parallel
+
+
+class RandomWalkController(BasicController):
+    """Adds a random step of -1 or 1 to the value of each site."""
+
+    def __init__(self):
+        self.pre_run_calls = 0
+
+    def pre_run(self, _):
+        self.pre_run_calls += 1
+
+    def get_state_update(self, site_id: int, prev_state: SimulationState):
+        prev = prev_state.get_site_state(site_id)["value"]
+        return { "value": prev + random.choice([-1, 1]) }
+
+
+def _total(state):
+    return sum(s["value"] for s in state.all_site_states())
+
+
+@pytest.fixture
+def initial_state(square_grid_2D_4x4):
+    state = SimulationState.from_struct(square_grid_2D_4x4)
+    for site_id in square_grid_2D_4x4.site_ids:
+        state.set_site_state(site_id, { "value": 0 })
+    return state
+
+
+@skip_windows_due_to_parallel
+def test_ensemble_is_reproducible(initial_state):
+    controller = RandomWalkController()
+    runner = EnsembleRunner(workers=2)
+
+    first = runner.run(initial_state, controller, 10, num_replicas=4, seed=12)
+    second = runner.run(initial_state, controller, 10, num_replicas=4, seed=12)
+    other = runner.run(initial_state, controller, 10, num_replicas=4, seed=13)
+
+    assert len(first) == 4
+    final_states = [res.last_step for res in first.results]
+    assert final_states == [res.last_step for res in second.results]
+    assert final_states != [res.last_step for res in other.results]
+    assert len({_total(state) for state in final_states}) > 1
+
+
+@skip_windows_due_to_parallel
+def test_ensemble_independent_of_workers(initial_state):
+    controller = RandomWalkController()
+    parallel = EnsembleRunner(workers=3).run(
+        initial_state, controller, 5, num_replicas=5, seed=7
+    )
+    serial = EnsembleRunner(workers=1).run(
+        initial_state, controller, 5, num_replicas=5, seed=7
+    )
+
+    for par_res, ser_res in zip(parallel.results, serial.results):
+        assert par_res.last_step == ser_res.last_step
+
+
+def test_ensemble_pre_run_called_once(initial_state):
+    controller = RandomWalkController()
+    EnsembleRunner(workers=1).run(initial_state, controller, 3, num_replicas=3)
+    assert controller.pre_run_calls == 1
+
+
+def test_ensemble_releases_run_objects(initial_state):
+    EnsembleRunner(workers=1).run(initial_state, RandomWalkController(), 3, num_replicas=2)
+    assert ensemble_runner._ensemble_globals == {}
+
+
+@skip_windows_due_to_parallel
+def test_ensemble_observables(initial_state):
+    controller = RandomWalkController()
+    observer = StateFunctionObserver(_total, interval=2)
+    ensemble = EnsembleRunner(AsynchronousRunner(), workers=2).run(
+        initial_state,
+        controller,
+        10,
+        num_replicas=3,
+        seed=1,
+        observers=[observer],
+        record_history=False,
+    )
+
+    steps, values = ensemble.observable(0)
+    assert steps == [0, 2, 4, 6, 8, 10]
+    assert len(values) == 3
+    for res, replica_values in zip(ensemble.results, values):
+        assert len(res) == 1
+        assert replica_values[-1] == _total(res.last_step)
+
+    mean_steps, means = ensemble.mean_observable(0)
+    assert list(mean_steps) == steps
+    assert means[-1] == pytest.approx(sum(v[-1] for v in values) / 3)
+
+
+def test_ensemble_rejects_parallel_runner():
+    with pytest.raises(ValueError, match="must not be parallel"):
+        EnsembleRunner(SynchronousRunner(parallel=True))
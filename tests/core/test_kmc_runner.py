@@ -0,0 +1,159 @@
+import random
+
+import numpy as np
+import pytest
+
+from pylattica.core import (
+    BasicController,
+    KineticController,
+    KineticMonteCarloRunner,
+    RateTree,
+    SimulationState,
+)
+from pylattica.core.constants import SIMULATION_TIME
+from pylattica.structures.square_grid import (
+    SimpleSquare2DStructureBuilder,
+    VonNeumannNbHood2DBuilder,
+)
+
+
+class DecayController(KineticController):
+    """Each occupied site decays with rate 1, plus 1 for each occupied neighbor."""
+
+    def __init__(self, structure):
+        self.nbhood = VonNeumannNbHood2DBuilder(1).get(structure)
+
+    def get_neighborhood(self):
+        return self.nbhood
+
+    def get_rate(self, site_id, state):
+        if state.get_site_state(site_id)["value"] == 0:
+            return 0.0
+        return 1.0 + sum(
+            state.get_site_state(nb)["value"] for nb in self.nbhood.neighbors_of(site_id)
+        )
+
+    def get_state_update(self, site_id, prev_state):
+        return { "value": 0 }
+
+
+@pytest.fixture
+def structure():
+    return SimpleSquare2DStructureBuilder().build(5)
+
+
+@pytest.fixture
+def full_state(structure):
+    state = SimulationState.from_struct(structure)
+    for site_id in structure.site_ids:
+        state.set_site_state(site_id, { "value": 1 })
+    return state
+
+
+def test_rate_tree_total_and_find():
+    tree = RateTree([1.0, 0.0, 2.0, 3.0, 0.0])
+
+    assert tree.total == 6.0
+    assert tree.find(0.0) == 0
+    assert tree.find(0.99) == 0
+    assert tree.find(1.0) == 2
+    assert tree.find(2.99) == 2
+    assert tree.find(3.0) == 3
+    assert tree.find(5.99) == 3
+    assert tree.find(6.0) == 3
+
+
+def test_rate_tree_update():
+    tree = RateTree([1.0] * 7)
+
+    tree.update(3, 0.0)
+    tree.update(6, 4.0)
+    assert tree.total == 9.0
+    assert tree.rate(6) == 4.0
+    assert [tree.find(v) for v in [2.5, 3.5, 5.5]] == [2, 4, 6]
+
+    for _ in range(20):
+        tree.update(0, random.random())
+    assert tree.total == pytest.approx(sum(tree.rate(i) for i in range(len(tree))))
+
+
+def test_rate_tree_rejects_negative_rates():
+    with pytest.raises(ValueError):
+        RateTree([1.0, -1.0])
+
+    tree = RateTree([1.0])
+    with pytest.raises(ValueError):
+        tree.update(0, -2.0)
+
+
+def test_rate_tree_sampling_is_proportional():
+    rates = [1.0, 0.0, 3.0, 6.0]
+    tree = RateTree(rates)
+    rng = np.random.default_rng(0)
+
+    counts = np.zeros(4)
+    for value in rng.random(20000) * tree.total:
+        counts[tree.find(value)] += 1
+
+    assert counts[1] == 0
+    assert np.allclose(counts / counts.sum(), np.array(rates) / 10, atol=0.02)
+
+
+def test_kmc_runner_runs_until_no_events(structure, full_state):
+    random.seed(0)
+    result = KineticMonteCarloRunner().run(full_state, DecayController(structure), 100)
+
+    assert len(result) == 1 + 25
+    assert result.termination_reason == "No events with a nonzero rate remain"
+    assert all(s["value"] == 0 for s in result.last_step.all_site_states())
+
+    times = [diff["GENERAL"][SIMULATION_TIME] for diff in result._diffs]
+    assert all(t2 > t1 for t1, t2 in zip(times, times[1:]))
+    assert result.last_step.get_general_state()[SIMULATION_TIME] == times[-1]
+
+
+def test_kmc_runner_only_selects_active_sites(structure, full_state):
+    random.seed(1)
+    state = full_state.copy()
+    for site_id in range(10):
+        state.set_site_state(site_id, { "value": 0 })
+
+    result = KineticMonteCarloRunner().run(state, DecayController(structure), 5)
+
+    for diff in result._diffs:
+        assert all(site_id >= 10 for site_id in diff["SITES"])
+
+
+def test_kmc_runner_stops_at_max_time(structure, full_state):
+    random.seed(2)
+    result = KineticMonteCarloRunner(max_time=0.05).run(
+        full_state, DecayController(structure), 100
+    )
+
+    assert result.termination_reason == "The maximum simulation time was reached"
+    assert result.last_step.get_general_state()[SIMULATION_TIME] <= 0.05
+
+
+def test_kmc_runner_mean_waiting_time(structure):
+    # A single isolated site decays at rate 1, so the mean decay time is 1
+    state = SimulationState.from_struct(structure)
+    for site_id in structure.site_ids:
+        state.set_site_state(site_id, { "value": 0 })
+    state.set_site_state(12, { "value": 1 })
+
+    random.seed(3)
+    controller = DecayController(structure)
+    times = [
+        KineticMonteCarloRunner().run(state, controller, 1).last_step.get_general_state()[SIMULATION_TIME]
+        for _ in range(2000)
+    ]
+    assert np.mean(times) == pytest.approx(1.0, abs=0.1)
+
+
+def test_kmc_runner_requires_kinetic_controller(full_state):
+    class PlainController(BasicController):
+        def get_state_update(self, site_id, prev_state):
+            return {}
+
+    with pytest.raises(ValueError, match="KineticController"):
+        KineticMonteCarloRunner().run(full_state, PlainController(), 1)
@@ -1,4 +1,11 @@
-from pylattica.core.lattice import pbc_diff_frac_vec, Lattice
+import pytest
+
+from pylattica.core.lattice import (
+    pbc_diff_frac_vec,
+    pairwise_periodic_distances,
+    periodic_distance_chunks,
+    Lattice,
+)
 
 import numpy as np
 
@@ -58,3 +65,44 @@ def test_pbc_diff_cart():
 
 
 
+
+
+def test_batched_transforms():
+    lattice = Lattice([[1, 0], [0.5, 1]])
+    pts = np.array([[0.1, 0.2], [1.7, 3.2], [-0.4, 0.9]])
+
+    frac = lattice.get_fractional_coords(pts)
+    assert frac.shape == (3, 2)
+    assert np.allclose(lattice.get_cartesian_coords(frac), pts)
+
+    periodized = lattice.get_periodized_cartesian_coords(pts)
+    for pt, row in zip(pts, periodized):
+        assert np.allclose(lattice.get_periodized_cartesian_coords(pt), row)
+
+    one_to_many = lattice.cartesian_periodic_distance(pts[0], pts)
+    assert one_to_many.shape == (3,)
+    for pt, dist in zip(pts, one_to_many):
+        assert dist == lattice.cartesian_periodic_distance(pts[0], pt)
+
+
+@pytest.mark.parametrize("max_chunk_elements", [1, 7, 2**22])
+def test_pairwise_periodic_distances(max_chunk_elements):
+    lattice = Lattice([[3, 0, 0], [0, 2, 0], [0, 0, 4]], (True, False, True))
+    rng = np.random.default_rng(0)
+    pts1 = rng.random((11, 3)) * 4
+    pts2 = rng.random((5, 3)) * 4
+
+    dists = pairwise_periodic_distances(pts1, pts2, lattice, max_chunk_elements)
+    assert dists.shape == (11, 5)
+    for i, pt1 in enumerate(pts1):
+        for j, pt2 in enumerate(pts2):
+            assert dists[i, j] == lattice.cartesian_periodic_distance(pt1, pt2)
+
+    self_dists = lattice.pairwise_periodic_distances(pts1)
+    assert np.allclose(self_dists, self_dists.T)
+    assert np.allclose(np.diag(self_dists), 0)
+
+    starts = [
+        start for start, _ in periodic_distance_chunks(pts1, pts2, lattice, 30)
+    ]
+    assert starts == [0, 2, 4, 6, 8, 10]
@@ -0,0 +1,98 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from pylattica.core import Lattice
+from pylattica.core.minimum_image import MinimumImage, lll_reduce
+from pylattica.structures.honeycomb.lattice import RhombohedralLattice
+
+
+def _brute_force_distance(lattice, pt1, pt2, reach=4):
+    periodic_idxs = [i for i, p in enumerate(lattice.periodic) if p]
+    diff = np.subtract(pt1, pt2)
+    best = np.inf
+    for coeffs in itertools.product(range(-reach, reach + 1), repeat=len(periodic_idxs)):
+        shift = np.zeros(lattice.dim)
+        for idx, coeff in zip(periodic_idxs, coeffs):
+            shift += coeff * lattice.matrix[idx]
+        best = min(best, np.linalg.norm(diff + shift))
+    return best
+
+
+def test_lll_reduce():
+    basis = np.array([[1, 0, 0], [7, 1, 0], [12, 5, 1]], dtype=float)
+    reduced, transform = lll_reduce(basis)
+
+    assert np.allclose(transform @ basis, reduced)
+    assert abs(round(np.linalg.det(transform))) == 1
+    assert np.allclose(np.sort(np.linalg.norm(reduced, axis=1)), [1, 1, 1])
+
+
+def test_orthogonal_lattice_uses_rounding_only():
+    lattice = Lattice([[2, 0], [0, 3]])
+    assert lattice.minimum_image.shifts.shape == (1, 2)
+
+
+@pytest.mark.parametrize("lattice", [
+    RhombohedralLattice().get_scaled_lattice([3, 3]),
+    Lattice([[1, 0], [0.9, 0.2]]),
+    Lattice([[2, 0, 0], [1.7, 1, 0], [0.4, 0.8, 1.5]]),
+    Lattice([[2, 0, 0], [1.7, 1, 0], [0.4, 0.8, 1.5]], (True, False, True)),
+])
+def test_distances_match_brute_force(lattice):
+    rng = np.random.default_rng(5)
+    pts1 = rng.random((30, lattice.dim)) @ lattice.matrix
+    pts2 = rng.random((30, lattice.dim)) @ lattice.matrix
+
+    dists = lattice.minimum_image.distance(pts1, pts2)
+    expected = [_brute_force_distance(lattice, p1, p2) for p1, p2 in zip(pts1, pts2)]
+    assert np.allclose(dists, expected)
+
+    diffs = lattice.minimum_image.diff(pts1, pts2)
+    assert np.allclose(np.linalg.norm(diffs, axis=-1), expected)
+
+    pairwise = lattice.pairwise_periodic_distances(pts1[:5], pts2)
+    assert np.allclose(pairwise[:, 0], [
+        _brute_force_distance(lattice, p1, pts2[0]) for p1 in pts1[:5]
+    ], atol=1e-3)
+
+
+def test_rounding_is_not_minimum_image_for_skewed_cells():
+    lattice = Lattice([[1, 0], [0.9, 0.2]])
+    pt1 = np.array([0, 0])
+    pt2 = np.array([0.55, 0.1])
+
+    min_image = MinimumImage(lattice.matrix, lattice.periodic)
+    assert np.isclose(min_image.distance(pt1, pt2), _brute_force_distance(lattice, pt1, pt2))
+    assert np.isclose(lattice.cartesian_periodic_distance(pt1, pt2), min_image.distance(pt1, pt2), atol=1e-3)
+    assert min_image.distance(pt1, pt2) < np.linalg.norm(pt2 - pt1)
+
+
+@pytest.mark.parametrize("matrix, periodic", [
+    ([[1, 0], [1, 1]], (True, False)),
+    ([[1, 0], [1, 1]], (False, True)),
+    ([[1, 0], [3.3, 0.4]], (True, False)),
+    ([[2, 0, 0], [1.7, 1, 0], [0.4, 0.8, 1.5]], (True, False, True)),
+    ([[2, 0, 0], [1.7, 1, 0], [0.4, 0.8, 1.5]], (False, True, False)),
+])
+def test_partially_periodic_skewed_cells(matrix, periodic):
+    min_image = MinimumImage(matrix, periodic)
+
+    lattice = Lattice(matrix, periodic)
+    rng = np.random.default_rng(9)
+    # points spread over several cells along the non-periodic directions
+    pts1 = (rng.random((30, lattice.dim)) * 6 - 3) @ lattice.matrix
+    pts2 = (rng.random((30, lattice.dim)) * 6 - 3) @ lattice.matrix
+
+    expected = [_brute_force_distance(lattice, p1, p2, reach=30) for p1, p2 in zip(pts1, pts2)]
+    assert np.allclose(min_image.distance(pts1, pts2), expected)
+    assert np.allclose(np.linalg.norm(min_image.diff(pts1, pts2), axis=-1), expected)
+
+
+def test_partially_periodic_displacements_are_projected():
+    # the image shifted by -5 * (1, 0) is the shortest, although the fractional
+    # coordinate of (5, 5) along (1, 0) is 0
+    min_image = MinimumImage([[1, 0], [1, 1]], (True, False))
+    assert np.isclose(min_image.distance((5, 5), (0, 0)), 5)
+    assert np.allclose(min_image.diff((5, 5), (0, 0)), [0, 5])
@@ -5,6 +5,7 @@ import math
 
 from pylattica.core.neighborhood_builders import DistanceNeighborhoodBuilder, MotifNeighborhoodBuilder, AnnularNeighborhoodBuilder
 from pylattica.structures.square_grid.structure_builders import SimpleSquare2DStructureBuilder
+from pylattica.core import Lattice, PeriodicStructure
 
 def test_distance_nb_builder(square_grid_2D_4x4):
 
@@ -59,3 +60,87 @@ def test_struct_nb_hood_builder(square_grid_2D_4x4):
     
     for nb_id, nb_dist in nbs_w_dists:
         assert nb_dist == 1.0
+
+
+@pytest.mark.parametrize("builder", [
+    DistanceNeighborhoodBuilder(1.5),
+    AnnularNeighborhoodBuilder(1.1, 2.1),
+])
+def test_batched_builders_match_pairwise_distances(builder):
+    struct = SimpleSquare2DStructureBuilder().build(5)
+    nbhood = builder.get(struct)
+
+    for site in struct.sites():
+        expected = set()
+        for other in struct.sites():
+            if other["_site_id"] == site["_site_id"]:
+                continue
+            dist = struct.lattice.cartesian_periodic_distance(site["_location"], other["_location"])
+            if builder._in_range(np.array([dist]))[0]:
+                expected.add(other["_site_id"])
+
+        assert set(nbhood.neighbors_of(site["_site_id"])) == expected
+        assert set(builder.get_neighbors(site, struct)) == set(nbhood.neighbors_of(site["_site_id"], include_weights=True))
+
+
+def _edges(nbhood):
+    return sorted((s, t, round(float(w), 6)) for s, t, w in nbhood._graph.weighted_edge_list())
+
+
+def _two_class_structure():
+    from pylattica.core import Lattice, PeriodicStructure
+
+    lattice = Lattice([[1, 0], [0.5, 1]])
+    return PeriodicStructure.build_from(
+        lattice, (4, 3), {"A": [[0, 0]], "B": [[0.5, 0.5], [0.25, 0.75]]}, frac_coords=True
+    )
+
+
+@pytest.mark.parametrize("builder", [
+    DistanceNeighborhoodBuilder(0.9),
+    AnnularNeighborhoodBuilder(0.4, 1.2),
+    MotifNeighborhoodBuilder([(1, 0), (0.5, 1), (-1, 0), (-0.5, -1)]),
+])
+def test_translated_neighborhoods_match_full_search(builder):
+    struct = _two_class_structure()
+    assert struct.translatable_tiling() is not None
+
+    translated = builder.get(struct)
+    for site_class in ["A", "B"]:
+        translated_class = builder.get(struct, site_class=site_class)
+        struct.tiling, tiling = None, struct.tiling
+        assert _edges(translated_class) == _edges(builder.get(struct, site_class=site_class))
+        struct.tiling = tiling
+
+    struct.tiling = None
+    assert _edges(translated) == _edges(builder.get(struct))
+
+
+def test_translation_requires_an_intact_periodic_tiling(monkeypatch):
+    struct = _two_class_structure()
+    builder = DistanceNeighborhoodBuilder(0.9)
+
+    translations = []
+    original = builder._translated_edges
+    monkeypatch.setattr(
+        builder, "_translated_edges",
+        lambda *args: translations.append(1) or original(*args)
+    )
+
+    struct.lattice.periodic = (True, False)
+    builder.get(struct)
+    assert translations == []
+
+    struct.lattice.periodic = (True, True)
+    struct.add_site("C", (0.1, 0.1))
+    builder.get(struct)
+    assert translations == []
+
+
+def test_motif_neighborhood_in_non_periodic_structure():
+    lattice = Lattice([[1, 0], [0, 1]], periodic=False)
+    struct = PeriodicStructure.build_from(lattice, (3, 3), { "A": [[0, 0]] })
+    nbhood = MotifNeighborhoodBuilder([(1, 0), (0, 1), (-1, 0), (0, -1)]).get(struct)
+
+    degrees = sorted(len(nbhood.neighbors_of(site_id)) for site_id in struct.site_ids)
+    assert degrees == [2, 2, 2, 2, 3, 3, 3, 3, 4]
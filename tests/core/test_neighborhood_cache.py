@@ -0,0 +1,149 @@
+import os
+
+import pytest
+
+from pylattica.core import NeighborhoodCache, build_neighborhood
+from pylattica.core.neighborhood_builders import (
+    DistanceNeighborhoodBuilder,
+    SiteClassNeighborhoodBuilder,
+)
+from pylattica.core import neighborhood_cache
+from pylattica.core.neighborhood_cache import (
+    CACHE_DIR_ENV_VAR,
+    get_default_cache,
+    neighborhood_key,
+    set_default_cache,
+    structure_hash,
+)
+from pylattica.core.neighborhoods import (
+    Neighborhood,
+    SiteClassNeighborhood,
+    StochasticNeighborhood,
+)
+from pylattica.core import Lattice, PeriodicStructure
+from pylattica.structures.square_grid import (
+    MooreNbHoodBuilder,
+    PseudoHexagonalNeighborhoodBuilder2D,
+    SimpleSquare2DStructureBuilder,
+)
+
+
+def _same_neighbors(nb1, nb2, site_ids):
+    return all(
+        set(nb1.possible_neighbors_of(site_id)) == set(nb2.possible_neighbors_of(site_id))
+        for site_id in site_ids
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_default_cache():
+    yield
+    neighborhood_cache._default_cache.clear()
+
+
+def test_csr_round_trip():
+    struct = SimpleSquare2DStructureBuilder().build(5)
+    nbhood = MooreNbHoodBuilder().get(struct)
+
+    indptr, indices, weights = nbhood.to_csr()
+    assert indptr.tolist() == list(range(0, 25 * 8 + 1, 8))
+    restored = Neighborhood.from_csr(indptr, indices, weights)
+
+    for site_id in struct.site_ids:
+        assert set(restored.neighbors_of(site_id, include_weights=True)) == set(
+            nbhood.neighbors_of(site_id, include_weights=True)
+        )
+
+
+def test_keys_depend_on_structure_and_builder():
+    struct = SimpleSquare2DStructureBuilder().build(5)
+    same = SimpleSquare2DStructureBuilder().build(5)
+    other = SimpleSquare2DStructureBuilder().build(6)
+
+    assert structure_hash(struct) == structure_hash(same)
+    assert structure_hash(struct) != structure_hash(other)
+
+    key = neighborhood_key(MooreNbHoodBuilder(), struct)
+    assert key == neighborhood_key(MooreNbHoodBuilder(), same)
+    assert key != neighborhood_key(MooreNbHoodBuilder(2), struct)
+    assert key != neighborhood_key(DistanceNeighborhoodBuilder(1.5), struct)
+    assert key != neighborhood_key(MooreNbHoodBuilder(), struct, site_class="A")
+
+
+def test_cache_hits_skip_building(tmp_path, monkeypatch):
+    cache = NeighborhoodCache(str(tmp_path))
+    struct = SimpleSquare2DStructureBuilder().build(5)
+    built = cache.get(MooreNbHoodBuilder(), struct)
+    assert len(cache.entries()) == 1
+
+    def fail(*_, **__):
+        raise AssertionError("The neighborhood should have been loaded")
+
+    monkeypatch.setattr(MooreNbHoodBuilder, "get", fail)
+    loaded = cache.get(MooreNbHoodBuilder(), SimpleSquare2DStructureBuilder().build(5))
+    assert _same_neighbors(built, loaded, struct.site_ids)
+
+
+def test_cache_stores_stochastic_and_site_class_neighborhoods(tmp_path):
+    cache = NeighborhoodCache(str(tmp_path))
+    struct = SimpleSquare2DStructureBuilder().build(5)
+
+    builder = PseudoHexagonalNeighborhoodBuilder2D()
+    cache.get(builder, struct)
+    loaded = cache.get(builder, struct)
+    assert isinstance(loaded, StochasticNeighborhood)
+    assert _same_neighbors(builder.get(struct), loaded, struct.site_ids)
+
+    lattice = Lattice([[1, 0], [0, 1]])
+    two_class = PeriodicStructure.build_from(
+        lattice, (3, 3), {"A": [[0, 0]], "B": [[0.5, 0.5]]}, frac_coords=True
+    )
+    sc_builder = SiteClassNeighborhoodBuilder({
+        "A": DistanceNeighborhoodBuilder(0.8),
+        "B": DistanceNeighborhoodBuilder(1.1),
+    })
+    cache.get(sc_builder, two_class)
+    loaded = cache.get(sc_builder, two_class)
+    assert isinstance(loaded, SiteClassNeighborhood)
+    assert _same_neighbors(sc_builder.get(two_class), loaded, two_class.site_ids)
+    assert len(cache.entries()) == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = NeighborhoodCache(str(tmp_path))
+    structs = [SimpleSquare2DStructureBuilder().build(size) for size in [4, 5, 6]]
+    for idx, struct in enumerate(structs):
+        cache.get(MooreNbHoodBuilder(), struct)
+        path = cache._path(neighborhood_key(MooreNbHoodBuilder(), struct))
+        os.utime(path, (idx, idx))
+
+    # using the first entry makes the second one the least recently used
+    cache.get(MooreNbHoodBuilder(), structs[0])
+    sizes = [os.path.getsize(p) for p in cache.entries()]
+    cache.max_bytes = cache.size() - 1
+    cache.evict()
+
+    remaining = cache.entries()
+    assert len(remaining) == 2
+    assert cache._path(neighborhood_key(MooreNbHoodBuilder(), structs[1])) not in remaining
+    assert cache.size() <= sum(sizes)
+
+    cache.clear()
+    assert cache.entries() == []
+
+
+def test_default_cache(tmp_path, monkeypatch):
+    struct = SimpleSquare2DStructureBuilder().build(4)
+
+    monkeypatch.delenv(CACHE_DIR_ENV_VAR, raising=False)
+    assert get_default_cache() is None
+    build_neighborhood(MooreNbHoodBuilder(), struct)
+
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, str(tmp_path / "env"))
+    build_neighborhood(MooreNbHoodBuilder(), struct)
+    assert len(os.listdir(tmp_path / "env")) == 1
+
+    cache = NeighborhoodCache(str(tmp_path / "explicit"))
+    set_default_cache(cache)
+    build_neighborhood(MooreNbHoodBuilder(), struct)
+    assert len(cache.entries()) == 1
@@ -2,6 +2,7 @@ from pylattica.core.neighborhood_builders import MotifNeighborhoodBuilder, SiteC
 from pylattica.core import Lattice, PeriodicStructure
 
 import numpy as np
+import pytest
 
 def test_site_class_neighborhood():
     lattice = Lattice([
@@ -163,4 +164,215 @@ def test_non_periodic_neighborhoods():
     corner_id = non_periodic_struct.id_at(corner_coords)
     corner_nbs = non_periodic_nbhood.neighbors_of(corner_id)
 
-    assert len(corner_nbs) == 2
\ No newline at end of file
+    assert len(corner_nbs) == 2
+
+def _assert_valid_coloring(nbhood, classes, num_sites):
+    assert sorted(site for color in classes for site in color) == list(range(num_sites))
+    for color in classes:
+        color_set = set(color)
+        for site in color:
+            assert color_set.isdisjoint(nbhood.possible_neighbors_of(site))
+
+
+def test_color_classes_checkerboard():
+    from pylattica.structures.square_grid import SimpleSquare2DStructureBuilder, VonNeumannNbHood2DBuilder, MooreNbHoodBuilder
+
+    struct = SimpleSquare2DStructureBuilder().build(6)
+    vn_nbhood = VonNeumannNbHood2DBuilder(1).get(struct)
+    classes = vn_nbhood.color_classes()
+    assert len(classes) == 2
+    _assert_valid_coloring(vn_nbhood, classes, 36)
+
+    moore_nbhood = MooreNbHoodBuilder(1).get(struct)
+    classes = moore_nbhood.color_classes()
+    assert len(classes) == 4
+    _assert_valid_coloring(moore_nbhood, classes, 36)
+
+    assert moore_nbhood.color_classes() is classes
+
+
+def test_color_classes_distance_two():
+    from pylattica.structures.square_grid import SimpleSquare2DStructureBuilder, VonNeumannNbHood2DBuilder
+
+    struct = SimpleSquare2DStructureBuilder().build(6)
+    nbhood = VonNeumannNbHood2DBuilder(1).get(struct)
+    classes = nbhood.color_classes(distance=2)
+
+    for color in classes:
+        footprints = [set(nbhood.neighbors_of(site)) | {site} for site in color]
+        covered = set()
+        for footprint in footprints:
+            assert covered.isdisjoint(footprint)
+            covered |= footprint
+
+
+def test_color_classes_stochastic_neighborhood():
+    lattice = Lattice([[1, 0], [0, 1]])
+    struct = PeriodicStructure.build_from(lattice, (4, 4), { "A": [[0, 0]] })
+
+    nbhood = StochasticNeighborhoodBuilder([
+        MotifNeighborhoodBuilder([(1, 0), (-1, 0)]),
+        MotifNeighborhoodBuilder([(0, 1), (0, -1)]),
+    ]).get(struct)
+
+    classes = nbhood.color_classes()
+    assert len(classes) == 2
+    _assert_valid_coloring(nbhood, classes, 16)
+
+
+def test_stochastic_neighborhood_rng():
+    lattice = Lattice([[1, 0], [0, 1]])
+    struct = PeriodicStructure.build_from(lattice, (4, 4), { "A": [[0, 0]] })
+
+    nbhood = StochasticNeighborhoodBuilder([
+        MotifNeighborhoodBuilder([(1, 0)]),
+        MotifNeighborhoodBuilder([(0, 1)]),
+        MotifNeighborhoodBuilder([(-1, 0)]),
+    ]).get(struct)
+
+    nbhood.set_rng(np.random.default_rng(3))
+    first = [nbhood.neighbors_of(5) for _ in range(20)]
+    nbhood.set_rng(np.random.default_rng(3))
+    assert [nbhood.neighbors_of(5) for _ in range(20)] == first
+    assert len(set(nb for nbs in first for nb in nbs)) == 3
+
+
+def test_sample_neighbors():
+    lattice = Lattice([[1, 0], [0, 1]])
+    struct = PeriodicStructure.build_from(lattice, (4, 4), { "A": [[0, 0]] })
+    nbhood = MotifNeighborhoodBuilder([(1, 0), (0, 1), (-1, 0), (0, -1)]).get(struct)
+
+    sampled = nbhood.sample_neighbors([0, 5, 5])
+    assert sampled.shape == (3, 4)
+    for row, site_id in zip(sampled, [0, 5, 5]):
+        assert set(row.tolist()) == set(nbhood.neighbors_of(site_id))
+
+
+def test_stochastic_sample_neighbors():
+    lattice = Lattice([[1, 0], [0, 1]])
+    struct = PeriodicStructure.build_from(lattice, (4, 4), { "A": [[0, 0]] })
+
+    nbhood = StochasticNeighborhoodBuilder([
+        MotifNeighborhoodBuilder([(1, 0)]),
+        MotifNeighborhoodBuilder([(0, 1), (0, -1)]),
+    ]).get(struct)
+
+    nbhood.set_rng(np.random.default_rng(7))
+    sampled = nbhood.sample_neighbors(list(range(16)) * 10)
+    assert sampled.shape == (160, 2)
+
+    drawn = set()
+    for site_id, row in zip(list(range(16)) * 10, sampled.tolist()):
+        nbs = [nb for nb in row if nb >= 0]
+        choices = [
+            idx for idx, comp in enumerate(nbhood._components())
+            if set(comp.neighbors_of(site_id)) == set(nbs)
+        ]
+        assert len(choices) == 1
+        drawn.add(choices[0])
+    assert drawn == {0, 1}
+
+    nbhood.set_rng(np.random.default_rng(7))
+    assert (nbhood.sample_neighbors(list(range(16)) * 10) == sampled).all()
+
+
+def test_site_class_neighborhood_merges_class_neighborhoods():
+    from pylattica.core.neighborhoods import SiteClassNeighborhood
+
+    lattice = Lattice([[1, 0], [0, 1]])
+    struct = PeriodicStructure.build_from(
+        lattice, (3, 3), { "A": [[0.25, 0.25]], "B": [[0.5, 0.5]], "C": [[0.75, 0.75]] }
+    )
+    builders = {
+        "A": MotifNeighborhoodBuilder([(0.25, 0.25), (0.5, 0.5)]),
+        "C": DistanceNeighborhoodBuilder(0.8),
+    }
+    merged = SiteClassNeighborhoodBuilder(builders).get(struct)
+    from_components = SiteClassNeighborhood(struct, {
+        sclass: builder.get(struct, site_class=sclass) for sclass, builder in builders.items()
+    })
+
+    assert merged.classes == ["A", "B", "C"]
+    assert merged.class_codes.tolist() == [0, 1, 2] * 9
+
+    site_ids = struct.site_ids
+    sampled = merged.sample_neighbors(site_ids)
+    for site_id, row in zip(site_ids, sampled.tolist()):
+        site_class = struct.site_class(site_id)
+        expected = set()
+        if site_class in builders:
+            nbhood = builders[site_class].get(struct, site_class=site_class)
+            expected = set(nbhood.neighbors_of(site_id, include_weights=True))
+
+        assert set(merged.neighbors_of(site_id, include_weights=True)) == expected
+        assert set(from_components.neighbors_of(site_id, include_weights=True)) == expected
+        assert set(nb for nb in row if nb >= 0) == {nb for nb, _ in expected}
+
+    assert merged.neighbors_of(len(site_ids)) == []
+
+
+def test_adjacency_matrix_and_laplacian():
+    lattice = Lattice([[1, 0], [0, 1]])
+    struct = PeriodicStructure.build_from(lattice, (4, 4), { "A": [[0, 0]] })
+    nbhood = DistanceNeighborhoodBuilder(1.5).get(struct)
+
+    values = np.random.default_rng(3).random(16)
+    adjacency = nbhood.adjacency_matrix()
+    assert adjacency.shape == (16, 16)
+    assert nbhood.adjacency_matrix() is adjacency
+
+    expected_sums = [sum(values[nb] for nb in nbhood.neighbors_of(site_id)) for site_id in range(16)]
+    assert np.allclose(adjacency @ values, expected_sums)
+
+    weighted = nbhood.adjacency_matrix(weighted=True)
+    assert np.isclose(weighted[0, 5], np.sqrt(2), atol=1e-3)
+    assert np.isclose(weighted[0, 1], 1)
+
+    laplacian = nbhood.laplacian()
+    assert np.allclose(laplacian @ np.ones(16), 0)
+    assert np.allclose(laplacian.diagonal(), 8)
+    assert np.allclose(laplacian @ values, 8 * values - np.array(expected_sums))
+
+
+def test_stochastic_adjacency_matrix_is_expected_adjacency():
+    lattice = Lattice([[1, 0], [0, 1]])
+    struct = PeriodicStructure.build_from(lattice, (4, 4), { "A": [[0, 0]] })
+    nbhood = StochasticNeighborhoodBuilder([
+        MotifNeighborhoodBuilder([(1, 0)]),
+        MotifNeighborhoodBuilder([(0, 1), (0, -1)]),
+    ]).get(struct)
+
+    adjacency = nbhood.adjacency_matrix().toarray()
+    assert np.isclose(adjacency[0, 4], 0.5)
+    assert np.isclose(adjacency[0, 1], 0.5)
+    assert np.allclose(adjacency.sum(axis=1), 1.5)
+    assert np.allclose(nbhood.laplacian() @ np.ones(16), 0)
+
+    with pytest.raises(NotImplementedError):
+        nbhood.to_csr()
+
+
+def test_neighbor_order_is_stable_and_shared_with_neighbor_array():
+    lattice = Lattice([[1, 0], [0, 1]])
+    struct = PeriodicStructure.build_from(lattice, (5, 5), { "A": [[0, 0]] })
+    nbhood = MotifNeighborhoodBuilder([(1, 0), (0, 1), (-1, 0), (0, -1)]).get(struct)
+
+    for site_id in struct.site_ids:
+        first = nbhood.neighbors_of(site_id)
+        assert all(nbhood.neighbors_of(site_id) == first for _ in range(10))
+        assert nbhood.neighbor_array()[site_id].tolist() == first
+
+
+def test_neighbor_positions():
+    lattice = Lattice([[1, 0], [0, 1]])
+    struct = PeriodicStructure.build_from(lattice, (3, 3), { "A": [[0, 0]] })
+    nbhood = MotifNeighborhoodBuilder([(1, 0), (-1, 0)]).get(struct)
+
+    site_ids = [8, 4, 0, 3, 5]
+    positions = nbhood.neighbor_positions(site_ids)
+    for row, site_id in zip(positions, site_ids):
+        expected = [
+            site_ids.index(nb) if nb in site_ids else -1
+            for nb in nbhood.neighbors_of(site_id)
+        ]
+        assert row.tolist() == expected
@@ -0,0 +1,91 @@
+import pytest
+
+from pylattica.core import (
+    SynchronousRunner,
+    AsynchronousRunner,
+    BasicController,
+    SimulationState,
+    ChangedSiteCountObserver,
+    ReducerObserver,
+    StateFunctionObserver,
+)
+from pylattica.core.constants import SITES
+
+
+class CountUpController(BasicController):
+    """Increments the value at even sites and leaves odd sites unchanged."""
+
+    def get_state_update(self, site_id: int, prev_state: SimulationState):
+        prev = prev_state.get_site_state(site_id)["value"]
+        if site_id % 2 == 0:
+            return { "value": prev + 1 }
+        return { "value": prev }
+
+
+@pytest.fixture
+def initial_state(square_grid_2D_4x4):
+    state = SimulationState.from_struct(square_grid_2D_4x4)
+    for site_id in square_grid_2D_4x4.site_ids:
+        state.set_site_state(site_id, { "value": 0 })
+    return state
+
+
+def _total_value(state):
+    return sum(s["value"] for s in state.all_site_states())
+
+
+def test_changed_site_count_observer(initial_state):
+    observer = ChangedSiteCountObserver()
+    SynchronousRunner().run(initial_state, CountUpController(), 3, observers=[observer])
+
+    assert observer.steps == [0, 1, 2, 3]
+    assert observer.values == [0, 8, 8, 8]
+    assert observer.total == 24
+
+
+def test_reducer_observer(initial_state):
+    def _count_updated_sites(acc, updates, _):
+        return acc + len(updates[SITES])
+
+    observer = ReducerObserver(_count_updated_sites, initial_value=0, interval=2)
+    SynchronousRunner().run(initial_state, CountUpController(), 5, observers=[observer])
+
+    assert observer.steps == [0, 2, 4]
+    assert observer.values == [0, 32, 64]
+
+
+def test_state_function_observer_matches_result(initial_state):
+    observer = StateFunctionObserver(_total_value, interval=2)
+    result = SynchronousRunner().run(
+        initial_state, CountUpController(), 4, observers=[observer]
+    )
+
+    assert observer.steps == [0, 2, 4]
+    for step_no, value in zip(observer.steps, observer.values):
+        assert value == _total_value(result.get_step(step_no))
+
+
+def test_observers_reset_between_runs(initial_state):
+    observer = ChangedSiteCountObserver()
+    runner = SynchronousRunner()
+    runner.run(initial_state, CountUpController(), 3, observers=[observer])
+    runner.run(initial_state, CountUpController(), 2, observers=[observer])
+
+    assert observer.steps == [0, 1, 2]
+    assert observer.total == 16
+
+
+def test_async_run_without_history(initial_state):
+    observer = StateFunctionObserver(_total_value)
+    result = AsynchronousRunner().run(
+        initial_state,
+        CountUpController(),
+        20,
+        observers=[observer],
+        record_history=False,
+    )
+
+    assert len(result) == 1
+    assert len(observer.values) == 21
+    assert observer.values[-1] == _total_value(result.last_step)
+    assert result.first_step == initial_state
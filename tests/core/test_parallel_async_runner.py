@@ -0,0 +1,108 @@
+import pytest
+import random
+from collections import deque
+
+from pylattica.core import AsynchronousRunner, BasicController, SimulationState
+from pylattica.core.runner.asynchronous_runner import select_site_batch
+from pylattica.structures.square_grid import (
+    MooreNbHoodBuilder,
+    PseudoHexagonalNeighborhoodBuilder2D,
+    SimpleSquare2DStructureBuilder,
+)
+
+from helpers.helpers import skip_windows_due_to_parallel
+
+
+class HoppingController(BasicController):
+    """Moves the particle at a site to a random empty neighboring site."""
+
+    def __init__(self, structure):
+        self.nbhood = MooreNbHoodBuilder().get(structure)
+
+    def get_neighborhood(self):
+        return self.nbhood
+
+    def get_state_update(self, site_id: int, prev_state: SimulationState):
+        if prev_state.get_site_state(site_id)["value"] == 0:
+            return {}
+
+        target = random.choice(self.nbhood.neighbors_of(site_id))
+        if prev_state.get_site_state(target)["value"] == 1:
+            return {}
+
+        return { site_id: { "value": 0 }, target: { "value": 1 } }
+
+
+@pytest.fixture
+def structure():
+    return SimpleSquare2DStructureBuilder().build(8)
+
+
+@pytest.fixture
+def half_filled_state(structure):
+    state = SimulationState.from_struct(structure)
+    for site_id in structure.site_ids:
+        state.set_site_state(site_id, { "value": site_id % 2 })
+    return state
+
+
+def _num_particles(state):
+    return sum(s["value"] for s in state.all_site_states())
+
+
+def test_select_site_batch_is_non_overlapping(structure):
+    nbhood = MooreNbHoodBuilder().get(structure)
+    queue = deque([0, 27, 1, 54, 36])
+
+    batch, footprints = select_site_batch(queue, lambda: None, nbhood, 10)
+
+    assert batch == [0, 27]
+    assert list(queue) == [1, 54, 36]
+    for i, fp in enumerate(footprints):
+        for other in footprints[i + 1:]:
+            assert fp.isdisjoint(other)
+
+
+def test_select_site_batch_defers_behind_conflicts(structure):
+    nbhood = MooreNbHoodBuilder().get(structure)
+    # site 3 does not overlap site 0, but it overlaps the deferred site 1
+    queue = deque([0, 1, 3, 36])
+
+    batch, _ = select_site_batch(queue, lambda: None, nbhood, 10)
+
+    assert batch == [0, 36]
+    assert list(queue) == [1, 3]
+
+
+def test_select_site_batch_uses_all_stochastic_neighbors(structure):
+    nbhood = PseudoHexagonalNeighborhoodBuilder2D().get(structure)
+    site = 18
+    possible = set(nbhood.possible_neighbors_of(site))
+    assert len(possible) == 8
+    for _ in range(10):
+        assert set(nbhood.neighbors_of(site)) <= possible
+
+
+@skip_windows_due_to_parallel
+def test_parallel_async_run(structure, half_filled_state):
+    controller = HoppingController(structure)
+    runner = AsynchronousRunner(parallel=True, workers=2, batch_size=6)
+    result = runner.run(half_filled_state, controller, 200)
+
+    assert len(result) == 201
+    assert _num_particles(result.last_step) == _num_particles(half_filled_state)
+    assert result.last_step != half_filled_state
+
+    for step in result.steps():
+        assert _num_particles(step) == _num_particles(half_filled_state)
+
+
+def test_parallel_async_requires_neighborhood(half_filled_state):
+
+    class NoNeighborhoodController(BasicController):
+        def get_state_update(self, site_id, prev_state):
+            return {}
+
+    runner = AsynchronousRunner(parallel=True, workers=2)
+    with pytest.raises(ValueError, match="get_neighborhood"):
+        runner.run(half_filled_state, NoNeighborhoodController(), 10)
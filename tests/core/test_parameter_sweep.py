@@ -0,0 +1,126 @@
+import pytest
+import os
+
+from pylattica.core import (
+    AsynchronousRunner,
+    ParameterSweep,
+    SweepConfig,
+    SimulationState,
+    SynchronousRunner,
+)
+from pylattica.discrete.state_constants import DISCRETE_OCCUPANCY
+from pylattica.models.game_of_life import GameOfLifeController
+from pylattica.structures.square_grid import DiscreteGridSetup
+from pylattica.discrete import PhaseSet
+
+from helpers.helpers import skip_windows_due_to_parallel
+
+FACTORY_CALLS = []
+
+
+def gol_factory(structure, variant):
+    FACTORY_CALLS.append(variant)
+    return GameOfLifeController(structure, variant=variant)
+
+
+@pytest.fixture
+def simulation():
+    setup = DiscreteGridSetup(PhaseSet(["dead", "alive"]))
+    return setup.setup_interface(6, "dead", "alive")
+
+
+def test_grid_configs(simulation):
+    configs = SweepConfig.grid(
+        simulation.structure,
+        simulation.state,
+        gol_factory,
+        { "variant": ["B3/S23", "B2/S"] },
+        num_steps=3,
+        seeds=[0, 1],
+    )
+    assert len(configs) == 4
+    assert [c.controller_params["variant"] for c in configs] == ["B3/S23", "B3/S23", "B2/S", "B2/S"]
+    assert [c.seed for c in configs] == [0, 1, 0, 1]
+
+
+def test_keys_are_stable(simulation):
+    sweep = ParameterSweep()
+    config = SweepConfig(simulation.structure, simulation.state, gol_factory, { "variant": "B3/S23" }, 3)
+    same = SweepConfig(simulation.structure, simulation.state.copy(), gol_factory, { "variant": "B3/S23" }, 3)
+    assert sweep.key(config) == sweep.key(same)
+
+    other_params = SweepConfig(simulation.structure, simulation.state, gol_factory, { "variant": "B2/S" }, 3)
+    other_steps = SweepConfig(simulation.structure, simulation.state, gol_factory, { "variant": "B3/S23" }, 4)
+    other_seed = SweepConfig(simulation.structure, simulation.state, gol_factory, { "variant": "B3/S23" }, 3, seed=1)
+    changed_state = simulation.state.copy()
+    changed_state.set_site_state(0, { DISCRETE_OCCUPANCY: "alive" })
+    other_state = SweepConfig(simulation.structure, changed_state, gol_factory, { "variant": "B3/S23" }, 3)
+
+    keys = { sweep.key(c) for c in [config, other_params, other_steps, other_seed, other_state] }
+    assert len(keys) == 5
+    assert ParameterSweep(AsynchronousRunner()).key(config) != sweep.key(config)
+
+
+def test_keys_of_object_params_are_stable(simulation):
+    sweep = ParameterSweep()
+
+    def _config(phases):
+        return SweepConfig(simulation.structure, simulation.state, gol_factory, { "phases": phases }, 3)
+
+    assert sweep.key(_config(PhaseSet(["a", "b"]))) == sweep.key(_config(PhaseSet(["a", "b"])))
+    assert sweep.key(_config(PhaseSet(["a", "b"]))) != sweep.key(_config(PhaseSet(["a", "c"])))
+    assert sweep.key(_config(gol_factory)) != sweep.key(_config(GameOfLifeController))
+
+    with pytest.raises(TypeError, match="Cannot build a cache key"):
+        sweep.key(_config(lambda: None))
+
+
+def test_sweep_uses_cache(simulation, tmp_path):
+    FACTORY_CALLS.clear()
+    configs = SweepConfig.grid(
+        simulation.structure,
+        simulation.state,
+        gol_factory,
+        { "variant": ["B3/S23", "B2/S"] },
+        num_steps=3,
+    )
+    sweep = ParameterSweep(cache_dir=str(tmp_path), workers=1)
+    first = sweep.run(configs)
+    assert len(FACTORY_CALLS) == 2
+    assert len(os.listdir(tmp_path)) == 2
+    assert all(sweep.is_cached(c) for c in configs)
+
+    extended = configs + SweepConfig.grid(
+        simulation.structure, simulation.state, gol_factory, { "variant": ["B36/S23"] }, num_steps=3
+    )
+    second = sweep.run(extended)
+    assert FACTORY_CALLS == ["B3/S23", "B2/S", "B36/S23"]
+    for orig, cached in zip(first, second):
+        assert orig.last_step == cached.last_step
+        assert len(orig) == len(cached)
+
+
+@skip_windows_due_to_parallel
+def test_parallel_sweep_matches_direct_runs(simulation, tmp_path):
+    configs = SweepConfig.grid(
+        simulation.structure,
+        simulation.state,
+        gol_factory,
+        { "variant": ["B3/S23", "B2/S", "B36/S23"] },
+        num_steps=4,
+    )
+    results = ParameterSweep(cache_dir=str(tmp_path), workers=2, record_history=False).run(configs)
+
+    for config, result in zip(configs, results):
+        controller = gol_factory(simulation.structure, **config.controller_params)
+        expected = SynchronousRunner().run(simulation.state, controller, 4)
+        assert result.last_step == expected.last_step
+
+    reloaded = ParameterSweep(cache_dir=str(tmp_path), workers=2, record_history=False).run(configs)
+    for result, cached in zip(results, reloaded):
+        assert cached.last_step == result.last_step
+
+
+def test_sweep_rejects_parallel_runner():
+    with pytest.raises(ValueError, match="must not be parallel"):
+        ParameterSweep(SynchronousRunner(parallel=True))
@@ -1,5 +1,6 @@
 from pylattica.core.constants import LOCATION
 import pytest
+import numpy as np
 
 from pylattica.core import PeriodicStructure, Lattice
 
@@ -108,4 +109,41 @@ def test_partially_periodic_structure(square_2D_basis_vecs):
     
     assert struct.site_at((-0.5, 0.5)) is None
     assert struct.site_at((0.5, 1.5)) is not None
-    assert struct.site_at((0.5, -1.5)) is not None
\ No newline at end of file
+    assert struct.site_at((0.5, -1.5)) is not None
+
+def test_add_sites_matches_add_site(square_2D_lattice):
+    locs = [(0, 0), (0.5, 0.5), (1.25, -0.5)]
+
+    one_by_one = PeriodicStructure(square_2D_lattice)
+    for loc in locs:
+        one_by_one.add_site("A", loc)
+
+    batched = PeriodicStructure(square_2D_lattice)
+    assert batched.add_sites(["A", "A", "A"], locs) == [0, 1, 2]
+
+    assert batched._location_lookup == one_by_one._location_lookup
+    for site_id in one_by_one.site_ids:
+        assert (batched.site_location(site_id) == one_by_one.site_location(site_id)).all()
+
+    with pytest.raises(AssertionError):
+        batched.add_sites(["A"], [(1, 1)])
+
+
+def test_build_from_records_tiling(square_2D_lattice):
+    struct = PeriodicStructure.build_from(
+        square_2D_lattice, (3, 2), {"A": [(0, 0)], "B": [(0.5, 0.5)]}, frac_coords=True
+    )
+
+    tiling = struct.tiling
+    assert tiling.num_cells == (3, 2)
+    assert tiling.motif_size == 2
+    assert struct.translatable_tiling() is tiling
+
+    cells, motif_idxs = tiling.cell_coords(struct.site_ids)
+    assert tiling.site_ids(cells, motif_idxs).tolist() == struct.site_ids
+    for site_id, cell, motif_idx in zip(struct.site_ids, cells, motif_idxs):
+        loc = square_2D_lattice.get_cartesian_coords(cell + [(0, 0), (0.5, 0.5)][motif_idx])
+        assert struct.id_at(loc) == site_id
+
+    assert tiling.site_ids(np.array([[3, -1]]), [1]).tolist() == [3]
+    assert PeriodicStructure(square_2D_lattice).translatable_tiling() is None
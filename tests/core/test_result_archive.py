@@ -0,0 +1,109 @@
+import pickle
+import random
+
+import pytest
+
+from pylattica.core import (
+    LazySimulationResult,
+    ResultCursor,
+    SimulationResult,
+    SimulationState,
+)
+from pylattica.core.result_archive import is_result_archive
+
+
+@pytest.fixture
+def result():
+    random.seed(1)
+    initial_state = SimulationState()
+    initial_state.batch_update({ i: { "a": 0 } for i in range(10) })
+    result = SimulationResult(initial_state)
+
+    for step in range(95):
+        updates = { random.randint(0, 12): { "a": step, "b": random.random() } }
+        if step % 7 == 0:
+            updates = { "SITES": updates, "GENERAL": { "step": step } }
+        result.add_step(updates)
+
+    result.termination_reason = "done"
+    return result
+
+
+@pytest.fixture
+def archive_path(result, tmp_path):
+    return result.to_archive(str(tmp_path / "result.pylat"), keyframe_interval=10)
+
+
+def test_archive_round_trip(result, archive_path):
+    assert is_result_archive(archive_path)
+
+    lazy = SimulationResult.from_file(archive_path)
+    assert isinstance(lazy, LazySimulationResult)
+    assert len(lazy) == len(result)
+    assert lazy.termination_reason == "done"
+    assert lazy.initial_state == result.initial_state
+    assert lazy.last_step == result.last_step
+
+    for step_no in [0, 1, 9, 10, 11, 37, 90, 94, 95]:
+        assert lazy.get_step(step_no) == result.get_step(step_no)
+
+    assert list(lazy.diffs()) == list(result.diffs())
+    assert [s.as_dict() for s in lazy.steps()] == [s.as_dict() for s in result.steps()]
+    lazy.close()
+
+
+def test_archive_reads_only_what_is_needed(archive_path, monkeypatch):
+    lazy = LazySimulationResult(archive_path)
+
+    decoded = []
+    original = lazy._diffs.__class__.__getitem__
+    monkeypatch.setattr(
+        lazy._diffs.__class__, "__getitem__",
+        lambda self, idx: decoded.append(idx) or original(self, idx)
+    )
+
+    lazy.last_step
+    assert decoded == []
+
+    lazy.get_step(43)
+    assert decoded == [40, 41, 42]
+
+
+def test_archive_is_read_only(archive_path):
+    with LazySimulationResult(archive_path) as lazy:
+        with pytest.raises(RuntimeError):
+            lazy.add_step({ 0: { "a": 1 } })
+
+
+def test_archive_works_with_cursor_and_pickle(result, archive_path):
+    lazy = LazySimulationResult(archive_path)
+
+    cursor = ResultCursor(lazy, step_no=50)
+    assert cursor.backward(5) == result.get_step(45)
+
+    rehydrated = pickle.loads(pickle.dumps(lazy))
+    assert rehydrated.get_step(20) == result.get_step(20)
+
+
+def test_archive_without_history(tmp_path):
+    initial_state = SimulationState()
+    initial_state.batch_update({ 0: { "a": 0 } })
+    result = SimulationResult(initial_state)
+    output = initial_state.copy()
+    output.set_site_state(0, { "a": 5 })
+    result.set_output(output)
+
+    path = result.to_archive(str(tmp_path / "result.pylat"))
+    lazy = SimulationResult.from_file(path)
+    assert len(lazy) == 1
+    assert lazy.last_step == output
+
+
+def test_json_files_still_load(result, tmp_path):
+    path = str(tmp_path / "result.json")
+    result.to_file(path)
+    assert not is_result_archive(path)
+
+    loaded = SimulationResult.from_file(path)
+    assert not isinstance(loaded, LazySimulationResult)
+    assert loaded.last_step == result.last_step
@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from pylattica.core import (
+    AsynchronousRunner,
+    BasicController,
+    ResultCursor,
+    SimulationResult,
+    SimulationState,
+)
+
+
+@pytest.fixture
+def result():
+    random.seed(0)
+    initial_state = SimulationState()
+    initial_state.batch_update({ i: { "a": 0 } for i in range(5) })
+    result = SimulationResult(initial_state)
+
+    for step in range(50):
+        site_id = random.randint(0, 7)
+        updates = { site_id: { "a": step, f"k{step % 3}": step } }
+        if step % 10 == 0:
+            updates = { "SITES": updates, "GENERAL": { "step": step } }
+        result.add_step(updates)
+
+    return result
+
+
+def test_cursor_matches_get_step(result):
+    cursor = ResultCursor(result)
+    order = [0, 1, 2, 10, 9, 3, 49, 48, 20, 25, 0, 30, -1]
+
+    for step_no in order:
+        expected = result.get_step(step_no % len(result))
+        assert cursor.seek(step_no) == expected
+        assert cursor.step_no == step_no % len(result)
+
+
+def test_forward_and_backward(result):
+    cursor = ResultCursor(result, step_no=5)
+    assert cursor.state == result.get_step(5)
+
+    assert cursor.forward() == result.get_step(6)
+    assert cursor.forward(4) == result.get_step(10)
+    assert cursor.backward() == result.get_step(9)
+    assert cursor.backward(9) == result.get_step(0)
+
+
+def test_backward_removes_new_sites_and_keys(result):
+    cursor = ResultCursor(result, step_no=len(result) - 1)
+    state = cursor.seek(0)
+
+    assert state == result.initial_state
+    assert state.get_site_state(7) is None
+    assert state.get_general_state() == {}
+
+
+def test_cursor_does_not_modify_result(result):
+    result.load_steps(interval=10)
+    stored = result.get_step(20).copy()
+
+    cursor = ResultCursor(result)
+    cursor.seek(25)
+    cursor.seek(21)
+    cursor.seek(0)
+
+    assert result.get_step(20) == stored
+    assert result.initial_state.get_site_state(7) is None
+
+
+def test_cursor_out_of_range(result):
+    cursor = ResultCursor(result)
+    with pytest.raises(IndexError):
+        cursor.seek(len(result))
+    with pytest.raises(IndexError):
+        cursor.backward()
+
+
+def test_runner_records_inverse(square_grid_2D_4x4):
+    class WalkController(BasicController):
+        def get_state_update(self, site_id, prev_state):
+            return { "visits": prev_state.get_site_state(site_id).get("visits", 0) + 1 }
+
+    state = SimulationState.from_struct(square_grid_2D_4x4)
+    result = AsynchronousRunner().run(state, WalkController(), 40, record_inverse=True)
+
+    assert all(result.inverse_diff(idx) is not None for idx in range(40))
+
+    cursor = ResultCursor(result, step_no=40)
+    cursor._inverses = None  # the recorded inverses must be used
+    for step_no in range(39, -1, -1):
+        assert cursor.backward() == result.get_step(step_no)
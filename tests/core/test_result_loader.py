@@ -0,0 +1,116 @@
+import random
+
+import numpy as np
+import pytest
+
+from pylattica.core import LazySimulationResult, SimulationResult, SimulationState
+from pylattica.core.result_loader import load_arrays, load_states
+
+from helpers.helpers import skip_windows_due_to_parallel
+
+
+@pytest.fixture
+def result():
+    random.seed(3)
+    initial_state = SimulationState()
+    initial_state.batch_update({ i: { "phase": "A", "x": 0 } for i in range(12) })
+    result = SimulationResult(initial_state)
+
+    for step in range(101):
+        updates = {
+            random.randint(0, 11): { "phase": random.choice("ABC"), "x": step },
+            random.randint(0, 11): { "x": -step },
+        }
+        if step % 9 == 0:
+            updates = { "SITES": updates, "GENERAL": { "step": step } }
+        result.add_step(updates)
+    return result
+
+
+def _serial_states(result, interval):
+    return {
+        step_no: result.get_step(step_no)
+        for step_no in range(len(result))
+        if step_no % interval == 0
+    }
+
+
+@skip_windows_due_to_parallel
+@pytest.mark.parametrize("interval", [1, 7])
+@pytest.mark.parametrize("workers", [1, 3, 4])
+def test_load_states_matches_serial(result, interval, workers):
+    states = load_states(result, interval=interval, workers=workers)
+    assert states == _serial_states(result, interval)
+
+
+@skip_windows_due_to_parallel
+def test_load_steps_parallel_uses_stored_states(result, monkeypatch):
+    result.load_steps(interval=25)
+
+    from pylattica.core import result_loader
+    composed = []
+    original = result_loader._compose_segment
+    monkeypatch.setattr(
+        result_loader, "_compose_segment",
+        lambda *args: composed.append(args) or original(*args)
+    )
+
+    fresh = SimulationResult(result.initial_state)
+    for diff in result.diffs():
+        fresh.add_step(diff)
+    fresh._stored_states = dict(result._stored_states)
+    fresh.load_steps(interval=1, parallel=True, workers=4)
+
+    assert composed == []
+    for step_no in range(len(result)):
+        assert fresh._stored_states[step_no] == result.get_step(step_no)
+
+
+@skip_windows_due_to_parallel
+def test_load_steps_parallel_from_archive(result, tmp_path):
+    fpath = result.to_archive(str(tmp_path / "result.pylat"), keyframe_interval=20)
+    with LazySimulationResult(fpath) as lazy:
+        lazy.load_steps(interval=5, parallel=True, workers=5)
+        for step_no in range(0, len(result), 5):
+            assert lazy.get_step(step_no) == result.get_step(step_no)
+
+
+@skip_windows_due_to_parallel
+@pytest.mark.parametrize("workers", [1, 3])
+def test_load_arrays(result, workers):
+    steps, values, codes = result.load_arrays(
+        "phase", interval=4, parallel=True, workers=workers
+    )
+
+    assert codes.dtype == np.uint8
+    assert steps.tolist() == list(range(0, len(result), 4))
+    assert codes.shape == (len(steps), 12)
+    for row, step_no in zip(codes, steps):
+        state = result.get_step(step_no)
+        assert [values[c] for c in row] == [
+            state.get_site_state(site_id)["phase"] for site_id in range(12)
+        ]
+
+
+@skip_windows_due_to_parallel
+def test_load_arrays_independent_of_workers(result):
+    serial = result.load_arrays("phase", interval=3)
+    for workers in [2, 5]:
+        steps, values, codes = result.load_arrays(
+            "phase", interval=3, parallel=True, workers=workers
+        )
+        assert steps.tolist() == serial[0].tolist()
+        assert values == serial[1]
+        assert (codes == serial[2]).all()
+
+
+def test_load_arrays_missing_values():
+    initial_state = SimulationState()
+    initial_state.batch_update({ 0: { "phase": "A" }, 1: { "x": 0 } })
+    result = SimulationResult(initial_state)
+    result.add_step({ 0: { "phase": "B" }, 2: { "phase": "C" } })
+
+    steps, values, codes = load_arrays(result, "phase", workers=1)
+
+    assert steps.tolist() == [0, 1]
+    assert [[values[c] for c in row] for row in codes] == [["A", None], ["B", None]]
@@ -0,0 +1,161 @@
+import random
+
+import numpy as np
+
+from pylattica.core import (
+    AsynchronousRunner,
+    BasicController,
+    SimulationState,
+    SynchronousRunner,
+)
+from pylattica.core.rng import default_rng, seed_sequence
+from pylattica.structures.square_grid import (
+    MooreNbHoodBuilder,
+    SimpleSquare2DStructureBuilder,
+)
+
+from helpers.helpers import skip_windows_due_to_parallel
+
+
+class NoisyController(BasicController):
+    """Sets each site to a random integer drawn from the controller's Generator."""
+
+    def __init__(self, structure):
+        self.nbhood = MooreNbHoodBuilder().get(structure)
+
+    def get_neighborhood(self):
+        return self.nbhood
+
+    def get_state_update(self, site_id, prev_state):
+        return {"value": int(self.rng.integers(1000))}
+
+
+def _initial_state(structure):
+    state = SimulationState.from_struct(structure)
+    for site_id in structure.site_ids:
+        state.set_site_state(site_id, {"value": 0})
+    return state
+
+
+def _trajectory(result):
+    return [step.as_dict() for step in result.steps()] + [result.last_step.as_dict()]
+
+
+def test_seed_sequence():
+    seq = np.random.SeedSequence(4)
+    assert seed_sequence(seq) is seq
+    assert seed_sequence(4).entropy == 4
+
+    random.seed(0)
+    np.random.seed(0)
+    first = default_rng().integers(1000, size=5)
+    random.seed(0)
+    np.random.seed(0)
+    assert (default_rng().integers(1000, size=5) == first).all()
+
+
+def test_seeded_runs_are_reproducible():
+    structure = SimpleSquare2DStructureBuilder().build(4)
+    state = _initial_state(structure)
+    controller = NoisyController(structure)
+
+    first = SynchronousRunner().run(state, controller, 3, seed=7)
+    second = SynchronousRunner().run(state, controller, 3, seed=7)
+    other = SynchronousRunner().run(state, controller, 3, seed=8)
+
+    assert _trajectory(first) == _trajectory(second)
+    assert _trajectory(first) != _trajectory(other)
+
+
+def test_seeded_async_runs_are_reproducible():
+    structure = SimpleSquare2DStructureBuilder().build(4)
+    state = _initial_state(structure)
+    controller = NoisyController(structure)
+
+    first = AsynchronousRunner().run(state, controller, 20, seed=3)
+    second = AsynchronousRunner().run(state, controller, 20, seed=3)
+    assert _trajectory(first) == _trajectory(second)
+
+
+@skip_windows_due_to_parallel
+def test_seeded_parallel_runs_are_reproducible():
+    structure = SimpleSquare2DStructureBuilder().build(6)
+    state = _initial_state(structure)
+    controller = NoisyController(structure)
+
+    first = SynchronousRunner(parallel=True, workers=3).run(
+        state, controller, 3, seed=11
+    )
+    second = SynchronousRunner(parallel=True, workers=3).run(
+        state, controller, 3, seed=11
+    )
+    assert _trajectory(first) == _trajectory(second)
+
+    # Workers must not share RNG streams
+    values = [s["value"] for s in first.last_step.all_site_states()]
+    assert len(set(values)) > len(values) / 2
+
+
+@skip_windows_due_to_parallel
+def test_seeded_parallel_async_runs_are_reproducible():
+    structure = SimpleSquare2DStructureBuilder().build(8)
+    state = _initial_state(structure)
+    controller = NoisyController(structure)
+
+    runner = AsynchronousRunner(parallel=True, workers=2)
+    first = runner.run(state, controller, 30, seed=5)
+    second = runner.run(state, controller, 30, seed=5)
+    assert _trajectory(first) == _trajectory(second)
+
+
+@skip_windows_due_to_parallel
+def test_parallel_runner_with_sparse_updates():
+    structure = SimpleSquare2DStructureBuilder().build(6)
+    state = _initial_state(structure)
+
+    class CountingController(BasicController):
+        # Only one site changes per step, so workers which receive no task
+        # in a step must still see its update later
+        def get_state_update(self, site_id, prev_state):
+            step = prev_state.get_general_state().get("step", 0)
+            if site_id == step % 36:
+                return {"value": prev_state.get_site_state(site_id)["value"] + 1}
+            return {}
+
+    class StepController(CountingController):
+        def get_state_update(self, site_id, prev_state):
+            updates = super().get_state_update(site_id, prev_state)
+            if site_id == 0:
+                return {
+                    "SITES": {site_id: updates} if updates else {},
+                    "GENERAL": {
+                        "step": prev_state.get_general_state().get("step", 0) + 1
+                    },
+                }
+            return updates
+
+    result = SynchronousRunner(parallel=True, workers=4).run(
+        state, StepController(), 72
+    )
+    assert all(s["value"] == 2 for s in result.last_step.all_site_states())
+
+
+def test_unseeded_runs_do_not_reseed_global_rngs():
+    structure = SimpleSquare2DStructureBuilder().build(4)
+    state = _initial_state(structure)
+    controller = NoisyController(structure)
+
+    random.seed(0)
+    np.random.seed(0)
+    seed_sequence()
+    expected = (random.random(), np.random.random())
+
+    random.seed(0)
+    np.random.seed(0)
+    SynchronousRunner().run(state, controller, 3)
+    assert (random.random(), np.random.random()) == expected
+
+    SynchronousRunner().run(state, controller, 3, seed=1)
+    first = (random.random(), np.random.random())
+    SynchronousRunner().run(state, controller, 3, seed=1)
+    assert (random.random(), np.random.random()) == first
@@ -3,6 +3,7 @@ import pytest
 import random
 import os
 from pylattica.core import SimulationResult, SimulationState
+from pylattica.core.constants import SITES, GENERAL
 
 
 @pytest.fixture
@@ -109,3 +110,27 @@ def test_write_file_autoname(random_result_small: SimulationResult):
 def test_diff_storage(random_result_small_ordered: SimulationResult):
     diff_one = random_result_small_ordered._diffs[0]
     assert len(diff_one.keys()) == 1
+
+def test_serialization_with_general_state(initial_state):
+    result = SimulationResult(initial_state)
+    result.add_step({ SITES: { 3: { "a": 1 } }, GENERAL: { "t": 1 } })
+    result.add_step({ SITES: { 4: { "a": 2 } }, GENERAL: {} })
+    result.termination_reason = "done"
+
+    fname = "tmp_test_res_general.json"
+    result.to_file(fname)
+    rehydrated = SimulationResult.from_file(fname)
+    os.remove(fname)
+
+    assert rehydrated.last_step == result.last_step
+    assert rehydrated.termination_reason == "done"
+
+def test_serialization_without_history(initial_state):
+    result = SimulationResult(initial_state)
+    final = initial_state.copy()
+    final.set_site_state(2, { "a": 5 })
+    result.set_output(final)
+
+    rehydrated = SimulationResult.from_dict(result.as_dict())
+    assert len(rehydrated) == 1
+    assert rehydrated.last_step == final
@@ -55,4 +55,94 @@ def test_states_equal():
     state1.batch_update(updates)
     state2.batch_update(updates)
 
-    assert state1 == state2
\ No newline at end of file
+    assert state1 == state2
+
+
+def test_copy_shares_unchanged_sites():
+    state = SimulationState()
+    state.batch_update({ 1: { "a": 1 }, 2: { "a": 2 } })
+
+    copied = state.copy()
+    assert copied == state
+    assert copied.get_site_state(1) is state.get_site_state(1)
+
+    copied.set_site_state(1, { "a": 5 })
+    assert state.get_site_state(1)["a"] == 1
+    assert copied.get_site_state(1)["a"] == 5
+    assert copied.get_site_state(2) is state.get_site_state(2)
+
+
+def test_copy_is_independent_of_original():
+    state = SimulationState()
+    state.batch_update({ 1: { "a": 1 } })
+
+    first = state.copy()
+    second = state.copy()
+
+    state.batch_update({ "SITES": { 1: { "a": 2 }, 3: { "a": 3 } }, "GENERAL": { "g": 1 } })
+    first.set_general_state({ "g": 2 })
+
+    assert state.get_site_state(1)["a"] == 2
+    assert first.get_site_state(1)["a"] == 1
+    assert second.get_site_state(1)["a"] == 1
+    assert first.get_site_state(3) is None
+    assert second.get_site_state(3) is None
+    assert second.get_general_state() == {}
+    assert first.get_general_state() == { "g": 2 }
+    assert state.get_general_state() == { "g": 1 }
+
+    copy_of_copy = first.copy()
+    first.set_site_state(1, { "a": 7 })
+    assert copy_of_copy.get_site_state(1)["a"] == 1
+
+
+def test_inverse_update_and_restore():
+    state = SimulationState()
+    state.batch_update({ 1: { "a": 1 } })
+    before = state.copy()
+
+    updates = { "SITES": { 1: { "a": 2, "b": 3 }, 2: { "a": 4 } }, "GENERAL": { "g": 1 } }
+    inverse = state.inverse_update(updates)
+    state.batch_update(updates)
+    assert state != before
+
+    state.restore(inverse)
+    assert state == before
+    assert state.get_site_state(2) is None
+    assert "b" not in state.get_site_state(1)
+
+
+def test_copy_duplicates_only_updated_chunks():
+    state = SimulationState()
+    state.batch_update({ site_id: { "a": site_id } for site_id in range(1000) })
+
+    copied = state.copy()
+    copied.set_site_state(5, { "a": -1 })
+
+    chunks = state._state[SITES]._chunks
+    copied_chunks = copied._state[SITES]._chunks
+    shared = [idx for idx in chunks if chunks[idx] is copied_chunks[idx]]
+    assert len(shared) == len(chunks) - 1
+    assert state.get_site_state(5)["a"] == 5
+    assert copied.get_site_state(5)["a"] == -1
+    assert copied.size == state.size == 1000
+    assert copied.site_ids() == list(range(1000))
+
+    state.set_site_state(700, { "a": -2 })
+    assert copied.get_site_state(700)["a"] == 700
+
+
+def test_deep_copy_is_safe_to_modify_in_place():
+    state = SimulationState()
+    state.batch_update({ "SITES": { 1: { "a": [1, 2] } }, "GENERAL": { "g": { "x": 1 } } })
+
+    shallow = state.copy()
+    deep = state.copy(deep=True)
+    assert deep == state
+    assert deep.get_site_state(1) is not state.get_site_state(1)
+
+    deep.get_site_state(1)["a"].append(3)
+    deep.get_general_state()["g"]["x"] = 2
+    assert state.get_site_state(1)["a"] == [1, 2]
+    assert state.get_general_state()["g"]["x"] == 1
+    assert shallow.get_site_state(1) is state.get_site_state(1)
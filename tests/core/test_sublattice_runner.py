@@ -0,0 +1,90 @@
+import pytest
+
+from pylattica.core import BasicController, SimulationState, SublatticeRunner
+from pylattica.structures.square_grid import (
+    SimpleSquare2DStructureBuilder,
+    VonNeumannNbHood2DBuilder,
+)
+
+from helpers.helpers import skip_windows_due_to_parallel
+
+
+class MajorityController(BasicController):
+    """Sets each site to the majority value of itself and its neighbors."""
+
+    def __init__(self, structure):
+        self.nbhood = VonNeumannNbHood2DBuilder(1).get(structure)
+
+    def get_neighborhood(self):
+        return self.nbhood
+
+    def get_state_update(self, site_id: int, prev_state: SimulationState):
+        nbs = self.nbhood.neighbors_of(site_id)
+        total = prev_state.get_site_state(site_id)["value"] + sum(
+            prev_state.get_site_state(nb)["value"] for nb in nbs
+        )
+        return { "value": int(total * 2 > len(nbs) + 1) }
+
+
+class NoNeighborhoodController(BasicController):
+    def get_state_update(self, site_id: int, prev_state: SimulationState):
+        return {}
+
+
+@pytest.fixture
+def structure():
+    return SimpleSquare2DStructureBuilder().build(6)
+
+
+@pytest.fixture
+def initial_state(structure):
+    state = SimulationState.from_struct(structure)
+    for site_id in structure.site_ids:
+        state.set_site_state(site_id, { "value": int(site_id % 3 == 0) })
+    return state
+
+
+def test_sublattice_runner_updates_one_color_per_step(structure, initial_state):
+    controller = MajorityController(structure)
+    classes = controller.nbhood.color_classes()
+
+    result = SublatticeRunner().run(initial_state, controller, 3)
+
+    assert len(result) == 1 + 3 * len(classes)
+    for step_idx in range(len(result) - 1):
+        color = classes[step_idx % len(classes)]
+        assert set(result._diffs[step_idx].keys()) == {"SITES", "GENERAL"}
+        assert set(result._diffs[step_idx]["SITES"].keys()) == set(color)
+
+
+def test_sublattice_runner_matches_sequential_sweep(structure, initial_state):
+    controller = MajorityController(structure)
+    classes = controller.nbhood.color_classes()
+
+    expected = initial_state.copy()
+    for color in classes:
+        for site_id in color:
+            expected.set_site_state(
+                site_id, controller.get_state_update(site_id, expected)
+            )
+
+    result = SublatticeRunner().run(initial_state, controller, 1)
+    assert result.last_step.as_dict() == expected.as_dict()
+
+
+def test_sublattice_runner_requires_neighborhood(initial_state):
+    with pytest.raises(ValueError, match="get_neighborhood"):
+        SublatticeRunner().run(initial_state, NoNeighborhoodController(), 1)
+
+
+@skip_windows_due_to_parallel
+def test_parallel_sublattice_runner_matches_serial(structure, initial_state):
+    controller = MajorityController(structure)
+
+    serial = SublatticeRunner().run(initial_state, controller, 2)
+    parallel = SublatticeRunner(parallel=True, workers=2).run(
+        initial_state, controller, 2
+    )
+
+    assert parallel.last_step.as_dict() == serial.last_step.as_dict()
+    assert len(parallel) == len(serial)
@@ -1,8 +1,10 @@
 import pytest
+import numpy as np
 
-from pylattica.core import SynchronousRunner
+from pylattica.core import SynchronousRunner, SimulationState, SimulationResult
 from pylattica.models.game_of_life import Life, GameOfLifeController
-from pylattica.discrete import PhaseSet, DiscreteResultAnalyzer
+from pylattica.discrete import PhaseSet, DiscreteResultAnalyzer, DiscreteStepAnalyzer
+from pylattica.discrete.state_constants import DISCRETE_OCCUPANCY
 from pylattica.structures.square_grid.grid_setup import DiscreteGridSetup
 
 @pytest.fixture()
@@ -39,3 +41,42 @@ def test_phase_fraction_at_step():
 
     assert analyzer.phase_fraction_at(0, "dead") == 0.5
 
+
+def test_phase_count_series_matches_recount(discrete_result):
+    analyzer = DiscreteResultAnalyzer(discrete_result)
+    step_analyzer = DiscreteStepAnalyzer()
+
+    step_idxs, phases, counts = analyzer.phase_count_series()
+    assert list(step_idxs) == list(range(len(discrete_result)))
+    assert counts.shape == (len(discrete_result), len(phases))
+    assert set(phases) == analyzer.all_phases()
+
+    for row, step_idx in zip(counts, step_idxs):
+        expected = step_analyzer.phase_counts(discrete_result.get_step(step_idx))
+        for phase, count in zip(phases, row):
+            assert expected.get(phase, 0) == count
+
+def test_phase_fraction_series_interval(discrete_result):
+    analyzer = DiscreteResultAnalyzer(discrete_result)
+
+    step_idxs, phases, fractions = analyzer.phase_fraction_series(interval=3)
+    assert list(step_idxs) == [0, 3, 6, 9]
+    assert np.allclose(fractions.sum(axis=1), 1.0)
+
+    for row, step_idx in zip(fractions, step_idxs):
+        for phase, frac in zip(phases, row):
+            assert analyzer.phase_fraction_at(step_idx, phase) == pytest.approx(frac)
+
+def test_sites_without_phase():
+    state = SimulationState()
+    state.set_site_state(0, { DISCRETE_OCCUPANCY: "A" })
+    state.set_site_state(1, { "other": 1 })
+    result = SimulationResult(state)
+    result.add_step({ 0: { DISCRETE_OCCUPANCY: "B" } })
+
+    analyzer = DiscreteResultAnalyzer(result)
+    assert analyzer.all_phases() == { "A", "B" }
+
+    _, phases, counts = analyzer.phase_count_series()
+    assert None in phases
+    assert counts.sum(axis=1).tolist() == [2, 2]
@@ -18,4 +18,64 @@ def test_cell_count():
     assert analyzer.cell_ratio(state, "A", "B") == 2
     assert analyzer.cell_ratio(state, "B", "A") == 0.5
 
-    assert analyzer.phase_count(state) == 2
\ No newline at end of file
+    assert analyzer.phase_count(state) == 2
+
+def test_phase_counts():
+    state = SimulationState()
+    state.set_site_state(1, { DISCRETE_OCCUPANCY: "A"})
+    state.set_site_state(3, { DISCRETE_OCCUPANCY: "A"})
+    state.set_site_state(2, { DISCRETE_OCCUPANCY: "B" })
+    state.set_site_state(4, { DISCRETE_OCCUPANCY: "C" })
+
+    analyzer = DiscreteStepAnalyzer()
+
+    assert analyzer.phase_counts(state) == { "A": 2, "B": 1, "C": 1 }
+    assert analyzer.phase_fractions(state) == { "A": 0.5, "B": 0.25, "C": 0.25 }
+    assert analyzer.cell_count(state, "D") == 0
+    assert set(analyzer.phases_present(state)) == { "A", "B", "C" }
+
+
+def test_phase_counts_by_site_class(square_grid_2D_4x4):
+    state = SimulationState.from_struct(square_grid_2D_4x4)
+    for site_id in square_grid_2D_4x4.site_ids:
+        phase = "A" if site_id % 4 == 0 else "B"
+        state.set_site_state(site_id, { DISCRETE_OCCUPANCY: phase })
+
+    analyzer = DiscreteStepAnalyzer(square_grid_2D_4x4)
+    site_class = square_grid_2D_4x4.all_site_classes()[0]
+
+    assert analyzer.phase_counts(state) == { "A": 4, "B": 12 }
+    assert analyzer.phase_counts(state, site_class=site_class) == { "A": 4, "B": 12 }
+    assert analyzer.phase_counts(state, site_class="missing") == {}
+
+
+def test_phases_present_ignores_sites_without_phase():
+    state = SimulationState()
+    state.set_site_state(1, { DISCRETE_OCCUPANCY: "A"})
+    state.set_site_state(2, { "other": 1 })
+
+    analyzer = DiscreteStepAnalyzer()
+
+    assert analyzer.phase_counts(state) == { "A": 1, None: 1 }
+    assert analyzer.phases_present(state) == ["A"]
+    assert analyzer.phase_count(state) == 1
+
+
+def test_phase_counts_follow_state_changes():
+    state = SimulationState()
+    state.set_site_state(1, { DISCRETE_OCCUPANCY: "A"})
+    state.set_site_state(2, { DISCRETE_OCCUPANCY: "A"})
+
+    analyzer = DiscreteStepAnalyzer()
+    assert analyzer.phase_counts(state) == { "A": 2 }
+
+    state.set_site_state(2, { DISCRETE_OCCUPANCY: "B" })
+    assert analyzer.phase_counts(state) == { "A": 1, "B": 1 }
+
+    state.batch_update({ 1: { DISCRETE_OCCUPANCY: "B" } })
+    assert analyzer.phase_counts(state) == { "B": 2 }
+
+    other = state.copy()
+    other.set_site_state(1, { DISCRETE_OCCUPANCY: "C" })
+    assert analyzer.phase_counts(other) == { "C": 1, "B": 1 }
+    assert analyzer.phase_counts(state) == { "B": 2 }
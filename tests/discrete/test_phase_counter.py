@@ -0,0 +1,56 @@
+import pytest
+
+from pylattica.core import SynchronousRunner, SimulationState
+from pylattica.discrete import PhaseSet, PhaseCounter, PhaseCountObserver, DiscreteStepAnalyzer
+from pylattica.discrete.state_constants import DISCRETE_OCCUPANCY
+from pylattica.models.game_of_life import Life, GameOfLifeController
+from pylattica.structures.square_grid.grid_setup import DiscreteGridSetup
+
+def test_phase_counter_updates():
+    state = SimulationState()
+    state.set_site_state(0, { DISCRETE_OCCUPANCY: "A" })
+    state.set_site_state(1, { DISCRETE_OCCUPANCY: "A" })
+    state.set_site_state(2, { DISCRETE_OCCUPANCY: "B" })
+
+    counter = PhaseCounter(state)
+    assert counter.as_dict() == { "A": 2, "B": 1 }
+
+    counter.update({ 0: { DISCRETE_OCCUPANCY: "C" }, 2: { "other": 1 } })
+    assert counter.as_dict() == { "A": 1, "B": 1, "C": 1 }
+
+    counter.update({ 1: { DISCRETE_OCCUPANCY: "C" }, 0: { DISCRETE_OCCUPANCY: "C" } })
+    assert counter.as_dict() == { "B": 1, "C": 2 }
+    assert counter.phases == ["A", "B", "C"]
+    assert list(counter.counts()) == [0, 1, 2]
+    assert counter.total == 3
+
+def test_phase_count_observer():
+    phases = PhaseSet(["dead", "alive"])
+    setup = DiscreteGridSetup(phases)
+    simulation = setup.setup_noise(10, ["dead", "alive"])
+    controller = GameOfLifeController(structure = simulation.structure,
+                                      variant=Life)
+    runner = SynchronousRunner(parallel=False)
+    observer = PhaseCountObserver(interval=2)
+    result = runner.run(simulation.state, controller, 6, observers=[observer])
+
+    analyzer = DiscreteStepAnalyzer()
+    assert observer.steps == [0, 2, 4, 6]
+    for step_no, counts in zip(observer.steps, observer.values):
+        assert counts == analyzer.phase_counts(result.get_step(step_no))
+
+def test_phase_count_observer_without_history():
+    phases = PhaseSet(["dead", "alive"])
+    setup = DiscreteGridSetup(phases)
+    simulation = setup.setup_noise(10, ["dead", "alive"])
+    controller = GameOfLifeController(structure = simulation.structure,
+                                      variant=Life)
+    runner = SynchronousRunner(parallel=False)
+    full_result = runner.run(simulation.state, controller, 5)
+
+    observer = PhaseCountObserver()
+    result = runner.run(simulation.state, controller, 5, observers=[observer], record_history=False)
+
+    assert len(result) == 1
+    assert result.last_step == full_result.last_step
+    assert observer.values[-1] == DiscreteStepAnalyzer().phase_counts(full_result.last_step)
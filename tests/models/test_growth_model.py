@@ -4,7 +4,7 @@ from pylattica.discrete.state_constants import DISCRETE_OCCUPANCY
 from pylattica.models.growth import GrowthController
 from pylattica.discrete import PhaseSet
 from pylattica.structures.square_grid import DiscreteGridSetup
-from pylattica.structures.square_grid.neighborhoods import MooreNbHoodBuilder
+from pylattica.structures.square_grid.neighborhoods import MooreNbHoodBuilder, VonNeumannNbHood2DBuilder
 
 from helpers.helpers import skip_windows_due_to_parallel
 
@@ -63,4 +63,34 @@ def test_can_run_growth_sim_series():
 
     assert analyzer.get_site_count_where_equal(res.get_step(2), {
         DISCRETE_OCCUPANCY: "B"
-    }) == 25
\ No newline at end of file
+    }) == 25
+
+def test_batched_and_single_site_updates_agree_on_ties():
+    phases = PhaseSet(["A", "B", "C"])
+    setup = DiscreteGridSetup(phases)
+    sim = setup.setup_noise(10, ["A", "A", "B", "C"], seed=4)
+    controller = GrowthController(
+        phases,
+        sim.structure,
+        nb_builder=VonNeumannNbHood2DBuilder(1),
+        background_phase="A",
+    )
+
+    site_ids = sim.structure.site_ids
+    batched = controller.get_state_updates(site_ids, sim.state)["SITES"]
+    single = {
+        site_id: controller.get_state_update(site_id, sim.state)
+        for site_id in site_ids
+    }
+    assert batched == {site_id: ud for site_id, ud in single.items() if ud != {}}
+
+    nbhood = controller.get_neighborhood()
+    tied = 0
+    for site_id in site_ids:
+        nb_phases = [
+            sim.state.get_site_state(nb)[DISCRETE_OCCUPANCY]
+            for nb in nbhood.neighbors_of(site_id)
+        ]
+        if nb_phases.count("B") == nb_phases.count("C") > 0:
+            tied += 1
+    assert tied > 0
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from pylattica.core import Lattice, PeriodicStructure
+from pylattica.core.constants import SIMULATION_TIME
+from pylattica.structures.honeycomb import HoneycombTilingBuilder, HoneycombNeighborhoodBuilder
+from pylattica.models.reaction_diffusion import (
+    GrayScottModel,
+    EXPLICIT,
+    SEMI_IMPLICIT,
+    U_CONCENTRATION,
+)
+
+
+@pytest.fixture
+def square_struct():
+    lattice = Lattice([[1, 0], [0, 1]])
+    return PeriodicStructure.build_from(lattice, (8, 8), { "A": [[0, 0]] })
+
+
+def _seeded_arrays(num_sites):
+    rng = np.random.default_rng(0)
+    u = 1 - 0.5 * rng.random(num_sites)
+    v = 0.25 * rng.random(num_sites)
+    return u, v
+
+
+def test_homogeneous_steady_state_is_preserved(square_struct):
+    model = GrayScottModel(square_struct)
+    state = model.get_state(np.ones(64), np.zeros(64))
+
+    for method in [EXPLICIT, SEMI_IMPLICIT]:
+        result = model.run(state, 5, dt=0.5, method=method)
+        u, v = model.get_arrays(result.last_step)
+        assert np.allclose(u, 1)
+        assert np.allclose(v, 0)
+
+
+def test_diffusion_conserves_mass(square_struct):
+    model = GrayScottModel(square_struct, feed_rate=0, kill_rate=0)
+    u = np.zeros(64)
+    u[0] = 1.0
+
+    for method in [EXPLICIT, SEMI_IMPLICIT]:
+        result = model.run(model.get_state(u, np.zeros(64)), 20, dt=0.5, method=method)
+        final_u, _ = model.get_arrays(result.last_step)
+        assert np.isclose(final_u.sum(), 1)
+        assert final_u.max() < 0.5
+        assert (final_u > 0).sum() > 9
+
+
+def test_schemes_agree_for_small_time_steps(square_struct):
+    model = GrayScottModel(square_struct)
+    state = model.get_state(*_seeded_arrays(64))
+
+    explicit = model.get_arrays(model.run(state, 100, dt=0.01, method=EXPLICIT).last_step)
+    implicit = model.get_arrays(model.run(state, 100, dt=0.01, method=SEMI_IMPLICIT).last_step)
+    assert np.allclose(explicit[0], implicit[0], atol=5e-3)
+    assert np.allclose(explicit[1], implicit[1], atol=5e-3)
+
+
+def test_output_cadence(square_struct):
+    model = GrayScottModel(square_struct)
+    state = model.get_state(*_seeded_arrays(64))
+    result = model.run(state, 10, dt=0.5, output_interval=3)
+
+    assert len(result) == 5
+    times = [result.get_step(idx).get_general_state()[SIMULATION_TIME] for idx in range(1, 5)]
+    assert np.allclose(times, [1.5, 3.0, 4.5, 5.0])
+
+    stepped = state
+    for _ in range(3):
+        stepped = model.run(stepped, 1, dt=0.5).last_step
+    assert np.allclose(model.get_arrays(stepped)[0], model.get_arrays(result.get_step(1))[0])
+    assert result.get_step(1).get_site_state(0)[U_CONCENTRATION] == stepped.get_site_state(0)[U_CONCENTRATION]
+
+
+def test_explicit_scheme_rejects_unstable_time_steps(square_struct):
+    model = GrayScottModel(square_struct)
+    assert np.isclose(model.max_explicit_time_step, 1 / (0.2 * 8))
+
+    state = model.get_state(*_seeded_arrays(64))
+    with pytest.raises(ValueError):
+        model.run(state, 1, dt=1.0, method=EXPLICIT)
+
+    # the semi-implicit scheme remains bounded with large time steps
+    result = model.run(state, 20, dt=5.0, method=SEMI_IMPLICIT)
+    u, v = model.get_arrays(result.last_step)
+    assert np.all(np.isfinite(u)) and np.all(np.isfinite(v))
+    assert np.all(np.abs(u) < 2) and np.all(np.abs(v) < 2)
+
+
+def test_runs_on_honeycomb_structures():
+    struct = HoneycombTilingBuilder().build((6, 6))
+    model = GrayScottModel(struct, nb_builder=HoneycombNeighborhoodBuilder())
+    assert np.allclose(model.laplacian.diagonal(), -6)
+
+    result = model.run(model.get_state(*_seeded_arrays(36)), 5, dt=0.1, method=EXPLICIT)
+    assert len(result) == 6
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from pylattica.core import Lattice, PeriodicStructure
+from pylattica.models.sandpile import (
+    SandpileModel,
+    Avalanche,
+    AvalancheStatistics,
+    AVALANCHE_SIZE,
+)
+
+
+def _grid(size, periodic=False):
+    lattice = Lattice([[1, 0], [0, 1]], periodic=periodic)
+    return PeriodicStructure.build_from(lattice, (size, size), { "A": [[0, 0]] })
+
+
+def _relax_sequentially(model, grains):
+    size = 0
+    while True:
+        unstable = np.flatnonzero(grains >= model.threshold)
+        if len(unstable) == 0:
+            return size
+        site = unstable[0]
+        grains[site] -= model.threshold
+        for nb in model.neighborhood.neighbors_of(int(model.site_ids[site])):
+            grains[int(np.flatnonzero(model.site_ids == nb)[0])] += 1
+        size += 1
+
+
+def test_single_toppling():
+    model = SandpileModel(_grid(3))
+    assert model.threshold == 4
+
+    grains = np.zeros(9, dtype=np.int64)
+    center = 4
+    grains[center] = 4
+    avalanche = model.relax(grains, [center])
+    assert avalanche == Avalanche(size=1, area=1, duration=1)
+    assert grains[center] == 0
+    assert grains.sum() == 4
+
+
+def test_relax_matches_sequential_toppling():
+    model = SandpileModel(_grid(6))
+    rng = np.random.default_rng(5)
+    grains = rng.integers(0, 9, size=36)
+
+    expected = grains.copy()
+    expected_size = _relax_sequentially(model, expected)
+
+    avalanche = model.relax(grains)
+    assert (grains == expected).all()
+    assert avalanche.size == expected_size
+    assert (grains < model.threshold).all()
+
+
+def test_run_records_net_changes_and_statistics():
+    model = SandpileModel(_grid(8))
+    state = model.get_state(np.full(64, 3))
+    result = model.run(state, 50, output_interval=10, seed=3)
+
+    assert len(result) == 6
+    grains = model.get_grains(result.last_step)
+    assert (grains < 4).all()
+
+    stats = model.statistics
+    assert stats.count == 50
+    assert stats.size_histogram.sum() == 50
+    assert stats.max_size > 0
+    assert result.last_step.get_general_state()[AVALANCHE_SIZE] >= 0
+
+    again = SandpileModel(_grid(8)).run(state, 50, output_interval=10, seed=3)
+    assert (model.get_grains(again.last_step) == grains).all()
+
+
+def test_avalanche_statistics():
+    stats = AvalancheStatistics()
+    avalanches = [Avalanche(0, 0, 0), Avalanche(5, 3, 2), Avalanche(12, 6, 4), Avalanche(5, 4, 3)]
+    for avalanche in avalanches:
+        stats.add(avalanche)
+
+    sizes = [a.size for a in avalanches]
+    assert stats.count == 4
+    assert np.isclose(stats.mean_size, np.mean(sizes))
+    assert np.isclose(stats.size_variance, np.var(sizes, ddof=1))
+    assert np.isclose(stats.mean_area, 3.25)
+    assert np.isclose(stats.mean_duration, 2.25)
+    assert stats.max_size == 12
+
+    observed, freqs = stats.size_distribution()
+    assert observed.tolist() == [0, 5, 12]
+    assert freqs.tolist() == [0.25, 0.5, 0.25]
+
+
+def test_sandpiles_must_dissipate():
+    with pytest.raises(ValueError):
+        SandpileModel(_grid(4, periodic=True))
+
+    with pytest.raises(ValueError):
+        SandpileModel(_grid(4), threshold=3)
@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+from pylattica.core import Lattice, PeriodicStructure
+from pylattica.models.spin import (
+    SpinModel,
+    IsingModel,
+    PottsModel,
+    ENERGY,
+    MAGNETIZATION,
+    METROPOLIS,
+    HEAT_BATH,
+)
+from pylattica.structures.square_grid.neighborhoods import MooreNbHoodBuilder
+
+
+class GenericIsingModel(IsingModel):
+    """The Ising model, simulated with the moves of the SpinModel base class."""
+
+    value_indices = SpinModel.value_indices
+    _metropolis = SpinModel._metropolis
+    _heat_bath = SpinModel._heat_bath
+
+
+@pytest.fixture
+def square_struct():
+    lattice = Lattice([[1, 0], [0, 1]])
+    return PeriodicStructure.build_from(lattice, (8, 8), { "A": [[0, 0]] })
+
+
+def test_ising_energy_and_magnetization(square_struct):
+    model = IsingModel(square_struct, coupling=1.0, field=0.5)
+    aligned = np.ones(64, dtype=np.int8)
+    # 4 nearest neighbors per site
+    assert model.energy(aligned) == -64 * 4 / 2 - 0.5 * 64
+    assert model.magnetization(aligned) == 1.0
+    assert model.magnetization(-aligned) == -1.0
+
+    model = IsingModel(square_struct)
+    checkerboard = np.array([1 if (i // 8 + i % 8) % 2 == 0 else -1 for i in range(64)], dtype=np.int8)
+    assert model.energy(checkerboard) == 64 * 2
+    assert model.magnetization(checkerboard) == 0.0
+
+
+def test_default_neighborhood_is_nearest_neighbors(square_struct):
+    model = IsingModel(square_struct)
+    assert model.neighbors.shape == (64, 4)
+    assert len(model.sublattices) == 2
+
+    lattice = Lattice([[1, 0, 0], [0, 1, 0], [0, 0, 1]])
+    cubic = PeriodicStructure.build_from(lattice, (4, 4, 4), { "A": [[0, 0, 0]] })
+    model = PottsModel(cubic)
+    assert model.neighbors.shape == (64, 6)
+    assert len(model.sublattices) == 2
+
+
+def test_sublattices_contain_no_neighbors(square_struct):
+    model = IsingModel(square_struct, nb_builder=MooreNbHoodBuilder())
+    assert sorted(np.concatenate(model.sublattices).tolist()) == list(range(64))
+    for idxs in model.sublattices:
+        members = set(idxs.tolist())
+        for idx in idxs:
+            assert members.isdisjoint(model.neighbors[idx].tolist())
+
+
+def test_potts_local_energies_match_neighbor_counts(square_struct):
+    model = PottsModel(square_struct, num_states=4, coupling=2.0, field=1.0)
+    spins = model.random_spins(seed=3)
+    idxs = np.arange(64)
+    interaction, field = model.local_energies(spins, idxs)
+
+    for idx in idxs:
+        nb_spins = [spins[nb] for nb in model.neighbors[idx] if nb >= 0]
+        for value in range(4):
+            assert interaction[idx, value] == -2.0 * nb_spins.count(value)
+    assert field.tolist() == [-1.0, 0, 0, 0]
+
+
+@pytest.mark.parametrize("model_cls", [IsingModel, GenericIsingModel, PottsModel])
+@pytest.mark.parametrize("method", [METROPOLIS, HEAT_BATH])
+@pytest.mark.parametrize("nb_builder", [None, MooreNbHoodBuilder()])
+def test_observables_are_tracked_incrementally(square_struct, model_cls, method, nb_builder):
+    model = model_cls(square_struct, field=0.3, nb_builder=nb_builder)
+    state = model.get_state(model.random_spins(seed=1))
+    result = model.run(state, 12, temperature=2.0, method=method, output_interval=5, seed=2)
+
+    assert len(result) == 4
+    for step_no in range(len(result)):
+        step = result.get_step(step_no)
+        spins = model.get_spins(step)
+        general = step.get_general_state()
+        assert np.isclose(general[ENERGY], model.energy(spins))
+        assert np.isclose(general[MAGNETIZATION], model.magnetization(spins))
+
+
+@pytest.mark.parametrize("model_cls", [IsingModel, GenericIsingModel, PottsModel])
+@pytest.mark.parametrize("method", [METROPOLIS, HEAT_BATH])
+def test_observables_are_tracked_on_open_boundaries(model_cls, method):
+    lattice = Lattice([[1, 0], [0, 1]], False)
+    struct = PeriodicStructure.build_from(lattice, (6, 6), { "A": [[0, 0]] })
+    model = model_cls(struct, field=0.3)
+    assert (model.neighbors < 0).any()
+
+    state = model.get_state(model.random_spins(seed=1))
+    result = model.run(state, 10, temperature=2.0, method=method, seed=2)
+    spins = model.get_spins(result.last_step)
+    general = result.last_step.get_general_state()
+    assert np.isclose(general[ENERGY], model.energy(spins))
+    assert np.isclose(general[MAGNETIZATION], model.magnetization(spins))
+
+
+def test_runs_are_reproducible(square_struct):
+    model = PottsModel(square_struct, num_states=3)
+    state = model.get_state(model.random_spins(seed=4))
+    first = model.run(state, 5, temperature=1.0, seed=9)
+    second = model.run(state, 5, temperature=1.0, seed=9)
+    assert (model.get_spins(first.last_step) == model.get_spins(second.last_step)).all()
+
+
+@pytest.mark.parametrize("method", [METROPOLIS, HEAT_BATH])
+def test_ising_ordering(square_struct, method):
+    model = IsingModel(square_struct)
+
+    cold = model.run(model.get_state(np.ones(64, dtype=np.int8)), 20, temperature=0.5, method=method, seed=0)
+    assert cold.last_step.get_general_state()[MAGNETIZATION] > 0.95
+
+    hot = model.run(model.get_state(np.ones(64, dtype=np.int8)), 50, temperature=100.0, method=method, seed=0)
+    assert abs(hot.last_step.get_general_state()[MAGNETIZATION]) < 0.5
+
+
+def test_invalid_arguments(square_struct):
+    model = IsingModel(square_struct)
+    spins = model.random_spins(seed=0)
+    with pytest.raises(ValueError):
+        model.sweep(spins, 0.0)
+    with pytest.raises(ValueError):
+        model.sweep(spins, 1.0, method="glauber")
+    with pytest.raises(ValueError):
+        PottsModel(square_struct, num_states=1)
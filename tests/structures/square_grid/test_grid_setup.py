@@ -33,6 +33,11 @@ def test_setup_noise(grid_setup: DiscreteGridSetup):
     state = grid_setup.setup_noise(4, phases = ['A', 'B'])
     assert state is not None
 
+def test_setup_noise_seed(grid_setup: DiscreteGridSetup):
+    first = grid_setup.setup_noise(6, phases = ['A', 'B'], seed = 1)
+    second = grid_setup.setup_noise(6, phases = ['A', 'B'], seed = 1)
+    assert first.state.as_dict() == second.state.as_dict()
+
 def test_setup_random_sites(grid_setup: DiscreteGridSetup):
     num_sites = 2
     nuc_amts = {
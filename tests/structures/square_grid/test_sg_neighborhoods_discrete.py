@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 
 from pylattica.structures.square_grid.neighborhoods import (
     CircularNeighborhoodBuilder,
@@ -77,3 +78,19 @@ def test_von_neumann_nb_3d_hood():
     nbh = nb_builder.get(struct)
     nbs = nbh.neighbors_of(0)
     assert len(nbs) == 6
+
+
+def test_repeated_periodic_connections_are_listed_once():
+    struct = SimpleSquare2DStructureBuilder().build(2)
+    nbhood = MooreNbHoodBuilder().get(struct)
+
+    adjacency = nbhood.adjacency_matrix().toarray()
+    assert np.all(adjacency <= 1)
+    assert np.allclose(nbhood.laplacian().diagonal(), 3)
+
+    for site_id in struct.site_ids:
+        nbs = nbhood.neighbors_of(site_id)
+        assert len(nbs) == 3
+        row = nbhood.sample_neighbors([site_id])[0]
+        assert row[row >= 0].tolist() == nbs
+        assert np.flatnonzero(adjacency[site_id]).tolist() == sorted(nbs)